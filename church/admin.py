@@ -9,8 +9,28 @@ from .forms import (
     WordOfTruthAdminForm, ChildrensBreadAdminForm, ManTalkAdminForm,
     NewsLineAdminForm, NewsItemAdminForm, InfoCardAdminForm,
     GalleryImageAdminForm, HeroSettingsAdminForm, SidebarPromoAdminForm,
-    AboutPageAdminForm, PartnerAdminForm, TestimonialAdminForm
+    AboutPageAdminForm, PartnerAdminForm, TestimonialAdminForm,
+    BookAdminForm, BoardMemberAdminForm, ImageFieldFormMixin,
 )
+from .thumbnail_manifest import get_preview_thumbnail
+
+
+class ThumbnailPreviewMixin:
+    """
+    Adds an 'image_preview' list column read from the thumbnail manifest.
+    Never generates thumbnails or touches storage, so changelists stay fast.
+    """
+    preview_field = 'image'
+
+    def image_preview(self, obj):
+        thumb = get_preview_thumbnail(getattr(obj, self.preview_field, None))
+        if not thumb:
+            return '-'
+        return format_html(
+            '<img src="{}" alt="" style="width: 60px; height: 45px; object-fit: cover; border-radius: 4px;" loading="lazy">',
+            thumb.url,
+        )
+    image_preview.short_description = 'Preview'
 
 
 @admin.register(Verse)
@@ -26,9 +46,9 @@ class VerseAdmin(admin.ModelAdmin):
 
 
 @admin.register(NewsLine)
-class NewsLineAdmin(ImageCroppingMixin, admin.ModelAdmin):
+class NewsLineAdmin(ThumbnailPreviewMixin, ImageCroppingMixin, admin.ModelAdmin):
     form = NewsLineAdminForm
-    list_display = ('title', 'is_published', 'has_video', 'created_at')
+    list_display = ('image_preview', 'title', 'is_published', 'has_video', 'created_at')
     list_filter = ('is_published', 'created_at')
     search_fields = ('title', 'summary')
     prepopulated_fields = {'slug': ('title',)}
@@ -61,9 +81,9 @@ class NewsLineAdmin(ImageCroppingMixin, admin.ModelAdmin):
 
 
 @admin.register(NewsItem)
-class NewsItemAdmin(ImageCroppingMixin, admin.ModelAdmin):
+class NewsItemAdmin(ThumbnailPreviewMixin, ImageCroppingMixin, admin.ModelAdmin):
     form = NewsItemAdminForm
-    list_display = ('title', 'is_published', 'event_date', 'created_at', 'view_listing_link')
+    list_display = ('image_preview', 'title', 'is_published', 'event_date', 'created_at', 'view_listing_link')
     list_filter = ('is_published', 'event_date', 'created_at')
     search_fields = ('title', 'summary', 'body')
     prepopulated_fields = {'slug': ('title',)}
@@ -95,7 +115,7 @@ class NewsItemAdmin(ImageCroppingMixin, admin.ModelAdmin):
     )
 
 
-class CalendarEventForm(ModelForm):
+class CalendarEventForm(ImageFieldFormMixin, ModelForm):
     """Custom form with color picker widget"""
     class Meta:
         model = CalendarEvent
@@ -201,9 +221,9 @@ class TestimonialAdmin(ImageCroppingMixin, admin.ModelAdmin):
 
 
 @admin.register(GalleryImage)
-class GalleryImageAdmin(ImageCroppingMixin, admin.ModelAdmin):
+class GalleryImageAdmin(ThumbnailPreviewMixin, ImageCroppingMixin, admin.ModelAdmin):
     form = GalleryImageAdminForm
-    list_display = ('caption', 'category', 'has_video', 'uploaded_at')
+    list_display = ('image_preview', 'caption', 'category', 'has_video', 'uploaded_at')
     list_filter = ('category', 'uploaded_at')
     search_fields = ('caption', 'category', 'video_url')
     fieldsets = (
@@ -325,9 +345,9 @@ class InfoCardAdmin(ImageCroppingMixin, admin.ModelAdmin):
 
 
 @admin.register(ManTalk)
-class ManTalkAdmin(ImageCroppingMixin, admin.ModelAdmin):
+class ManTalkAdmin(ThumbnailPreviewMixin, ImageCroppingMixin, admin.ModelAdmin):
     form = ManTalkAdminForm
-    list_display = ('title', 'author_name', 'is_published', 'created_at')
+    list_display = ('image_preview', 'title', 'author_name', 'is_published', 'created_at')
     list_filter = ('is_published', 'created_at')
     search_fields = ('title', 'summary', 'body')
     prepopulated_fields = {'slug': ('title',)}
@@ -393,6 +413,7 @@ class SchoolMinistryEnrollmentAdmin(admin.ModelAdmin):
 
 @admin.register(SidebarPromo)
 class SidebarPromoAdmin(ImageCroppingMixin, admin.ModelAdmin):
+    form = SidebarPromoAdminForm
     list_display = ('caption_preview', 'display_order', 'is_active', 'created_at')
     list_filter = ('is_active', 'created_at')
     search_fields = ('caption',)
@@ -434,9 +455,9 @@ class FAQAdmin(admin.ModelAdmin):
 
 
 @admin.register(WordOfTruth)
-class WordOfTruthAdmin(ImageCroppingMixin, admin.ModelAdmin):
+class WordOfTruthAdmin(ThumbnailPreviewMixin, ImageCroppingMixin, admin.ModelAdmin):
     form = WordOfTruthAdminForm
-    list_display = ('title', 'author_name', 'is_published', 'created_at', 'view_listing_link')
+    list_display = ('image_preview', 'title', 'author_name', 'is_published', 'created_at', 'view_listing_link')
     list_filter = ('is_published', 'created_at')
     search_fields = ('title', 'summary', 'author_name', 'body')
     prepopulated_fields = {'slug': ('title',)}
@@ -463,9 +484,9 @@ class WordOfTruthAdmin(ImageCroppingMixin, admin.ModelAdmin):
 
 
 @admin.register(ChildrensBread)
-class ChildrensBreadAdmin(ImageCroppingMixin, admin.ModelAdmin):
+class ChildrensBreadAdmin(ThumbnailPreviewMixin, ImageCroppingMixin, admin.ModelAdmin):
     form = ChildrensBreadAdminForm
-    list_display = ('title', 'author_name', 'is_published', 'created_at', 'view_listing_link')
+    list_display = ('image_preview', 'title', 'author_name', 'is_published', 'created_at', 'view_listing_link')
     list_filter = ('is_published', 'created_at')
     search_fields = ('title', 'summary', 'author_name', 'body')
     prepopulated_fields = {'slug': ('title',)}
@@ -576,6 +597,7 @@ class PartnerInquiryAdmin(admin.ModelAdmin):
 
 @admin.register(Book)
 class BookAdmin(ImageCroppingMixin, admin.ModelAdmin):
+    form = BookAdminForm
     list_display = ('title', 'author', 'is_published', 'created_at', 'view_listing_link')
     list_filter = ('is_published', 'created_at')
     search_fields = ('title', 'description', 'review', 'author')
@@ -625,8 +647,9 @@ class MNAdmin(admin.ModelAdmin):
 
 
 @admin.register(BoardMember)
-class BoardMemberAdmin(ImageCroppingMixin, admin.ModelAdmin):
-    list_display = ('name', 'role', 'display_order', 'is_active', 'created_at')
+class BoardMemberAdmin(ThumbnailPreviewMixin, ImageCroppingMixin, admin.ModelAdmin):
+    form = BoardMemberAdminForm
+    list_display = ('image_preview', 'name', 'role', 'display_order', 'is_active', 'created_at')
     list_filter = ('is_active', 'role')
     search_fields = ('name', 'role', 'bio')
     list_editable = ('display_order', 'is_active')
@@ -0,0 +1,69 @@
+"""
+Database connection reuse (DB_POOL setting, see church_app/settings.py).
+
+* ``psycopg``: Django's psycopg 3 connection pool (OPTIONS['pool']), bounded per gunicorn
+  worker, with a liveness check on checkout and max_lifetime/max_idle recycling so Neon's
+  idle-connection reaping never hands a dead socket to a request.
+* ``persistent``: one connection per thread kept for CONN_MAX_AGE with CONN_HEALTH_CHECKS.
+* ``off``: the old behaviour (new connection per request).
+
+Pools are closed when the worker process exits (gunicorn --max-requests restarts), so Neon
+sees connections end cleanly instead of timing out. pool_stats() feeds the staff-only
+/health/pool/ endpoint; the public /health/ only reports whether the database answers.
+"""
+import atexit
+import logging
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+POOL_STAT_KEYS = (
+    'pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting',
+    'requests_num', 'requests_queued', 'requests_wait_ms', 'requests_errors',
+    'connections_num', 'connections_errors', 'connections_lost', 'returns_bad',
+)
+
+
+def _pool(connection):
+    """The alias's psycopg pool if it has been opened, else None (``connection.pool`` would open it)."""
+    return getattr(connection, '_connection_pools', {}).get(connection.alias)  # postgresql backend only
+
+
+def pool_stats():
+    """Per-alias pooling mode and counters (no connection or pool is opened to compute them)."""
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        settings_dict = connection.settings_dict
+        entry = {'vendor': connection.vendor}
+        if settings_dict.get('OPTIONS', {}).get('pool'):
+            entry['mode'] = 'psycopg'
+            pool = _pool(connection)
+            entry['open'] = pool is not None
+            if pool is not None:
+                raw = pool.get_stats()
+                entry.update({key: raw[key] for key in POOL_STAT_KEYS if key in raw})
+        elif settings_dict.get('CONN_MAX_AGE'):
+            entry['mode'] = 'persistent'
+            entry['conn_max_age'] = settings_dict['CONN_MAX_AGE']
+            entry['health_checks'] = settings_dict.get('CONN_HEALTH_CHECKS', False)
+        else:
+            entry['mode'] = 'off'
+        stats[alias] = entry
+    return stats
+
+
+def close_pools():
+    for alias in connections:
+        connection = connections[alias]
+        if _pool(connection) is None:
+            continue
+        try:
+            connection.close_pool()
+        except Exception as e:
+            logger.warning(f"Could not close connection pool for {alias}: {e}")
+
+
+# gunicorn workers exit through sys.exit() (including --max-requests restarts)
+atexit.register(close_pools)
@@ -0,0 +1,309 @@
+"""
+Streaming database sync (management command sync_db).
+
+Replaces the dumpdata/loaddata round trip of sync_neon.py and dump_all_safe.py, which builds
+one JSON document for the whole database in memory. Here every model is read in primary-key
+order, one keyset-paginated chunk at a time, and either written as NDJSON (one serialized
+object per line, optionally gzipped) or loaded straight into the target database with
+bulk_create(update_conflicts=True) in one transaction per chunk. Memory use is bounded by the
+chunk size, whatever the size of PageView or the content tables.
+
+Loading bypasses save() and signals, like loaddata, and keeps auto_now/auto_now_add values
+from the source.
+
+Incremental runs (--incremental) only read rows whose updated_at-style column moved past the
+per-model watermark stored in the target (SyncWatermark), replay deletes recorded as
+SyncTombstone rows in the source, and can pull just the media those rows reference. With
+--prune-tombstones they also delete source tombstones that every watermark has moved past.
+"""
+from contextlib import contextmanager
+import datetime
+import gzip
+import io
+import json
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import Q
+
+DEFAULT_EXCLUDE = (
+    'contenttypes',
+    'auth.permission',
+    'admin.logentry',
+    'sessions.session',
+    'church.synctombstone',  # sync bookkeeping stays per environment
+    'church.syncwatermark',
+    'church.slowquery',
+)
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def register_database(alias, url):
+    """Add a DATABASES entry at runtime from a database URL (e.g. the Neon source)."""
+    import dj_database_url
+
+    config = connections.configure_settings({DEFAULT_DB_ALIAS: {}, alias: dj_database_url.parse(url)})[alias]
+    connections.settings[alias] = config
+    return alias
+
+
+def select_models(labels=None, exclude=DEFAULT_EXCLUDE):
+    """Concrete, managed models in dependency order (FK targets first), like dumpdata."""
+    excluded = {label.lower() for label in exclude or ()}
+    if labels:
+        models = [apps.get_model(label) for label in labels]
+    else:
+        models = [m for config in apps.get_app_configs() for m in config.get_models()]
+    models = [
+        m for m in models
+        if m._meta.managed and not m._meta.proxy
+        and m._meta.app_label not in excluded and m._meta.label_lower not in excluded
+    ]
+    ordered = serializers.sort_dependencies([(None, models)], allow_cycles=True)
+    return [m for m in ordered if m in models]
+
+
+def iter_chunks(model, using, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rows of ``model`` in pk order, chunk by chunk, via keyset pagination (no OFFSET scans)."""
+    queryset = model._base_manager.using(using).order_by('pk')
+    m2m = [f.name for f in model._meta.many_to_many if f.remote_field.through._meta.auto_created]
+    if m2m:
+        queryset = queryset.prefetch_related(*m2m)
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def serialize_chunk(objects):
+    return serializers.serialize('python', objects)
+
+
+def open_ndjson(path, mode):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, mode + 'b'), encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class _Encoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder rounds datetimes to milliseconds; a sync must keep them exact."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def write_ndjson(handle, records):
+    for record in records:
+        handle.write(json.dumps(record, cls=_Encoder, ensure_ascii=False))
+        handle.write('\n')
+
+
+def read_ndjson_batches(handle, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (model_label, [records]) batches of consecutive records of the same model."""
+    label, batch = None, []
+    for line in handle:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if batch and (record['model'] != label or len(batch) >= chunk_size):
+            yield label, batch
+            batch = []
+        label = record['model']
+        batch.append(record)
+    if batch:
+        yield label, batch
+
+
+@contextmanager
+def keep_timestamps(model):
+    """Let bulk_create write the source's auto_now/auto_now_add values instead of now()."""
+    fields = [f for f in model._meta.concrete_fields if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def load_records(model, records, using):
+    """Upsert one chunk of serialized records into ``using`` in a single transaction."""
+    deserialized = list(serializers.deserialize('python', records, using=using, ignorenonexistent=True))
+    objects = [d.object for d in deserialized]
+    if not objects:
+        return 0
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if model._meta.parents:
+            # Multi-table inheritance isn't supported by bulk_create; fall back to raw saves
+            for d in deserialized:
+                d.save(using=using)
+            return len(objects)
+
+        pk_name = model._meta.pk.name
+        update_fields = [f.name for f in model._meta.concrete_fields if not f.primary_key]
+        kwargs = {'batch_size': 500}
+        if update_fields:
+            kwargs.update(update_conflicts=True, update_fields=update_fields)
+            if connection.features.supports_update_conflicts_with_target:
+                kwargs['unique_fields'] = [pk_name]
+        else:
+            kwargs['ignore_conflicts'] = True
+        with keep_timestamps(model):
+            model._base_manager.using(using).bulk_create(objects, **kwargs)
+
+        for d in deserialized:
+            for field_name, values in (d.m2m_data or {}).items():
+                getattr(d.object, field_name).set(values)
+    return len(objects)
+
+
+def prune(model, keep_pks, using, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Delete rows of ``model`` in ``using`` whose pk isn't in ``keep_pks``."""
+    deleted = 0
+    stale = []
+    for pk in model._base_manager.using(using).order_by('pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size):
+        if pk not in keep_pks:
+            stale.append(pk)
+    for start in range(0, len(stale), chunk_size):
+        with transaction.atomic(using=using):
+            deleted += model._base_manager.using(using).filter(pk__in=stale[start:start + chunk_size]).delete()[0]
+    return deleted
+
+
+def reset_sequences(models, using):
+    """Move Postgres sequences past the loaded pks (no-op on SQLite/MySQL)."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+# -- incremental sync ------------------------------------------------------
+
+# Append-only logs: synced by watermark, but deletes (analytics resets) aren't tombstoned
+UNTOMBSTONED_MODELS = ('church.pageview', 'church.synctombstone', 'church.syncwatermark', 'church.slowquery')
+WATERMARK_OVERLAP = datetime.timedelta(seconds=5)  # re-read rows near the mark (clock skew, in-flight commits)
+
+
+def watermark_field(model):
+    """The column incremental sync filters on: an auto_now field, else auto_now_add (inserts only)."""
+    fields = [f for f in model._meta.concrete_fields if isinstance(f, models.DateTimeField)]
+    for attr in ('auto_now', 'auto_now_add'):
+        for field in fields:
+            if getattr(field, attr, False):
+                return field.name
+    return None
+
+
+def tombstoned_models():
+    """Content models whose deletes are recorded as SyncTombstone rows (see church.signals)."""
+    return [
+        m for m in apps.get_app_config('church').get_models()
+        if watermark_field(m) and m._meta.label_lower not in UNTOMBSTONED_MODELS
+    ]
+
+
+def source_key(alias):
+    """Stable name for a source database without its credentials."""
+    config = connections.settings[alias]
+    engine = config['ENGINE'].rsplit('.', 1)[-1]
+    return f"{engine}://{config.get('HOST') or ''}:{config.get('PORT') or ''}/{config['NAME']}"[:200]
+
+
+def iter_changed_chunks(model, using, field, since, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rows with ``field >= since`` in (field, pk) order, keyset-paginated like iter_chunks."""
+    queryset = model._base_manager.using(using).order_by(field, 'pk')
+    if since is not None:
+        queryset = queryset.filter(**{f'{field}__gte': since})
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(Q(**{f'{field}__gt': last[0]}) | Q(**{field: last[0], 'pk__gt': last[1]}))
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = (getattr(chunk[-1], field), chunk[-1].pk)
+
+
+def get_watermark(target, source, label):
+    from .models import SyncWatermark
+
+    mark = SyncWatermark.objects.using(target).filter(source=source, model_label=label).first()
+    return mark.value if mark else None
+
+
+def set_watermark(target, source, label, value):
+    from .models import SyncWatermark
+
+    SyncWatermark.objects.using(target).update_or_create(
+        source=source, model_label=label, defaults={'value': value},
+    )
+
+
+def apply_tombstones(source, target, since, labels):
+    """Delete target rows tombstoned in the source since ``since``. Returns (deleted, newest deleted_at)."""
+    from .models import SyncTombstone
+
+    tombstones = SyncTombstone.objects.using(source).filter(model_label__in=labels)
+    if since is not None:
+        tombstones = tombstones.filter(deleted_at__gte=since)
+    pks_by_label = {}
+    newest = None
+    for label, object_pk, deleted_at in tombstones.values_list('model_label', 'object_pk', 'deleted_at').iterator():
+        pks_by_label.setdefault(label, set()).add(object_pk)
+        newest = deleted_at if newest is None or deleted_at > newest else newest
+    deleted = 0
+    for label, pks in pks_by_label.items():
+        model = apps.get_model(label)
+        values = [model._meta.pk.to_python(pk) for pk in pks]
+        with transaction.atomic(using=target):
+            deleted += model._base_manager.using(target).filter(pk__in=values).delete()[0]
+    return deleted, newest
+
+
+def prune_tombstones(source, target, key):
+    """
+    Delete source tombstones older than this source's oldest watermark in the target (minus
+    WATERMARK_OVERLAP): every incremental run from here on reads past them. Returns the count.
+    """
+    from .models import SyncTombstone, SyncWatermark
+
+    oldest = SyncWatermark.objects.using(target).filter(source=key).aggregate(oldest=models.Min('value'))['oldest']
+    if oldest is None:
+        return 0
+    return SyncTombstone.objects.using(source).filter(deleted_at__lt=oldest - WATERMARK_OVERLAP).delete()[0]
+
+
+def referenced_media(objects):
+    """Storage names a chunk of rows points at: media files plus their manifest thumbnails."""
+    from .thumbnail_manifest import MANIFEST_FIELD
+
+    names = set()
+    for obj in objects:
+        for field in obj._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                value = getattr(obj, field.attname)
+                if value:
+                    names.add(str(value))
+        for entry in (getattr(obj, MANIFEST_FIELD, None) or {}).values():
+            for spec in (entry.get('specs') or {}).values():
+                if spec.get('name'):
+                    names.update((spec['name'], spec['name'] + '.webp'))
+    return names
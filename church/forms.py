@@ -4,9 +4,10 @@ Custom forms for admin with improved image validation
 from django import forms
 from django.core.files.images import get_image_dimensions
 from django.core.exceptions import ValidationError
+from .image_ingest import normalize_upload
 from .models import (
     WordOfTruth, ChildrensBread, ManTalk, NewsLine, NewsItem, InfoCard, 
-    GalleryImage, HeroSettings, SidebarPromo, AboutPage, Partner, Testimonial,
+    GalleryImage, HeroSettings, SidebarPromo, AboutPage, Partner, Testimonial, Book, BoardMember,
     ContactMessage, PartnerInquiry, NewsletterSubscriber, SchoolMinistryEnrollment,
     ArticleComment
 )
@@ -16,11 +17,15 @@ class ImageFieldFormMixin:
     """
     Mixin to add better image validation error handling.
     This helps diagnose issues with image uploads.
+    Valid new uploads are downscaled, oriented and stripped of metadata (see church.image_ingest).
     """
     
     def clean_image(self):
         """Custom validation for image fields - relaxed to avoid false positives"""
-        image = self.cleaned_data.get('image')
+        return normalize_upload(self._validate_image(self.cleaned_data.get('image')))
+
+    def _validate_image(self, image):
+        """Relaxed validity check shared by image fields; returns the value unchanged."""
         if not image:
             return image
         
@@ -145,6 +150,21 @@ class AboutPageAdminForm(ImageFieldFormMixin, forms.ModelForm):
         fields = '__all__'
 
 
+class BookAdminForm(ImageFieldFormMixin, forms.ModelForm):
+    class Meta:
+        model = Book
+        fields = '__all__'
+
+    def clean_cover_image(self):
+        return normalize_upload(self._validate_image(self.cleaned_data.get('cover_image')))
+
+
+class BoardMemberAdminForm(ImageFieldFormMixin, forms.ModelForm):
+    class Meta:
+        model = BoardMember
+        fields = '__all__'
+
+
 class PartnerAdminForm(ImageFieldFormMixin, forms.ModelForm):
     class Meta:
         model = Partner
@@ -162,7 +182,9 @@ class PartnerAdminForm(ImageFieldFormMixin, forms.ModelForm):
                     logo.seek(0)
                 width, height = get_image_dimensions(logo)
                 if width and height:
-                    return logo
+                    if hasattr(logo, 'seek'):
+                        logo.seek(0)
+                    return normalize_upload(logo)
             except Exception:
                 pass
         return logo
@@ -185,7 +207,9 @@ class TestimonialAdminForm(ImageFieldFormMixin, forms.ModelForm):
                     photo.seek(0)
                 width, height = get_image_dimensions(photo)
                 if width and height:
-                    return photo
+                    if hasattr(photo, 'seek'):
+                        photo.seek(0)
+                    return normalize_upload(photo)
             except Exception:
                 pass
         return photo
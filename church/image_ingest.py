@@ -0,0 +1,102 @@
+"""
+Upload-time normalization for admin image uploads.
+
+Phone photos arrive at 8-12 MB and 4000+ px with EXIF orientation and GPS metadata. Every
+thumbnail job decodes the original again, so we cap originals at IMAGE_UPLOAD_MAX_DIMENSION,
+bake in the EXIF orientation, drop metadata and re-encode once before storage.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DIMENSION = 2560
+DEFAULT_JPEG_QUALITY = 85
+
+# Formats we re-encode, with the content type of the result. GIFs are left alone (animation).
+_ENCODERS = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+}
+
+
+def _save_kwargs(fmt, img):
+    quality = getattr(settings, 'IMAGE_UPLOAD_JPEG_QUALITY', DEFAULT_JPEG_QUALITY)
+    kwargs = {}
+    icc_profile = img.info.get('icc_profile')
+    if icc_profile:
+        # Keep the colour profile; everything else (EXIF, XMP, comments) is dropped
+        kwargs['icc_profile'] = icc_profile
+    if fmt == 'JPEG':
+        kwargs.update(quality=quality, optimize=True, progressive=True)
+    elif fmt == 'PNG':
+        kwargs.update(optimize=True)
+    elif fmt == 'WEBP':
+        kwargs.update(quality=quality, method=4)
+    return kwargs
+
+
+def normalize_upload(image, max_dimension=None):
+    """
+    Downscale, orient and strip a freshly uploaded image.
+
+    Returns a new SimpleUploadedFile with the same name, or ``image`` unchanged when it isn't
+    a new upload, isn't a JPEG/PNG/WebP, is animated, already fits and carries no metadata,
+    or can't be processed.
+    """
+    if not isinstance(image, UploadedFile):
+        # Existing FieldFile on an unchanged form: nothing to do
+        return image
+    if max_dimension is None:
+        max_dimension = getattr(settings, 'IMAGE_UPLOAD_MAX_DIMENSION', DEFAULT_MAX_DIMENSION)
+
+    from PIL import Image, ImageOps
+
+    try:
+        image.seek(0)
+        img = Image.open(image)
+        fmt = img.format
+        if fmt not in _ENCODERS or getattr(img, 'n_frames', 1) > 1:
+            image.seek(0)
+            return image
+
+        width, height = img.size
+        too_large = bool(max_dimension) and max(width, height) > max_dimension
+        has_metadata = bool(img.getexif()) or any(key in img.info for key in ('exif', 'xmp', 'comment'))
+        if not too_large and not has_metadata:
+            image.seek(0)
+            return image
+
+        if too_large and fmt == 'JPEG':
+            # Let the JPEG decoder scale down by a power of two first (much cheaper than full decode)
+            scale = max_dimension / max(width, height)
+            img.draft(img.mode, (int(width * scale), int(height * scale)))
+
+        img = ImageOps.exif_transpose(img)
+        if too_large:
+            img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        if fmt == 'JPEG' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+
+        buf = BytesIO()
+        img.save(buf, fmt, **_save_kwargs(fmt, img))
+    except Exception as e:
+        # Fail-safe: keep the original rather than blocking the editor
+        logger.warning(f"Image ingest skipped for {getattr(image, 'name', 'upload')}: {e}")
+        try:
+            image.seek(0)
+        except Exception:
+            pass
+        return image
+
+    data = buf.getvalue()
+    logger.info(
+        f"Image ingest: {image.name} {width}x{height} {image.size}B -> "
+        f"{img.size[0]}x{img.size[1]} {len(data)}B"
+    )
+    return SimpleUploadedFile(os.path.basename(image.name), data, content_type=_ENCODERS[fmt])
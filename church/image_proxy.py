@@ -0,0 +1,222 @@
+"""
+On-the-fly image variants behind signed URLs (imgproxy-style).
+
+A variant spec (source name, size, crop box, crop/detail flags, format and optionally the
+owning model row) is signed with django.core.signing, so only URLs the site emitted can
+trigger work. On first hit the image_proxy view generates the variant with easy_thumbnails
+(same THUMBNAIL_PROCESSORS, namer and storage - local media/ or GCS, which is the cache tier),
+records it in the owning row's thumbnail manifest and redirects to it. Later hits find the
+stored variant and redirect straight away.
+
+Cache misses run on a small per-process worker pool; concurrent requests for the same variant
+share one job, and when too many misses are queued the view answers 503 instead of piling up.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.urls import reverse
+from easy_thumbnails.files import get_thumbnailer
+
+logger = logging.getLogger(__name__)
+
+SIGNING_SALT = 'church.image_proxy'
+SUPPORTED_FORMATS = ('', 'webp')  # webp is the sibling written by store_thumbnail_webp
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 16
+DEFAULT_TIMEOUT = 30  # seconds a request waits for its variant
+
+
+class ProxyBusy(Exception):
+    """Too many variants are already queued for generation."""
+
+
+def deferred_generation_enabled():
+    return getattr(settings, 'THUMBNAIL_DEFERRED_GENERATION', False)
+
+
+def _box_str(box):
+    from .thumbnail_manifest import _box_str as manifest_box_str
+    return manifest_box_str(box)
+
+
+def build_spec(field_file, options, fmt=''):
+    """Compact, JSON-serializable description of one variant of ``field_file``."""
+    size = options.get('size') or (0, 0)
+    spec = {
+        's': field_file.name,
+        'w': int(size[0]),
+        'h': int(size[1]),
+    }
+    crop = options.get('crop')
+    if crop:
+        spec['c'] = crop if isinstance(crop, str) else 1  # 'smart' etc. pass through
+    if options.get('detail'):
+        spec['d'] = 1
+    box = _box_str(options.get('box'))
+    if box:
+        spec['b'] = box
+    if fmt:
+        spec['f'] = fmt
+    instance = getattr(field_file, 'instance', None)
+    if instance is not None and instance.pk is not None:
+        # Lets the view record the result in the row's thumbnail manifest
+        spec['m'] = instance._meta.label_lower
+        spec['p'] = instance.pk
+        spec['a'] = field_file.field.name
+    return spec
+
+
+def spec_options(spec):
+    """easy_thumbnails options for a spec (mirrors what safe_thumbnail passes)."""
+    crop = spec.get('c')
+    options = {'size': (spec['w'], spec['h']), 'crop': crop if isinstance(crop, str) else bool(crop)}
+    if spec.get('d'):
+        options['detail'] = True
+    if spec.get('b'):
+        options['box'] = spec['b']
+    return options
+
+
+def sign_spec(spec):
+    return signing.dumps(spec, salt=SIGNING_SALT, compress=True)
+
+
+def load_spec(token):
+    """Decode a signed spec; raises signing.BadSignature when tampered with."""
+    spec = signing.loads(token, salt=SIGNING_SALT)
+    if not isinstance(spec, dict) or not spec.get('s') or spec.get('f', '') not in SUPPORTED_FORMATS:
+        raise signing.BadSignature('Invalid image spec')
+    return spec
+
+
+def signed_image_url(field_file, options, fmt=''):
+    return reverse('image_proxy', args=[sign_spec(build_spec(field_file, options, fmt))])
+
+
+def proxy_thumbnail(field_file, options):
+    """ManifestThumbnail-like stand-in pointing at the proxy; nothing is generated during render."""
+    from .thumbnail_manifest import ManifestThumbnail
+
+    size = options.get('size') or (None, None)
+    return ManifestThumbnail({
+        'url': signed_image_url(field_file, options),
+        'webp_url': signed_image_url(field_file, options, 'webp'),
+        'width': size[0],
+        'height': size[1],
+    })
+
+
+def _source_file(spec):
+    """FieldFile of the owning row when the spec names one (so the manifest can be updated), else a plain file."""
+    if spec.get('m'):
+        try:
+            model = apps.get_model(spec['m'])
+            instance = model._default_manager.get(pk=spec['p'])
+            field_file = getattr(instance, spec['a'])
+            if field_file and field_file.name == spec['s']:
+                return field_file
+        except Exception:
+            pass
+    return default_storage.open(spec['s'], 'rb')
+
+
+def _generate(spec):
+    from .thumbnail_manifest import record_thumbnail
+
+    options = spec_options(spec)
+    source = _source_file(spec)
+    try:
+        thumbnailer = get_thumbnailer(source, relative_name=spec['s'])
+        thumbnail = thumbnailer.get_existing_thumbnail(options)
+        if thumbnail is None:
+            thumbnail = thumbnailer.get_thumbnail(options)
+        if getattr(source, 'instance', None) is not None:
+            record_thumbnail(source, options, thumbnail)
+        return thumbnail.url
+    finally:
+        source.close()
+
+
+class VariantPool:
+    """Bounded worker pool that coalesces concurrent requests for the same variant."""
+
+    def __init__(self, workers, max_pending):
+        self.max_pending = max_pending
+        # workers=0 runs jobs inline in the request thread (tests, debugging)
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-proxy') if workers > 0 else None
+        )
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, key, func, *args):
+        if self._executor is None:
+            future = Future()
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is not None:
+                return future
+            if len(self._jobs) >= self.max_pending:
+                raise ProxyBusy()
+            future = self._executor.submit(self._run, func, *args)
+            self._jobs[key] = future
+        future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    @staticmethod
+    def _run(func, *args):
+        try:
+            return func(*args)
+        finally:
+            # Worker threads hold their own DB connection; don't let it go stale
+            close_old_connections()
+
+    def _forget(self, key):
+        with self._lock:
+            self._jobs.pop(key, None)
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._jobs)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = VariantPool(
+                    getattr(settings, 'IMAGE_PROXY_WORKERS', DEFAULT_WORKERS),
+                    getattr(settings, 'IMAGE_PROXY_MAX_PENDING', DEFAULT_MAX_PENDING),
+                )
+    return _pool
+
+
+def resolve_variant_url(spec):
+    """
+    URL of the stored variant for ``spec``, generating it on the worker pool if needed.
+    Raises ProxyBusy when the queue is full and TimeoutError when generation takes too long.
+    """
+    key = (spec['s'], spec['w'], spec['h'], spec.get('c'), spec.get('d'), spec.get('b'))
+    future = get_pool().submit(key, _generate, spec)
+    url = future.result(timeout=getattr(settings, 'IMAGE_PROXY_TIMEOUT', DEFAULT_TIMEOUT))
+    if spec.get('f') == 'webp':
+        url += '.webp'
+    return url
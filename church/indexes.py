@@ -0,0 +1,45 @@
+"""
+Partial indexes for the published/active rows the public pages read.
+
+Almost every public query filters on a boolean flag (is_published, is_active, approved) and
+orders by a date or display_order. A partial index (``WHERE is_published``) holds only those
+rows, so it is smaller than a composite index that also stores the flag, and on PostgreSQL
+``include`` columns make list projections (title, slug) index-only scans.
+
+MySQL/MariaDB (the HostPinnacle database) has no partial indexes, and Django would create the
+index without its condition there. PartialIndex instead creates a plain composite index led by
+the condition's columns, under the same name, so the same migrations serve every backend.
+Because that fallback is deliberate, settings.SILENCED_SYSTEM_CHECKS lists Django's "conditions /
+non-key columns will be ignored" checks (models.W037/W040).
+"""
+from django.db import models
+from django.db.models import Q
+
+
+def condition_fields(condition):
+    """Field names a simple condition filters on: Q(is_published=True) -> ['is_published']."""
+    names = []
+    for child in condition.children:
+        if isinstance(child, Q):
+            names.extend(name for name in condition_fields(child) if name not in names)
+        elif child[0].split('__')[0] not in names:
+            names.append(child[0].split('__')[0])
+    return names
+
+
+class PartialIndex(models.Index):
+    """models.Index with a ``condition`` that degrades to a composite index without partial index support."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.condition is None or self.expressions:
+            raise ValueError('PartialIndex requires a condition and field names.')
+
+    def fallback_index(self):
+        leading = [name for name in condition_fields(self.condition) if name not in self.fields]
+        return models.Index(fields=leading + list(self.fields), name=self.name, db_tablespace=self.db_tablespace)
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if not schema_editor.connection.features.supports_partial_indexes:
+            return self.fallback_index().create_sql(model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
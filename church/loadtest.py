@@ -0,0 +1,352 @@
+"""
+HTTP load-test harness (the loadtest management command).
+
+Concurrent clients run weighted user scenarios - the home shell plus its HTMX content fetch,
+article details, load-more chains, search typing, gallery paging, calendar month flips -
+either in-process through Django's WSGI handler or over HTTP against a running server
+(local gunicorn). Every request is timed; run() returns p50/p95/p99 latency, throughput and
+error rate, overall and per scenario and endpoint, plus the cache hit ratio, as a dict ready
+for json.dumps so runs before and after a change can be diffed.
+
+In-process runs share one interpreter (the GIL), so they measure the application's own cost
+per request; use a gunicorn URL to measure concurrency. The cache hit ratio counts cache
+get() calls that found a value: counted directly in-process, and from the Server-Timing
+headers of a server URL (start it with SERVER_TIMING_SAMPLE_RATE=1), which also give the
+mean db/cache/template/thumbnail time per request.
+"""
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+import datetime
+import http.client
+import random
+import re
+import threading
+import time
+
+from django.urls import reverse
+from django.utils import timezone
+
+from .perf_data import ARTICLE_MODELS
+
+# url_name of each article model's detail view
+DETAIL_URLS = {
+    'newsitem': 'news_detail',
+    'newsline': 'news_line_detail',
+    'wordoftruth': 'word_of_truth_detail',
+    'childrensbread': 'childrens_bread_detail',
+    'mantalk': 'mantalk_detail',
+    'book': 'book_detail',
+}
+LOAD_MORE = (
+    # (list url_name, load-more url_name, items per load-more)
+    ('news_list', 'load_more_news', 6),
+    ('word_of_truth_list', 'load_more_word_of_truth', 9),
+    ('childrens_bread_list', 'load_more_childrens_bread', 9),
+    ('news_line_list', 'load_more_news_line', 9),
+)
+SEARCH_TERMS = ('grace', 'faith', 'prayer', 'worship', 'children', 'ministry')
+_TIMING_METRIC = re.compile(r'([\w-]+);dur=([\d.]+)(?:;desc="([^"]*)")?')
+_CACHE_DESC = re.compile(r'(\d+) hits / (\d+) misses')
+MAX_SLUGS = 200  # detail pages sampled per article type
+
+
+def discover_targets():
+    """Published article detail URLs and gallery categories to request (read from the database)."""
+    from .models import GalleryImage
+
+    details = []
+    for model in ARTICLE_MODELS:
+        url_name = DETAIL_URLS[model._meta.model_name]
+        slugs = model.objects.filter(is_published=True).order_by('-created_at').values_list('slug', flat=True)
+        details.extend(reverse(url_name, args=[slug]) for slug in slugs[:MAX_SLUGS])
+    categories = sorted(set(GalleryImage.objects.values_list('category', flat=True).distinct()))
+    return {'details': details, 'categories': categories}
+
+
+# Scenarios: functions (rng, targets) -> [(endpoint label, path, htmx)] run in order by one client
+
+def home_scenario(rng, targets):
+    return [('home', reverse('home'), False), ('home content', reverse('home_content'), True)]
+
+
+def article_detail_scenario(rng, targets):
+    if not targets['details']:
+        return home_scenario(rng, targets)
+    return [('article detail', rng.choice(targets['details']), False)]
+
+
+def load_more_scenario(rng, targets):
+    list_name, load_more_name, size = rng.choice(LOAD_MORE)
+    steps = [('article list', reverse(list_name), False)]
+    offset = 9  # every list page renders nine items before its first load-more
+    for _ in range(rng.randint(1, 3)):
+        steps.append(('load more', f'{reverse(load_more_name)}?offset={offset}', True))
+        offset += size
+    return steps
+
+
+def search_scenario(rng, targets):
+    term = rng.choice(SEARCH_TERMS)
+    steps = [('search autocomplete', f'{reverse("search_autocomplete")}?q={term[:length]}', False)
+             for length in range(2, len(term) + 1)]
+    steps.append(('search', f'{reverse("search")}?q={term}', False))
+    return steps
+
+
+def gallery_scenario(rng, targets):
+    url = reverse('gallery')
+    category = rng.choice(targets['categories']) if targets['categories'] and rng.random() < 0.5 else ''
+    query = f'category={category}&' if category else ''
+    steps = [('gallery', f'{url}?{query}'.rstrip('?&'), False)]
+    steps.extend(('gallery page', f'{url}?{query}page={page}', True) for page in range(2, rng.randint(3, 5)))
+    return steps
+
+
+def calendar_scenario(rng, targets):
+    url = reverse('news_list')
+    month = timezone.localdate().replace(day=1)
+    direction = rng.choice((-1, 1))
+    steps = [('calendar', url, False)]
+    for _ in range(rng.randint(1, 4)):
+        month = (month + datetime.timedelta(days=32 * direction)).replace(day=1)
+        steps.append(('calendar month', f'{url}?year={month.year}&month={month.month}', False))
+    return steps
+
+
+SCENARIOS = {
+    # name: (weight, scenario)
+    'home': (30, home_scenario),
+    'article detail': (25, article_detail_scenario),
+    'load more': (15, load_more_scenario),
+    'search': (10, search_scenario),
+    'gallery': (10, gallery_scenario),
+    'calendar': (10, calendar_scenario),
+}
+
+
+class InProcessClient:
+    """Calls the WSGI application directly (no sockets)."""
+    name = 'in-process'
+
+    def __init__(self, host='localhost'):
+        from django.core.handlers.wsgi import WSGIHandler
+        from django.test import RequestFactory
+
+        self.handler = WSGIHandler()
+        self.factory = RequestFactory(HTTP_HOST=host)
+
+    def get(self, path, headers):
+        """(status code, Server-Timing header or '')."""
+        environ = self.factory.get(path, **{f'HTTP_{k.upper().replace("-", "_")}': v for k, v in headers.items()}).environ
+        started = []
+        response = self.handler(environ, lambda status, headers, exc_info=None: started.append((status, headers)))
+        try:
+            for _chunk in response:
+                pass
+        finally:
+            response.close()
+        status, response_headers = started[0]
+        return int(status.split()[0]), dict(response_headers).get('Server-Timing', '')
+
+
+class HTTPClient:
+    """Keep-alive HTTP client; one connection per worker thread."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.name = base_url
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+
+    def get(self, path, headers):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(self.netloc, timeout=30)
+        try:
+            connection.request('GET', self.prefix + path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status, response.getheader('Server-Timing', '')
+        except Exception:
+            connection.close()
+            self.local.connection = None
+            raise
+
+
+class CacheCounter:
+    """Context manager counting cache get() hits and misses on every configured cache backend class."""
+
+    def __init__(self):
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._patched = []
+
+    def __enter__(self):
+        from django.core.cache import caches
+
+        for cache_class in {type(caches[alias]) for alias in caches}:
+            original = cache_class.__dict__.get('get')
+            if original is not None:
+                cache_class.get = self._counting(original)
+                self._patched.append((cache_class, original))
+        return self
+
+    def __exit__(self, *exc):
+        for cache_class, original in self._patched:
+            cache_class.get = original
+        self._patched = []
+
+    def _counting(self, original):
+        missing = object()
+        counter = self
+
+        def get(cache, key, default=None, version=None):
+            value = original(cache, key, missing, version)
+            with counter._lock:
+                if value is missing:
+                    counter.misses += 1
+                else:
+                    counter.hits += 1
+            return default if value is missing else value
+        return get
+
+    @property
+    def ratio(self):
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else None
+
+
+def parse_server_timing(value):
+    """{metric: (ms, desc)} from a Server-Timing header value."""
+    return {name: (float(dur), desc or '') for name, dur, desc in _TIMING_METRIC.findall(value)}
+
+
+def summarize_server_timing(values):
+    """Mean ms per Server-Timing metric and the cache hit ratio over the timed responses."""
+    totals, hits, misses = {}, 0, 0
+    for value in values:
+        for name, (ms, desc) in parse_server_timing(value).items():
+            totals[name] = totals.get(name, 0) + ms
+            match = _CACHE_DESC.search(desc) if name == 'cache-get' else None
+            if match:
+                hits += int(match.group(1))
+                misses += int(match.group(2))
+    return {
+        'responses': len(values),
+        'mean_ms': {name: round(total / len(values), 2) for name, total in sorted(totals.items())},
+        'cache_hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+    }
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples, elapsed):
+    """Latency percentiles, throughput and error rate of [(ms, ok)]."""
+    latencies = sorted(ms for ms, _ok in samples)
+    errors = sum(1 for _ms, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0,
+        'latency_ms': {
+            'p50': _round(percentile(latencies, 50)),
+            'p95': _round(percentile(latencies, 95)),
+            'p99': _round(percentile(latencies, 99)),
+            'mean': _round(sum(latencies) / len(latencies)) if latencies else None,
+            'max': _round(latencies[-1]) if latencies else None,
+        },
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def run(client, concurrency=8, duration=30, warmup=5, max_requests=None, seed=None, scenarios=None, targets=None):
+    """
+    Run weighted scenarios from ``concurrency`` threads for ``duration`` seconds (after
+    ``warmup`` seconds whose requests are not counted) or until ``max_requests`` requests.
+    Returns the result dict.
+    """
+    scenarios = scenarios or SCENARIOS
+    targets = targets if targets is not None else discover_targets()
+    names = list(scenarios)
+    weights = [scenarios[name][0] for name in names]
+    samples = []  # (scenario, endpoint, ms, ok)
+    server_timings = []
+    lock = threading.Lock()
+    counted = [0]
+    started = time.monotonic()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    def budget_left():
+        return max_requests is None or counted[0] < max_requests
+
+    def worker(index):
+        rng = random.Random(None if seed is None else seed + index)
+        while time.monotonic() < deadline and budget_left():
+            name = rng.choices(names, weights)[0]
+            for endpoint, path, htmx in scenarios[name][1](rng, targets):
+                headers = {'HX-Request': 'true'} if htmx else {}
+                request_started = time.monotonic()
+                timing = ''
+                try:
+                    status, timing = client.get(path, headers)
+                    ok = status < 400
+                except Exception:
+                    ok = False
+                finished = time.monotonic()
+                if request_started >= measure_from:
+                    with lock:
+                        if not budget_left():
+                            return
+                        samples.append((name, endpoint, (finished - request_started) * 1000, ok))
+                        if timing:
+                            server_timings.append(timing)
+                        counted[0] += 1
+                if finished >= deadline:
+                    return
+
+    counter = CacheCounter() if isinstance(client, InProcessClient) else None
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    with counter if counter is not None else nullcontext():
+        if concurrency == 1:
+            worker(0)  # no thread needed (and the caller's database connection is reused)
+        else:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    elapsed = max(time.monotonic() - measure_from, 1e-9)
+
+    result = {
+        'target': client.name,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'seed': seed,
+        **summarize([(ms, ok) for _name, _endpoint, ms, ok in samples], elapsed),
+        'cache_hit_ratio': None,
+        'server_timing': summarize_server_timing(server_timings) if server_timings else None,
+        'scenarios': {},
+        'endpoints': {},
+    }
+    if counter is not None:
+        result['cache_hit_ratio'] = counter.ratio
+    elif server_timings:
+        result['cache_hit_ratio'] = result['server_timing']['cache_hit_ratio']
+    for key, position in (('scenarios', 0), ('endpoints', 1)):
+        groups = {}
+        for sample in samples:
+            groups.setdefault(sample[position], []).append((sample[2], sample[3]))
+        result[key] = {label: summarize(group, elapsed) for label, group in sorted(groups.items())}
+    return result
@@ -0,0 +1,110 @@
+"""
+Management command to backfill stored media metadata (width, height, bytes, format, SHA-256)
+for rows uploaded before it was recorded at upload time.
+Reads each file once from storage (GCS in production), in parallel, and writes in batches.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from church.media_metadata import (
+    METADATA_FIELDS, apply_metadata, media_metadata_models, perceptual_hash_enabled, read_stored_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Backfill media_width/height/bytes/format/sha256 (and phash) for all church models with an image or file field'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count rows that would be backfilled',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute metadata for every row, not just rows missing a hash',
+        )
+        parser.add_argument(
+            '--model',
+            action='append',
+            default=[],
+            help='Limit to these model names (e.g. GalleryImage); can be repeated',
+        )
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows per bulk_update')
+        parser.add_argument('--workers', type=int, default=8, help='Parallel storage reads')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        only = {name.lower() for name in options['model']}
+        batch_size = max(1, options['batch_size'])
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No rows will be updated'))
+
+        total_updated = 0
+        total_errors = 0
+        for model in media_metadata_models():
+            if only and model.__name__.lower() not in only:
+                continue
+            field = model.media_field
+            qs = model._default_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            if not options['force']:
+                missing = Q(media_sha256='')
+                if perceptual_hash_enabled():
+                    missing |= Q(media_phash='', media_width__isnull=False)
+                qs = qs.filter(missing)
+            qs = qs.only('pk', field, *METADATA_FIELDS).order_by('pk')
+
+            count = qs.count()
+            self.stdout.write(f'\n--- {model.__name__}: {count} row(s) ---')
+            if dry_run or not count:
+                continue
+
+            with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+                for chunk in _chunks(qs.iterator(chunk_size=batch_size), batch_size):
+                    batch = []
+                    for obj, meta, error in pool.map(self._read, chunk):
+                        if error:
+                            total_errors += 1
+                            self.stdout.write(self.style.WARNING(f'  {model.__name__} #{obj.pk}: {error}'))
+                            continue
+                        apply_metadata(obj, meta)
+                        batch.append(obj)
+                    total_updated += self._flush(model, batch)
+                    self.stdout.write(f'  {total_updated} row(s) updated so far')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nDone. Updated {total_updated} row(s), {total_errors} error(s).'
+        ))
+
+    def _read(self, obj):
+        try:
+            return obj, read_stored_metadata(obj.media_file), None
+        except Exception as e:
+            return obj, None, e
+
+    def _flush(self, model, batch):
+        if not batch:
+            return 0
+        # bulk_update skips save() and post_save, so caches and thumbnails are untouched
+        with transaction.atomic():
+            model._default_manager.bulk_update(batch, METADATA_FIELDS)
+        return len(batch)
@@ -0,0 +1,32 @@
+"""
+Management command to EXPLAIN the hot public queries and check they use their partial indexes.
+
+    python manage.py check_query_plans            # fails if any query misses its index
+    python manage.py check_query_plans -v 2       # also print every plan
+
+Run it after migrating a new database (or changing Meta.indexes) on the backend production uses.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from church.query_plans import check_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot public queries and check that they use the expected indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='DATABASES alias to check')
+
+    def handle(self, *args, **options):
+        misses = []
+        for label, index_name, used, plan in check_plans(options['database']):
+            if used:
+                self.stdout.write(f'{label}: uses {index_name}')
+            else:
+                misses.append(label)
+                self.stdout.write(self.style.WARNING(f'{label}: does not use {index_name}'))
+            if options['verbosity'] >= 2 or not used:
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+        if misses:
+            raise CommandError(f'{len(misses)} hot query plan(s) miss their index: {", ".join(misses)}')
+        self.stdout.write(self.style.SUCCESS('All hot queries use their indexes.'))
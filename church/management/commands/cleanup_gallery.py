@@ -1,22 +1,61 @@
 from django.core.management.base import BaseCommand
+from django.db.models import CharField, Count, F, Min, Value
+from django.db.models.functions import Concat, Lower, Trim
 from church.models import GalleryImage
 
 class Command(BaseCommand):
-    help = 'Aggressively clean up duplicate gallery images'
+    help = 'Clean up duplicate gallery images (same file content, grouped in the database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report duplicates without deleting them',
+        )
+        parser.add_argument(
+            '--perceptual',
+            action='store_true',
+            help='Also treat images with the same perceptual hash (re-encoded/resized copies) as duplicates',
+        )
+        parser.add_argument(
+            '--by-caption',
+            action='store_true',
+            help='Legacy aggressive mode: also treat rows with the same caption + category as duplicates',
+        )
 
     def handle(self, *args, **options):
-        items = list(GalleryImage.objects.all().order_by('id'))
-        seen = set()
+        # Older rows need backfill_media_metadata first so they have hashes to group on
+        keys = [('sha256', F('media_sha256'))]
+        if options['perceptual']:
+            keys.append(('perceptual hash', F('media_phash')))
+        if options['by_caption']:
+            keys.append(('caption + category', Concat(
+                Lower(Trim('caption')), Value('|'), Lower(Trim('category')), output_field=CharField(),
+            )))
+
         count = 0
-        for g in items:
-            # Aggressive key: stripped and lowercase caption + category
-            caption = str(g.caption).strip().lower()
-            category = str(g.category).strip().lower()
-            k = f"{caption}|{category}"
-            
-            if k in seen:
-                g.delete()
-                count += 1
-            else:
-                seen.add(k)
-        self.stdout.write(self.style.SUCCESS(f'Successfully deleted {count} duplicate gallery images.'))
+        for label, key in keys:
+            count += self._dedupe(label, key, options['dry_run'])
+
+        verb = 'Would delete' if options['dry_run'] else 'Successfully deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {count} duplicate gallery images.'))
+
+    def _dedupe(self, label, key, dry_run):
+        """Keep the oldest row (lowest id) of each group sharing ``key``; delete the rest in bulk."""
+        qs = GalleryImage.objects.annotate(dedupe_key=key).exclude(dedupe_key='')
+        groups = list(
+            qs.values('dedupe_key').annotate(rows=Count('id'), keep_id=Min('id')).filter(rows__gt=1)
+        )
+        if not groups:
+            self.stdout.write(f'No duplicates by {label}.')
+            return 0
+
+        duplicates = qs.filter(
+            dedupe_key__in=[g['dedupe_key'] for g in groups]
+        ).exclude(id__in=[g['keep_id'] for g in groups])
+        total = duplicates.count()
+        self.stdout.write(f'{len(groups)} group(s) by {label}: {total} duplicate row(s).')
+        if not dry_run and total:
+            # Files stay in storage (other rows may share them); gc_media removes unreferenced ones
+            duplicates.delete()
+        return total
@@ -0,0 +1,182 @@
+"""
+Management command to find and delete orphaned media: originals no longer referenced by any
+church model, plus their easy_thumbnails outputs and .webp/.avif siblings.
+
+Only the upload_to directories of church models are scanned (CKEditor uploads and anything
+else in the bucket are never touched). Each directory is listed in its own thread, using
+paged blob listing on GCS and a directory walk on the local filesystem.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import os
+import time
+import logging
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from easy_thumbnails.models import Source, Thumbnail
+
+from church.media_metadata import media_metadata_models
+from church.thumbnail_manifest import MANIFEST_FIELD
+
+logger = logging.getLogger(__name__)
+
+
+def _list_prefix(storage, prefix, page_size):
+    """Return [(name, modified_datetime_or_None)] for every file under ``prefix``."""
+    bucket = getattr(storage, 'bucket', None)
+    if bucket is not None:
+        # GCS: flat paged listing instead of one listdir() round trip per directory
+        location = getattr(storage, 'location', '') or ''
+        full_prefix = f'{location.rstrip("/")}/{prefix}' if location else prefix
+        files = []
+        for blob in bucket.list_blobs(prefix=full_prefix, page_size=page_size):
+            name = blob.name[len(location):].lstrip('/') if location else blob.name
+            files.append((name, blob.updated))
+        return files
+
+    files = []
+    pending = [prefix.rstrip('/')]
+    while pending:
+        directory = pending.pop()
+        try:
+            dirs, names = storage.listdir(directory)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        pending.extend(f'{directory}/{d}' for d in dirs)
+        for name in names:
+            path = f'{directory}/{name}'
+            try:
+                modified = storage.get_modified_time(path)
+            except Exception:
+                modified = None
+            files.append((path, modified))
+    return files
+
+
+def _stems(name):
+    """'dir/photo.800x600_crop.jpg' -> {'dir/photo', 'dir/photo.800x600_crop'} (candidate source stems)."""
+    directory, base = os.path.split(name)
+    stems = set()
+    for i, char in enumerate(base):
+        if char == '.' and i:
+            stems.add(os.path.join(directory, base[:i]))
+    return stems
+
+
+class Command(BaseCommand):
+    help = 'Report or delete orphaned media originals, thumbnails and WebP/AVIF siblings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report orphans without deleting anything',
+        )
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=24,
+            help='Skip files modified more recently than this (uploads in flight)',
+        )
+        parser.add_argument('--rate', type=float, default=20, help='Maximum deletes per second')
+        parser.add_argument('--workers', type=int, default=8, help='Directories listed in parallel')
+        parser.add_argument('--page-size', type=int, default=1000, help='Blobs per listing page (GCS)')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No files will be deleted'))
+
+        prefixes, referenced = self._referenced_names()
+        referenced_stems = {os.path.splitext(name)[0] for name in referenced}
+        self.stdout.write(f'Referenced originals: {len(referenced)} in {len(prefixes)} director(ies)')
+
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            listings = pool.map(
+                lambda prefix: (prefix, _list_prefix(default_storage, prefix, options['page_size'])),
+                sorted(prefixes),
+            )
+            stored = []
+            for prefix, files in listings:
+                self.stdout.write(f'  {prefix}: {len(files)} file(s)')
+                stored.extend(files)
+
+        cutoff = timezone.now() - timedelta(hours=options['min_age_hours'])
+        orphans = []
+        for name, modified in stored:
+            if name in referenced or _stems(name) & referenced_stems:
+                continue
+            if modified is not None and timezone.is_naive(modified):
+                modified = timezone.make_aware(modified)
+            if modified is not None and modified > cutoff:
+                continue
+            orphans.append(name)
+
+        # easy_thumbnails rows whose source file is no longer referenced
+        in_prefixes = Q()
+        for prefix in prefixes:
+            in_prefixes |= Q(name__startswith=f'{prefix}/')
+        orphan_sources = (
+            Source.objects.filter(in_prefixes).exclude(name__in=referenced)
+            if prefixes else Source.objects.none()
+        )
+        orphan_source_count = orphan_sources.count()
+        orphan_thumbnail_count = Thumbnail.objects.filter(source__in=orphan_sources).count()
+
+        self.stdout.write(
+            f'\nOrphaned files: {len(orphans)} of {len(stored)}; '
+            f'orphaned thumbnail DB rows: {orphan_source_count} source(s), {orphan_thumbnail_count} thumbnail(s)'
+        )
+        for name in orphans[:50]:
+            self.stdout.write(f'  {name}')
+        if len(orphans) > 50:
+            self.stdout.write(f'  ... and {len(orphans) - 50} more')
+
+        if dry_run:
+            return
+
+        deleted, errors = self._delete(orphans, options['rate'])
+        orphan_sources.delete()  # cascades to Thumbnail rows
+        self.stdout.write(self.style.SUCCESS(
+            f'\nDeleted {deleted} file(s) ({errors} error(s)) and {orphan_source_count} thumbnail source row(s).'
+        ))
+
+    def _referenced_names(self):
+        """Upload directories of church models and every file name stored in their fields/manifests."""
+        prefixes = set()
+        referenced = set()
+        for model in media_metadata_models():
+            field = model._meta.get_field(model.media_field)
+            if isinstance(field.upload_to, str) and field.upload_to:
+                prefixes.add(field.upload_to.rstrip('/'))
+            for name, manifest in model._default_manager.values_list(model.media_field, MANIFEST_FIELD).iterator():
+                if name:
+                    referenced.add(name)
+                for entry in (manifest or {}).values():
+                    for spec in (entry.get('specs') or {}).values():
+                        if spec.get('name'):
+                            referenced.add(spec['name'])
+        # Thumbnails easy_thumbnails still tracks for referenced sources
+        referenced.update(
+            Thumbnail.objects.filter(source__name__in=referenced).values_list('name', flat=True)
+        )
+        return prefixes, referenced
+
+    def _delete(self, names, rate):
+        interval = 1.0 / rate if rate and rate > 0 else 0
+        deleted = errors = 0
+        for name in names:
+            started = time.monotonic()
+            try:
+                default_storage.delete(name)
+                deleted += 1
+            except Exception as e:
+                errors += 1
+                logger.warning(f"gc_media: failed to delete {name}: {e}")
+            elapsed = time.monotonic() - started
+            if interval > elapsed:
+                time.sleep(interval - elapsed)
+        return deleted, errors
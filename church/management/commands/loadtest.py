@@ -0,0 +1,55 @@
+"""
+Management command to load-test the site with concurrent clients running weighted user scenarios.
+
+    python manage.py loadtest                                  # in-process, 8 clients, 30s
+    python manage.py loadtest --url http://127.0.0.1:8000 --concurrency 32 --duration 60
+    python manage.py loadtest --output before.json             # compare with a later after.json
+
+Scenarios (church.loadtest.SCENARIOS): home shell + home-content, article detail, load-more
+chains, search autocomplete typing, gallery paging, calendar month flips. The JSON result has
+p50/p95/p99 latency, throughput and error rate overall, per scenario and per endpoint, and the
+cache hit ratio (in-process, or from the Server-Timing headers of a server started with
+SERVER_TIMING_SAMPLE_RATE=1). Seed a database first with seed_perf_data for repeatable runs.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from church.loadtest import SCENARIOS, HTTPClient, InProcessClient, run
+
+
+class Command(BaseCommand):
+    help = 'Drive the site (in-process or a local server URL) with concurrent weighted scenarios and report latency as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server (default: call the WSGI app in-process)')
+        parser.add_argument('--host', default='localhost', help='Host header for in-process requests')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (threads)')
+        parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+        parser.add_argument('--warmup', type=float, default=5, help='Seconds of uncounted requests first')
+        parser.add_argument('--requests', type=int, help='Stop after this many measured requests')
+        parser.add_argument('--seed', type=int, help='Random seed for scenario choices')
+        parser.add_argument('--scenarios', nargs='*', choices=sorted(SCENARIOS), help='Only these scenarios')
+        parser.add_argument('--output', help='Write the JSON result to this file')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1.')
+        client = HTTPClient(options['url']) if options['url'] else InProcessClient(options['host'])
+        scenarios = {name: SCENARIOS[name] for name in options['scenarios']} if options['scenarios'] else None
+
+        result = run(
+            client, concurrency=options['concurrency'], duration=options['duration'], warmup=options['warmup'],
+            max_requests=options['requests'], seed=options['seed'], scenarios=scenarios,
+        )
+        report = json.dumps(result, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report + '\n')
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{result['requests']} requests, {result['throughput_rps']} req/s, p50 {latency['p50']}ms, "
+                f"p95 {latency['p95']}ms, p99 {latency['p99']}ms, errors {result['error_rate']:.2%} -> {options['output']}"
+            )
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,57 @@
+"""
+Management command to fill an empty local database with synthetic content for load and scaling tests.
+
+    python manage.py seed_perf_data                          # small production-like site
+    python manage.py seed_perf_data --scale 10               # 10x every table
+    python manage.py seed_perf_data --scale 100 --page-views 5000000
+
+Volumes default to church.perf_data.DEFAULT_VOLUMES times --scale; the per-table options
+override single volumes. The same --seed and volumes always produce the same rows. Rows are
+bulk-created and committed in batches, so millions of page views never sit in memory (or in one
+transaction) at once. Run it against a scratch database (e.g. a fresh db.sqlite3 after migrate):
+it refuses to seed twice, so after an interrupted run start again from a fresh database.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from church.perf_data import ARTICLE_MODELS, DEFAULT_SEED, DEFAULT_VOLUMES, scaled_volumes, seed_dataset
+
+
+class Command(BaseCommand):
+    help = 'Create deterministic synthetic content (articles, gallery, events, comments, page views) at a chosen scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1, help='Multiply every table size (default 1)')
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Random seed (same seed, same data)')
+        parser.add_argument('--articles', type=int, help=f'Articles per content type (default {DEFAULT_VOLUMES["articles"]} x scale)')
+        parser.add_argument('--gallery', type=int, help=f'Gallery items (default {DEFAULT_VOLUMES["gallery"]} x scale)')
+        parser.add_argument('--gallery-images', type=int, help='Distinct generated gallery image files')
+        parser.add_argument('--events', type=int, help=f'Calendar events (default {DEFAULT_VOLUMES["events"]} x scale)')
+        parser.add_argument('--comments', type=int, help=f'Comments per article (default {DEFAULT_VOLUMES["comments"]})')
+        parser.add_argument('--page-views', type=int, help=f'PageView rows (default {DEFAULT_VOLUMES["page_views"]} x scale)')
+        parser.add_argument('--images', type=int, help=f'Image files per upload directory (default {DEFAULT_VOLUMES["images"]})')
+        parser.add_argument('--force', action='store_true', help='Seed even with DEBUG off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to seed synthetic data with DEBUG off (use --force on a scratch database).')
+        if options['scale'] <= 0:
+            raise CommandError('--scale must be positive.')
+        seeded = [model._meta.label for model in ARTICLE_MODELS
+                  if model.objects.filter(slug=f'{model._meta.model_name}-00000').exists()]
+        if seeded:
+            raise CommandError(f'{", ".join(seeded)} already hold synthetic rows; seed a fresh database instead.')
+
+        volumes = scaled_volumes(
+            options['scale'],
+            articles=options['articles'], gallery=options['gallery'], gallery_images=options['gallery_images'],
+            events=options['events'], comments=options['comments'], page_views=options['page_views'],
+            images=options['images'],
+        )
+        started = time.monotonic()
+        counts = seed_dataset(volumes, seed=options['seed'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {sum(counts.values())} rows in {time.monotonic() - started:.1f}s (seed {options["seed"]}).'
+        ))
@@ -0,0 +1,252 @@
+"""
+Management command to copy database content between databases in streamed, pk-ordered chunks.
+
+    # Neon -> local, directly
+    python manage.py sync_db --source "$NEON_URL" --target default
+    # or through a file (NDJSON, .gz to compress)
+    python manage.py sync_db --source "$NEON_URL" --output neon.ndjson.gz
+    python manage.py sync_db --input neon.ndjson.gz
+
+    # only what changed since the last run, plus the media those rows use
+    python manage.py sync_db --source "$NEON_URL" --incremental --media-bucket "$GS_BUCKET_NAME"
+
+--source / --target take a DATABASES alias or a database URL. Rows are upserted by primary
+key, so re-running a sync is safe; --prune also deletes target rows missing from the source.
+Incremental runs rely on each model's auto_now column (updated_at), or auto_now_add when it
+has none - those models pick up new rows but not edits. Deletes are replayed from the source's
+SyncTombstone rows; --prune-tombstones drops the ones older than every watermark this target holds.
+"""
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from church.db_sync import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_EXCLUDE, WATERMARK_OVERLAP, apply_tombstones, get_watermark, iter_changed_chunks,
+    iter_chunks, load_records, open_ndjson, prune, prune_tombstones, read_ndjson_batches, referenced_media,
+    register_database, reset_sequences, select_models, serialize_chunk, set_watermark, source_key,
+    tombstoned_models, watermark_field, write_ndjson,
+)
+from church.media_sync import GCSBucket, LocalBucket, SyncManifest, pull_files
+
+TOMBSTONES = '__tombstones__'  # watermark key for replayed deletes
+
+
+def _database(value, alias):
+    if not value:
+        return None
+    if value in connections.settings:
+        return value
+    if '://' in value:
+        return register_database(alias, value)
+    raise CommandError(f'Unknown database "{value}" (use a DATABASES alias or a database URL)')
+
+
+class Command(BaseCommand):
+    help = 'Stream database content between databases or NDJSON files in pk-ordered chunks (upsert)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='DATABASES alias or database URL to read from')
+        parser.add_argument('--target', default='default', help='DATABASES alias or database URL to write to')
+        parser.add_argument('--output', help='Write NDJSON to this file instead of loading (.gz compresses)')
+        parser.add_argument('--input', help='Load NDJSON from this file instead of reading a database')
+        parser.add_argument('--models', nargs='*', help='Only these models (app_label.ModelName)')
+        parser.add_argument('--exclude', nargs='*', default=[], help='Extra app labels or models to skip')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per chunk / transaction')
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete target rows that are not in the source (per model)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count rows per model',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only copy rows changed since the last run from this source, and replay its deletes',
+        )
+        parser.add_argument(
+            '--prune-tombstones',
+            action='store_true',
+            help='With --incremental: delete source tombstones older than the oldest watermark '
+                 '(only when this target is the only one syncing from the source)',
+        )
+        parser.add_argument('--media-bucket', help='With --incremental: pull the media of copied rows from this GCS bucket')
+        parser.add_argument('--media-remote-dir', help='With --incremental: pull media from this directory instead')
+        parser.add_argument('--media-dir', default=str(settings.MEDIA_ROOT), help='Where pulled media goes (default MEDIA_ROOT)')
+        parser.add_argument(
+            '--media-manifest',
+            default=str(settings.BASE_DIR / '.media_sync_manifest.json'),
+            help='Checksum manifest shared with sync_media ("" to disable)',
+        )
+        parser.add_argument('--workers', type=int, default=8, help='Parallel media downloads')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        chunk_size = max(1, options['chunk_size'])
+        exclude = tuple(DEFAULT_EXCLUDE) + tuple(options['exclude'])
+        models = select_models(options['models'], exclude)
+
+        if options['input']:
+            if options['source'] or options['output']:
+                raise CommandError('--input cannot be combined with --source or --output')
+            return self._load_file(options['input'], models, _database(options['target'], 'sync_target'), chunk_size, options)
+
+        source = _database(options['source'], 'sync_source')
+        if not source:
+            raise CommandError('Pass --source (or --input)')
+
+        if options['incremental']:
+            if options['output']:
+                raise CommandError('--incremental loads into --target; it cannot write --output')
+            return self._incremental(source, _database(options['target'], 'sync_target'), models, chunk_size, options)
+
+        if options['dry_run']:
+            for model in models:
+                count = model._base_manager.using(source).count()
+                self.stdout.write(f'{model._meta.label}: {count} row(s)')
+            return
+
+        if options['output']:
+            return self._dump(source, options['output'], models, chunk_size)
+
+        target = _database(options['target'], 'sync_target')
+        if connections.settings[source] == connections.settings[target]:
+            raise CommandError('Source and target are the same database')
+        started = time.monotonic()
+        loaded = []
+        for model in models:
+            seen = set() if options['prune'] else None
+            total = 0
+            for chunk in iter_chunks(model, source, chunk_size):
+                total += load_records(model, serialize_chunk(chunk), target)
+                if seen is not None:
+                    seen.update(obj.pk for obj in chunk)
+                self._progress(model, total)
+            self._finish_model(model, total, target, seen)
+            loaded.append(model)
+        reset_sequences(loaded, target)
+        self.stdout.write(self.style.SUCCESS(f'Synced {len(loaded)} model(s) in {time.monotonic() - started:.1f}s.'))
+
+    def _incremental(self, source, target, models, chunk_size, options):
+        if connections.settings[source] == connections.settings[target]:
+            raise CommandError('Source and target are the same database')
+        key = source_key(source)
+        started = time.monotonic()
+        media = set()
+        loaded = []
+        for model in models:
+            label = model._meta.label_lower
+            field = watermark_field(model)
+            since = get_watermark(target, key, label) if field else None
+            if since is not None:
+                since -= WATERMARK_OVERLAP
+            if options['dry_run']:
+                queryset = model._base_manager.using(source)
+                if since is not None:
+                    queryset = queryset.filter(**{f'{field}__gte': since})
+                self.stdout.write(f'{model._meta.label}: {queryset.count()} changed row(s)')
+                continue
+
+            chunks = iter_changed_chunks(model, source, field, since, chunk_size) if field else iter_chunks(model, source, chunk_size)
+            total = 0
+            newest = None
+            for chunk in chunks:
+                total += load_records(model, serialize_chunk(chunk), target)
+                media |= referenced_media(chunk)
+                if field:
+                    newest = max(newest, getattr(chunk[-1], field)) if newest else getattr(chunk[-1], field)
+                self._progress(model, total)
+            if newest is not None:
+                set_watermark(target, key, label, newest)
+            if total:
+                loaded.append(model)
+            self.stdout.write(f'{model._meta.label}: {total} row(s)' + ('' if field else ' (no timestamp column: full copy)'))
+
+        if options['dry_run']:
+            return
+        selected = {m._meta.label_lower for m in models}
+        labels = [m._meta.label_lower for m in tombstoned_models() if m._meta.label_lower in selected]
+        since = get_watermark(target, key, TOMBSTONES)
+        deleted, newest = apply_tombstones(source, target, since - WATERMARK_OVERLAP if since else None, labels)
+        if newest is not None:
+            set_watermark(target, key, TOMBSTONES, newest)
+        reset_sequences(loaded, target)
+        self.stdout.write(f'Deleted {deleted} row(s) removed in the source.')
+        if options['prune_tombstones']:
+            self.stdout.write(f'Pruned {prune_tombstones(source, target, key)} tombstone(s) in the source.')
+
+        bucket = None
+        if options['media_remote_dir']:
+            bucket = LocalBucket(options['media_remote_dir'])
+        elif options['media_bucket']:
+            bucket = GCSBucket(options['media_bucket'], getattr(settings, 'GS_LOCATION', '') or '')
+        if bucket is not None and media:
+            manifest = SyncManifest(options['media_manifest'] or None)
+            downloaded, unchanged, missing, errors = pull_files(
+                bucket, media, options['media_dir'], manifest, options['workers'],
+            )
+            manifest.save()
+            self.stdout.write(
+                f'Media: {downloaded} downloaded, {unchanged} unchanged, {missing} not in bucket, {errors} error(s).'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Incremental sync done in {time.monotonic() - started:.1f}s.'))
+
+    def _dump(self, source, path, models, chunk_size):
+        started = time.monotonic()
+        with open_ndjson(path, 'w') as handle:
+            for model in models:
+                total = 0
+                for chunk in iter_chunks(model, source, chunk_size):
+                    write_ndjson(handle, serialize_chunk(chunk))
+                    total += len(chunk)
+                    self._progress(model, total)
+                self.stdout.write(f'{model._meta.label}: {total} row(s)')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {path} in {time.monotonic() - started:.1f}s.'))
+
+    def _load_file(self, path, models, target, chunk_size, options):
+        selected = {model._meta.label_lower for model in models}
+        started = time.monotonic()
+        counts = {}
+        seen = {}
+        current = None
+        with open_ndjson(path, 'r') as handle:
+            for label, records in read_ndjson_batches(handle, chunk_size):
+                if label not in selected:
+                    continue
+                model = apps.get_model(label)
+                if current is not None and model is not current:
+                    self._finish_model(current, counts[current], target, seen.get(current))
+                current = model
+                if options['dry_run']:
+                    counts[model] = counts.get(model, 0) + len(records)
+                    continue
+                counts[model] = counts.get(model, 0) + load_records(model, records, target)
+                if options['prune']:
+                    seen.setdefault(model, set()).update(
+                        model._meta.pk.to_python(record['pk']) for record in records
+                    )
+                self._progress(model, counts[model])
+        if current is not None:
+            self._finish_model(current, counts[current], target, seen.get(current))
+        if options['dry_run']:
+            return
+        reset_sequences(list(counts), target)
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {sum(counts.values())} row(s) of {len(counts)} model(s) in {time.monotonic() - started:.1f}s.'
+        ))
+
+    def _progress(self, model, total):
+        if self.verbosity >= 2:
+            self.stdout.write(f'  {model._meta.label}: {total}...')
+
+    def _finish_model(self, model, total, target, seen):
+        line = f'{model._meta.label}: {total} row(s)'
+        if seen is not None:
+            line += f', pruned {prune(model, seen, target)}'
+        self.stdout.write(line)
@@ -0,0 +1,113 @@
+"""
+Management command to sync media between MEDIA_ROOT and the GCS bucket.
+
+Replaces download_media.py (sequential, whole-bucket, skip-if-exists): both sides are
+listed once, compared by checksum, and only differing files transfer, on a thread pool.
+Local checksums are kept in a resumable manifest so re-runs don't re-hash unchanged files.
+Database content is synced separately (sync_neon.py / load_production_data.py).
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from church.media_sync import GCSBucket, LocalBucket, SyncManifest, download_to, list_local, plan_sync
+
+logger = logging.getLogger(__name__)
+
+SAVE_EVERY = 100  # transfers between manifest checkpoints
+
+
+class Command(BaseCommand):
+    help = 'Sync media files between MEDIA_ROOT and the GCS bucket (checksum-aware, concurrent, resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'direction',
+            choices=['pull', 'push', 'both'],
+            help='pull: bucket -> local, push: local -> bucket, both: copy missing files each way',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only show what would be transferred',
+        )
+        parser.add_argument('--bucket', default=os.environ.get('GS_BUCKET_NAME', ''), help='GCS bucket (default GS_BUCKET_NAME)')
+        parser.add_argument('--prefix', default=getattr(settings, 'GS_LOCATION', '') or '', help='Object prefix in the bucket')
+        parser.add_argument('--remote-dir', help='Use a local directory in place of the bucket')
+        parser.add_argument('--local-dir', default=str(settings.MEDIA_ROOT), help='Local media directory (default MEDIA_ROOT)')
+        parser.add_argument(
+            '--manifest',
+            default=str(settings.BASE_DIR / '.media_sync_manifest.json'),
+            help='Checksum manifest used to resume and skip re-hashing ("" to disable)',
+        )
+        parser.add_argument(
+            '--prefer',
+            choices=['local', 'remote'],
+            help='With "both": which side wins when a file differs (default: report as conflict)',
+        )
+        parser.add_argument('--workers', type=int, default=8, help='Parallel transfers')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No files will be transferred'))
+
+        if options['remote_dir']:
+            bucket = LocalBucket(options['remote_dir'])
+        elif options['bucket']:
+            try:
+                bucket = GCSBucket(options['bucket'], options['prefix'])
+            except Exception as e:
+                raise CommandError(f'Could not open bucket {options["bucket"]}: {e}')
+        else:
+            raise CommandError('Set GS_BUCKET_NAME, or pass --bucket or --remote-dir')
+
+        local_dir = options['local_dir']
+        manifest = SyncManifest(options['manifest'] or None)
+
+        self.stdout.write(f'Listing {bucket.label} and {local_dir}...')
+        remote_objects = bucket.list()
+        local_files = list_local(local_dir)
+        plan = plan_sync(remote_objects, local_files, manifest, options['direction'], options['prefer'])
+        manifest.save()
+
+        self.stdout.write(
+            f'Remote: {len(remote_objects)}, local: {len(local_files)}, unchanged: {plan["unchanged"]}, '
+            f'to download: {len(plan["download"])}, to upload: {len(plan["upload"])}, '
+            f'conflicts: {len(plan["conflicts"])}'
+        )
+        for label, names in (('<', plan['download']), ('>', plan['upload']), ('!', plan['conflicts'])):
+            for name in names[:50]:
+                self.stdout.write(f'  {label} {name}')
+            if len(names) > 50:
+                self.stdout.write(f'  {label} ... and {len(names) - 50} more')
+
+        if dry_run:
+            return
+
+        jobs = [(download_to, (bucket, name, local_dir, manifest)) for name in plan['download']]
+        jobs += [(self._upload, (bucket, name, local_files[name], manifest)) for name in plan['upload']]
+        done = errors = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {pool.submit(func, *args): args[1] for func, args in jobs}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as e:
+                    errors += 1
+                    logger.warning(f"sync_media: {futures[future]} failed: {e}")
+                    self.stdout.write(self.style.WARNING(f'  failed: {futures[future]}: {e}'))
+                if done and done % SAVE_EVERY == 0:
+                    manifest.save()
+        manifest.save()
+
+        self.stdout.write(self.style.SUCCESS(f'Transferred {done} file(s), {errors} error(s).'))
+
+    @staticmethod
+    def _upload(bucket, name, path, manifest):
+        bucket.upload(path, name)
+        manifest.checksums(name, path)
@@ -0,0 +1,48 @@
+"""
+Content-hash fingerprinting for media names (enabled with MEDIA_FINGERPRINT).
+
+Fingerprinted names carry the first 16 hex chars of the file's SHA-256 as their own dot
+segment (``gallery/photo.3f2a9c1b7d4e5f60.jpg``), and thumbnails / .webp siblings inherit it
+from their source. A name can then never point at different bytes, so it is served with
+``Cache-Control: public, max-age=31536000, immutable`` by serve_media, nginx and GCS.
+"""
+import os
+import re
+
+from django.conf import settings
+
+FINGERPRINT_LENGTH = 16
+FINGERPRINT_RE = re.compile(r'\.[0-9a-f]{%d}\.' % FINGERPRINT_LENGTH)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def fingerprint_enabled():
+    return getattr(settings, 'MEDIA_FINGERPRINT', False)
+
+
+def is_fingerprinted(name):
+    return bool(name) and bool(FINGERPRINT_RE.search(os.path.basename(name)))
+
+
+def fingerprint_name(name, sha256):
+    """'dir/photo.jpg' + hash -> 'dir/photo.<hash16>.jpg' (unchanged if already fingerprinted)."""
+    if not sha256 or is_fingerprinted(name):
+        return name
+    base, ext = os.path.splitext(name)
+    return f'{base}.{sha256[:FINGERPRINT_LENGTH]}{ext}'
+
+
+def source_fingerprint(thumbnailer):
+    """
+    Fingerprint segment for a thumbnail source: '' when the source name already has one,
+    else the owning instance's stored media hash (MediaMetadataModel), if any.
+    """
+    name = getattr(thumbnailer, 'name', '') or ''
+    if is_fingerprinted(name):
+        return ''
+    instance = getattr(thumbnailer, 'instance', None)
+    field = getattr(thumbnailer, 'field', None)
+    if instance is None or getattr(instance, 'media_field', None) != getattr(field, 'name', None):
+        return ''
+    sha256 = getattr(instance, 'media_sha256', '') or ''
+    return sha256[:FINGERPRINT_LENGTH]
@@ -0,0 +1,135 @@
+"""
+Intrinsic metadata for uploaded media (see models.MediaMetadataModel).
+
+Metadata is read once, while the upload is still in memory (pre_save), and afterwards only
+by the ``backfill_media_metadata`` command. Nothing at request time reads image bytes for it.
+
+The SHA-256 also makes uploads content-addressed: with MEDIA_DEDUPLICATE a new upload whose
+hash is already stored reuses that file (and therefore its thumbnails) instead of saving a copy.
+"""
+import hashlib
+import logging
+import os
+
+from django.apps import apps
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = ('media_width', 'media_height', 'media_bytes', 'media_format', 'media_sha256', 'media_phash')
+PHASH_SIZE = 8  # 8x8 difference hash -> 64 bits
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def empty_metadata():
+    return {
+        'media_width': None,
+        'media_height': None,
+        'media_bytes': None,
+        'media_format': '',
+        'media_sha256': '',
+        'media_phash': '',
+    }
+
+
+def perceptual_hash_enabled():
+    return getattr(settings, 'MEDIA_PERCEPTUAL_HASH', False)
+
+
+def perceptual_hash(img):
+    """
+    64-bit difference hash (dHash) of a PIL image as 16 hex chars. Re-encodes, resizes and
+    small edits of the same photo produce the same or a very close hash.
+    """
+    from PIL import Image, ImageOps
+
+    img = ImageOps.exif_transpose(img)
+    gray = img.convert('L').resize((PHASH_SIZE + 1, PHASH_SIZE), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    bits = 0
+    for row in range(PHASH_SIZE):
+        for col in range(PHASH_SIZE):
+            left = pixels[row * (PHASH_SIZE + 1) + col]
+            right = pixels[row * (PHASH_SIZE + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return '%016x' % bits
+
+
+def read_metadata(file, name=''):
+    """
+    Read width, height, size, format and SHA-256 from an open binary file object. The caller
+    owns opening/closing it (an in-flight upload must stay open for storage to save it).
+    Non-images keep width/height empty and use the extension of ``name`` as format.
+    """
+    from PIL import Image
+
+    meta = empty_metadata()
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    try:
+        # Image.open only parses the header; no full decode
+        img = Image.open(file)
+        width, height = img.size
+        if img.getexif().get(0x0112) in (5, 6, 7, 8):
+            # EXIF orientation rotates by 90°: report the displayed size
+            width, height = height, width
+        meta['media_width'], meta['media_height'] = width, height
+        if perceptual_hash_enabled():
+            # Needs a full decode, so it's opt-in (MEDIA_PERCEPTUAL_HASH)
+            img.draft('L', (PHASH_SIZE * 8, PHASH_SIZE * 8))
+            meta['media_phash'] = perceptual_hash(img)
+        meta['media_format'] = (img.format or '').lower()
+    except Exception:
+        meta['media_format'] = os.path.splitext(name or '')[1].lstrip('.').lower()[:10]
+    file.seek(0)
+    meta['media_bytes'] = size
+    meta['media_sha256'] = digest.hexdigest()
+    return meta
+
+
+def read_stored_metadata(field_file):
+    """Metadata for a file already in storage (used by the backfill command)."""
+    with field_file.storage.open(field_file.name, 'rb') as f:
+        return read_metadata(f, field_file.name)
+
+
+def apply_metadata(instance, meta):
+    for field, value in meta.items():
+        setattr(instance, field, value)
+
+
+def media_metadata_models():
+    """Concrete church models that carry media metadata columns."""
+    from .models import MediaMetadataModel
+
+    return [
+        model for model in apps.get_app_config('church').get_models()
+        if issubclass(model, MediaMetadataModel)
+    ]
+
+
+def find_stored_duplicate(sha256, exclude=None):
+    """
+    Name of an already-stored file with this SHA-256 (from any media model), or None.
+    ``exclude`` is the instance being saved, so it never matches itself.
+    """
+    if not sha256:
+        return None
+    from django.core.files.storage import default_storage
+
+    for model in media_metadata_models():
+        qs = model._default_manager.filter(media_sha256=sha256).exclude(**{model.media_field: ''})
+        if exclude is not None and isinstance(exclude, model) and exclude.pk:
+            qs = qs.exclude(pk=exclude.pk)
+        for name in qs.values_list(model.media_field, flat=True)[:3]:
+            try:
+                if name and default_storage.exists(name):
+                    return name
+            except Exception as e:
+                logger.warning(f"Duplicate lookup failed for {name}: {e}")
+    return None
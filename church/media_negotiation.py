@@ -0,0 +1,103 @@
+"""
+Accept-header negotiation for media images.
+
+store_thumbnail_webp (church/signals.py) writes a ``<name>.webp`` sibling next to every
+thumbnail, and an ``<name>.avif`` sibling may exist as well. Templates only use them where
+they hand-write <picture>, so the media-serving path picks the smallest format the client
+accepts instead. nginx.conf.template has the matching ``map $http_accept`` for /media/;
+this module covers the Django fallback used in production without a web server
+(file responses themselves come from church.media_serving).
+"""
+import os
+
+from django.conf import settings
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.static import serve
+
+from .media_fingerprint import IMMUTABLE_CACHE_CONTROL, is_fingerprinted
+from .media_serving import serve_file
+
+# Preferred first: (mime type, sibling suffix). Keep in sync with the map in nginx.conf.template.
+NEGOTIATED_FORMATS = (
+    ('image/avif', '.avif'),
+    ('image/webp', '.webp'),
+)
+NEGOTIABLE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+DEFAULT_MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 30  # 30 days, same as nginx "expires 30d"
+
+
+def accepted_types(accept_header):
+    """Media types from an Accept header that have a non-zero q value."""
+    types = set()
+    for part in (accept_header or '').split(','):
+        media_type, _, params = part.strip().partition(';')
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            types.add(media_type)
+    return types
+
+
+def is_negotiable(path):
+    return os.path.splitext(path)[1].lower() in NEGOTIABLE_EXTENSIONS
+
+
+def negotiate_media_path(path, accept_header, document_root):
+    """
+    Return the path of the best existing sibling for this Accept header, or ``path`` unchanged.
+    Only explicit image/avif or image/webp entries count (``*/*`` doesn't imply support).
+    """
+    if not is_negotiable(path):
+        return path
+    accepted = accepted_types(accept_header)
+    for media_type, suffix in NEGOTIATED_FORMATS:
+        if media_type not in accepted:
+            continue
+        candidate = path + suffix
+        try:
+            if os.path.isfile(safe_join(document_root, candidate)):
+                return candidate
+        except Exception:
+            continue
+    return path
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    Drop-in replacement for django.views.static.serve for /media/: serves the AVIF/WebP
+    sibling when the client accepts it, with ``Vary: Accept`` and long-lived cache headers
+    (immutable for content-fingerprinted names), Range, 304s and X-Accel-Redirect/X-Sendfile.
+    """
+    document_root = document_root or settings.MEDIA_ROOT
+    negotiable = is_negotiable(path)
+    served_path = path
+    if negotiable:
+        served_path = negotiate_media_path(path, request.META.get('HTTP_ACCEPT', ''), document_root)
+
+    if show_indexes and os.path.isdir(os.path.join(document_root, path)):
+        response = serve(request, path, document_root=document_root, show_indexes=True)
+    else:
+        response = serve_file(request, served_path, document_root)
+
+    if negotiable:
+        # Same URL, different bytes depending on Accept: shared caches must key on it
+        patch_vary_headers(response, ['Accept'])
+    if response.status_code in (200, 206, 304):
+        if is_fingerprinted(path):
+            # Content-hashed name: the bytes behind it never change
+            response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        else:
+            max_age = getattr(settings, 'MEDIA_CACHE_MAX_AGE', DEFAULT_MEDIA_CACHE_MAX_AGE)
+            patch_cache_control(response, public=True, max_age=max_age)
+    return response
@@ -0,0 +1,138 @@
+"""
+File responses for the /media/ fallback (church.media_negotiation.serve_media).
+
+django.views.static.serve reads the whole file through Python and ignores Range, which ties
+up a gthread worker for every video download and breaks seeking. serve_file instead:
+
+* hands the transfer to the web server with X-Accel-Redirect (nginx) or X-Sendfile
+  (Apache/LiteSpeed) when MEDIA_SENDFILE is set - Django only checks the path and headers,
+* answers If-None-Match / If-Modified-Since with 304 (ETag from size + mtime),
+* serves single byte ranges as 206 (multi-range requests get the full file), and
+* otherwise streams through FileResponse, which uses the server's sendfile support.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+SENDFILE_HEADERS = {
+    'x-accel-redirect': 'X-Accel-Redirect',
+    'x-sendfile': 'X-Sendfile',
+}
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single ``bytes=`` range, None to serve the whole file
+    (no/malformed/multi-range header), or False when the range can't be satisfied.
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    """A Range only applies when If-Range (if sent) still names the current file."""
+    if_range = request.headers.get('If-Range', '').strip()
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, path, document_root):
+    """Serve ``path`` under ``document_root`` with conditional, Range and sendfile support."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(document_root, path)
+    except Exception:
+        raise Http404('Invalid path')
+    try:
+        stat = os.stat(fullpath)
+    except OSError:
+        raise Http404('File not found')
+    if not os.path.isfile(fullpath):
+        raise Http404('File not found')
+
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    sendfile = SENDFILE_HEADERS.get((getattr(settings, 'MEDIA_SENDFILE', '') or '').lower())
+    if sendfile:
+        # The web server handles Range and the transfer itself
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'X-Accel-Redirect':
+            prefix = getattr(settings, 'MEDIA_SENDFILE_PREFIX', '/protected-media/')
+            response[sendfile] = prefix.rstrip('/') + '/' + quote(path)
+        else:
+            response[sendfile] = fullpath
+    else:
+        byte_range = None
+        if request.headers.get('Range') and _if_range_matches(request, etag, last_modified):
+            byte_range = parse_range(request.headers['Range'], stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _iter_range(fullpath, start, end - start + 1), status=206, content_type=content_type,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+            response['Content-Length'] = str(stat.st_size)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
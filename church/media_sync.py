@@ -0,0 +1,260 @@
+"""
+Media sync between the local MEDIA_ROOT and the GCS bucket (management command sync_media).
+
+Both sides are listed once; objects are compared by checksum (GCS md5Hash, or crc32c for
+composite objects without one) against local files, so only real differences transfer.
+Local checksums are remembered in a JSON manifest keyed by size + mtime, which makes a
+re-run (or a resumed, interrupted run) cheap: unchanged local files are never re-hashed.
+
+LocalBucket is a directory with the same interface as GCSBucket; tests and offline
+mirrors use it in place of the bucket.
+"""
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+try:
+    import google_crc32c
+except ImportError:  # only needed for composite GCS objects (no md5Hash)
+    google_crc32c = None
+
+READ_SIZE = 1024 * 1024
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class RemoteObject:
+    name: str
+    size: int
+    md5: str = ''  # base64, as GCS reports md5Hash
+    crc32c: str = ''  # base64, big-endian
+
+
+def _b64(digest):
+    return base64.b64encode(digest).decode()
+
+
+def file_checksums(path, want_crc32c=False):
+    """Base64 md5 (and crc32c when asked and available) of a local file, read in 1 MiB blocks."""
+    md5 = hashlib.md5()
+    crc = google_crc32c.Checksum() if want_crc32c and google_crc32c else None
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_SIZE), b''):
+            md5.update(block)
+            if crc is not None:
+                crc.update(block)
+    return {'md5': _b64(md5.digest()), 'crc32c': _b64(crc.digest()) if crc is not None else ''}
+
+
+class GCSBucket:
+    """Bucket side backed by google-cloud-storage (imported lazily)."""
+
+    def __init__(self, bucket_name, prefix=''):
+        from google.cloud import storage
+
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = prefix.strip('/')
+        self.label = f'gs://{bucket_name}/{self.prefix}'
+
+    def _blob_name(self, name):
+        return f'{self.prefix}/{name}' if self.prefix else name
+
+    def list(self, page_size=1000):
+        objects = {}
+        start = len(self.prefix) + 1 if self.prefix else 0
+        for blob in self.bucket.list_blobs(prefix=self.prefix or None, page_size=page_size):
+            if blob.name.endswith('/'):
+                continue
+            name = blob.name[start:]
+            objects[name] = RemoteObject(name, blob.size or 0, blob.md5_hash or '', blob.crc32c or '')
+        return objects
+
+    def stat(self, name):
+        blob = self.bucket.get_blob(self._blob_name(name))
+        if blob is None:
+            return None
+        return RemoteObject(name, blob.size or 0, blob.md5_hash or '', blob.crc32c or '')
+
+    def download(self, name, path):
+        self.bucket.blob(self._blob_name(name)).download_to_filename(path)
+
+    def upload(self, path, name):
+        self.bucket.blob(self._blob_name(name)).upload_from_filename(path)
+
+
+class LocalBucket:
+    """A directory standing in for the bucket."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.label = self.root
+
+    def list(self, page_size=None):
+        objects = {}
+        for directory, _dirs, files in os.walk(self.root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                objects[name] = RemoteObject(name, os.path.getsize(path), **file_checksums(path))
+        return objects
+
+    def stat(self, name):
+        path = os.path.join(self.root, name)
+        if not os.path.isfile(path):
+            return None
+        return RemoteObject(name, os.path.getsize(path), **file_checksums(path))
+
+    def download(self, name, path):
+        shutil.copyfile(os.path.join(self.root, name), path)
+
+    def upload(self, path, name):
+        target = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, target)
+
+
+class SyncManifest:
+    """Resumable record of local checksums: name -> {size, mtime_ns, md5, crc32c}."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.entries = data.get('files', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def checksums(self, name, path, want_crc32c=False):
+        stat = os.stat(path)
+        with self._lock:
+            entry = self.entries.get(name)
+        if (entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+                and (entry.get('crc32c') or not want_crc32c)):
+            return entry
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, **file_checksums(path, want_crc32c)}
+        with self._lock:
+            self.entries[name] = entry
+        return entry
+
+    def forget(self, name):
+        with self._lock:
+            self.entries.pop(name, None)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {'version': MANIFEST_VERSION, 'files': dict(self.entries)}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+def list_local(root):
+    """name -> absolute path for every file under root (manifest and temp files excluded)."""
+    files = {}
+    if not os.path.isdir(root):
+        return files
+    for directory, _dirs, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith('.sync-tmp') or filename.startswith('.media_sync'):
+                continue
+            path = os.path.join(directory, filename)
+            files[os.path.relpath(path, root).replace(os.sep, '/')] = path
+    return files
+
+
+def same_content(remote, local_entry):
+    if remote.size != local_entry['size']:
+        return False
+    if remote.md5:
+        return remote.md5 == local_entry['md5']
+    if remote.crc32c and local_entry.get('crc32c'):
+        return remote.crc32c == local_entry['crc32c']
+    return True  # no checksum to compare (composite object without crc32c support): trust the size
+
+
+def plan_sync(remote_objects, local_files, manifest, direction, prefer=None):
+    """
+    Diff both sides. Returns {'download': [...], 'upload': [...], 'conflicts': [...], 'unchanged': n}.
+    direction: 'pull' (bucket -> local), 'push' (local -> bucket) or 'both' (missing files each way;
+    differing files go the ``prefer`` way, else are reported as conflicts).
+    """
+    plan = {'download': [], 'upload': [], 'conflicts': [], 'unchanged': 0}
+    for name in sorted(set(remote_objects) | set(local_files)):
+        remote = remote_objects.get(name)
+        path = local_files.get(name)
+        if remote and not path:
+            if direction in ('pull', 'both'):
+                plan['download'].append(name)
+            continue
+        if path and not remote:
+            if direction in ('push', 'both'):
+                plan['upload'].append(name)
+            continue
+        entry = manifest.checksums(name, path, want_crc32c=not remote.md5)
+        if same_content(remote, entry):
+            plan['unchanged'] += 1
+        elif direction == 'pull' or (direction == 'both' and prefer == 'remote'):
+            plan['download'].append(name)
+        elif direction == 'push' or (direction == 'both' and prefer == 'local'):
+            plan['upload'].append(name)
+        else:
+            plan['conflicts'].append(name)
+    return plan
+
+
+def download_to(bucket, name, root, manifest):
+    """Download into a temp file beside the target and move it into place (no half-written files)."""
+    target = os.path.join(root, name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f'{target}.sync-tmp'
+    try:
+        bucket.download(name, tmp_path)
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    manifest.forget(name)
+    manifest.checksums(name, target)
+
+
+def pull_files(bucket, names, root, manifest, workers=8):
+    """
+    Download just ``names`` (e.g. the media of incrementally synced rows) when missing or different
+    locally. Returns (downloaded, unchanged, missing_in_bucket, errors).
+    """
+    def pull(name):
+        remote = bucket.stat(name)
+        if remote is None:
+            return 'missing'
+        path = os.path.join(root, name)
+        if os.path.isfile(path):
+            entry = manifest.checksums(name, path, want_crc32c=not remote.md5)
+            if same_content(remote, entry):
+                return 'unchanged'
+        download_to(bucket, name, root, manifest)
+        return 'downloaded'
+
+    counts = {'downloaded': 0, 'unchanged': 0, 'missing': 0, 'errors': 0}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(pull, name) for name in sorted(names)]
+        for future in futures:
+            try:
+                counts[future.result()] += 1
+            except Exception:
+                counts['errors'] += 1
+    return counts['downloaded'], counts['unchanged'], counts['missing'], counts['errors']
@@ -1,4 +1,7 @@
 """Middleware for analytics (page view tracking)."""
+import queue
+import threading
+
 from django.utils.deprecation import MiddlewareMixin
 from ipware import get_client_ip as ipware_get_client_ip
 
@@ -59,29 +62,61 @@ class PageViewMiddleware(MiddlewareMixin):
             return response
             
         try:
-            import threading
-            from django.db import connections
-            
-            def log_page_view_async(p, ip):
-                try:
-                    from .models import PageView
-                    PageView.objects.create(path=p, ip_address=ip)
-                except Exception:
-                    pass
-                finally:
-                    for conn in connections.all():
-                        conn.close()
-            
-            threading.Thread(
-                target=log_page_view_async, 
-                args=(path[:500], get_client_ip(request)),
-                daemon=True
-            ).start()
+            _page_view_writer.submit(path[:500], get_client_ip(request))
         except Exception:
             pass  # Don't break the request if DB/logging fails
         return response
 
 
+class _PageViewWriter:
+    """
+    One background thread that writes queued page views in batches. A thread per request
+    used to open (and close) its own database connection for a single INSERT; this one
+    keeps its connection for CONN_MAX_AGE (or borrows from the pool) like request threads do.
+    """
+    MAX_QUEUED = 1000  # drop views rather than grow without bound if the database is down
+    BATCH_SIZE = 100
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=self.MAX_QUEUED)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, path, ip):
+        try:
+            self._queue.put_nowait((path, ip))
+        except queue.Full:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='page-view-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        from django.db import close_old_connections
+        from .models import PageView
+
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # Same connection lifecycle as a request: drop it if expired or broken
+            close_old_connections()
+            try:
+                PageView.objects.bulk_create([PageView(path=p, ip_address=ip) for p, ip in batch])
+            except Exception:
+                pass
+            finally:
+                close_old_connections()
+
+
+_page_view_writer = _PageViewWriter()
+
+
 class MaintenanceModeMiddleware(MiddlewareMixin):
     """
     Global lockdown middleware. If MN.is_active is True, all non-admin/non-static 
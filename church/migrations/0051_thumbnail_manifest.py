@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('church', '0050_mn_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aboutpage',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='boardmember',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='calendarevent',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='childrensbread',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='herosettings',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='infocard',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='mantalk',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='newsline',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='partner',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='sidebarpromo',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+        migrations.AddField(
+            model_name='wordoftruth',
+            name='thumbnail_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('church', '0052_media_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aboutpage',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='boardmember',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='calendarevent',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='childrensbread',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='herosettings',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='infocard',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='mantalk',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='newsline',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='partner',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='sidebarpromo',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='wordoftruth',
+            name='media_phash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on', max_length=16),
+        ),
+    ]
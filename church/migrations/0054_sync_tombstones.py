@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('church', '0053_media_phash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_pk', models.CharField(max_length=64)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['model_label', 'object_pk'], name='church_sync_model_l_ef5c46_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=200)),
+                ('model_label', models.CharField(max_length=100)),
+                ('value', models.DateTimeField()),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'model_label'), name='unique_sync_watermark')],
+            },
+        ),
+    ]
@@ -0,0 +1,139 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:27
+
+import church.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('church', '0054_sync_tombstones'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='boardmember',
+            name='church_boar_is_acti_b7512f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='childrensbread',
+            name='church_chil_is_publ_1ab53e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='childrensbread',
+            name='church_chil_slug_73e656_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='faq',
+            name='church_faq_is_acti_383d5c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='infocard',
+            name='church_info_slug_0ed51b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='mantalk',
+            name='church_mant_is_publ_47adb5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='mantalk',
+            name='church_mant_slug_79e258_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='newsitem',
+            name='church_news_is_publ_f002c3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='newsitem',
+            name='church_news_slug_435f4c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='newsline',
+            name='church_news_is_publ_ca52a3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='newsline',
+            name='church_news_slug_6d4393_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='partner',
+            name='church_part_is_acti_6f5876_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sidebarpromo',
+            name='church_side_is_acti_e38c73_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testimonial',
+            name='church_test_approve_8979c9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='verse',
+            name='church_vers_is_acti_f2f436_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='wordoftruth',
+            name='church_word_is_publ_682c08_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='wordoftruth',
+            name='church_word_slug_5097c6_idx',
+        ),
+        migrations.AddIndex(
+            model_name='articlecomment',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_approved', True)), fields=['content_type', 'object_id', '-created_at'], name='articlecomment_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='boardmember',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_active', True)), fields=['display_order', 'name'], name='boardmember_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_published', True)), fields=['-created_at'], include=('title', 'slug'), name='book_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calendarevent',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_published', True)), fields=['event_date', 'title'], name='calendarevent_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='childrensbread',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_published', True)), fields=['-created_at'], include=('title', 'slug'), name='childrensbread_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_active', True)), fields=['display_order'], name='faq_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mantalk',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_published', True)), fields=['-created_at'], include=('title', 'slug'), name='mantalk_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_published', True)), fields=['-created_at'], include=('title', 'slug'), name='newsitem_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsline',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_published', True)), fields=['-created_at'], include=('title', 'slug'), name='newsline_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partner',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_active', True)), fields=['display_order', 'name'], name='partner_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sidebarpromo',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_active', True)), fields=['display_order', 'created_at'], name='sidebarpromo_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=church.indexes.PartialIndex(condition=models.Q(('approved', True)), fields=['-created_at'], name='testimonial_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verse',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['-date_posted'], name='verse_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wordoftruth',
+            index=church.indexes.PartialIndex(condition=models.Q(('is_published', True)), fields=['-created_at'], include=('title', 'slug'), name='wordoftruth_published_idx'),
+        ),
+    ]
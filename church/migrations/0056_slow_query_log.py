@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('church', '0055_partial_content_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40, unique=True)),
+                ('sql', models.TextField(help_text='SQL with literals and parameters replaced by ?')),
+                ('database', models.CharField(default='default', max_length=50)),
+                ('path', models.CharField(blank=True, help_text='Request path of the latest sample', max_length=200)),
+                ('calls', models.PositiveIntegerField(default=0, help_text='Sampled calls over the threshold')),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('plan', models.TextField(blank=True)),
+                ('plan_analyzed', models.BooleanField(default=False, help_text='Plan comes from EXPLAIN ANALYZE')),
+                ('plan_captured_at', models.DateTimeField(blank=True, null=True)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Slow Query',
+                'verbose_name_plural': 'Slow Queries',
+                'ordering': ['-total_ms'],
+            },
+        ),
+    ]
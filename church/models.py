@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils.text import slugify
 from django_ckeditor_5.fields import CKEditor5Field
 from urllib.parse import urlparse, parse_qs
@@ -7,6 +8,35 @@ from django.contrib.contenttypes.models import ContentType
 from image_cropping import ImageRatioField
 from django.utils import timezone
 from datetime import timedelta
+
+from .indexes import PartialIndex
+
+
+class MediaMetadataModel(models.Model):
+    """
+    Abstract base for models with one uploaded image/file (named by ``media_field``).
+    Stores the file's intrinsic width/height, byte size, format, SHA-256 (and optionally a
+    perceptual hash) so templates can emit width/height and code can check or dedupe files
+    without reading them from storage. Filled at upload by church.signals.record_media_metadata;
+    backfill with the ``backfill_media_metadata`` management command.
+    """
+    media_field = 'image'
+
+    media_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    media_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    media_bytes = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    media_format = models.CharField(max_length=10, blank=True, editable=False)
+    media_sha256 = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
+    media_phash = models.CharField(max_length=16, blank=True, db_index=True, editable=False, help_text='Perceptual (difference) hash, when MEDIA_PERCEPTUAL_HASH is on')
+
+    class Meta:
+        abstract = True
+
+    @property
+    def media_file(self):
+        return getattr(self, self.media_field)
+
+
 class Verse(models.Model):
     """Model for daily/weekly Bible verses"""
     content = models.TextField()
@@ -20,19 +50,20 @@ class Verse(models.Model):
         verbose_name = 'Verse'
         verbose_name_plural = 'Verses'
         indexes = [
-            models.Index(fields=['is_active', 'is_featured', '-date_posted']),
+            PartialIndex(fields=['-date_posted'], condition=Q(is_active=True, is_featured=True), name='verse_featured_idx'),
         ]
 
     def __str__(self):
         return f"{self.reference} - {self.content[:50]}..."
 
 
-class NewsItem(models.Model):
+class NewsItem(MediaMetadataModel):
     """Model for news articles and events"""
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=200)
     image = models.ImageField(upload_to='news/')
     image_cropping = ImageRatioField('image', '800x600', size_warning=True, help_text='Crop the image to your desired size')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     summary = models.TextField()
     body = CKEditor5Field('Content', config_name='default')
     event_date = models.DateTimeField(null=True, blank=True)
@@ -44,8 +75,8 @@ class NewsItem(models.Model):
         verbose_name = 'News Item'
         verbose_name_plural = 'News Items'
         indexes = [
-            models.Index(fields=['is_published', '-created_at']),
-            models.Index(fields=['slug']),
+            PartialIndex(fields=['-created_at'], include=['title', 'slug'], condition=Q(is_published=True),
+                         name='newsitem_published_idx'),
         ]
 
     def __str__(self):
@@ -62,12 +93,13 @@ class NewsItem(models.Model):
 
 
 
-class NewsLine(models.Model):
+class NewsLine(MediaMetadataModel):
     """Model for News Line items (posters and videos)"""
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=200)
     image = models.ImageField(upload_to='news_line/', help_text='Poster image')
     image_cropping = ImageRatioField('image', '800x600', size_warning=True, help_text='Crop the image to your desired size')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     video_url = models.URLField(
         blank=True,
         help_text='Optional YouTube video URL (e.g. https://www.youtube.com/watch?v=VIDEO_ID). If provided, video will be shown.',
@@ -83,8 +115,8 @@ class NewsLine(models.Model):
         verbose_name = 'News Line Item'
         verbose_name_plural = 'News Line Items'
         indexes = [
-            models.Index(fields=['is_published', '-created_at']),
-            models.Index(fields=['slug']),
+            PartialIndex(fields=['-created_at'], include=['title', 'slug'], condition=Q(is_published=True),
+                         name='newsline_published_idx'),
         ]
 
     def __str__(self):
@@ -159,7 +191,7 @@ class ContactMessage(models.Model):
         return f"Message from {self.name}: {self.subject}"
 
 
-class CalendarEvent(models.Model):
+class CalendarEvent(MediaMetadataModel):
 
     """Interactive calendar event/task model"""
     EVENT_TYPE_CHOICES = [
@@ -191,6 +223,7 @@ class CalendarEvent(models.Model):
         help_text="Optional image for the event (will be displayed in event details)",
     )
     image_cropping = ImageRatioField('image', '800x600', size_warning=True, help_text='Crop the image to your desired size')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     color = models.CharField(
         max_length=7,
         default='#990030',
@@ -205,7 +238,8 @@ class CalendarEvent(models.Model):
         verbose_name = "Calendar Event"
         verbose_name_plural = "Calendar Events"
         indexes = [
-            models.Index(fields=['event_date', 'is_published']),
+            PartialIndex(fields=['event_date', 'title'], condition=Q(is_published=True), name='calendarevent_published_idx'),
+            models.Index(fields=['event_date', 'is_published']),  # any status: staff dashboard, admin date filters
             models.Index(fields=['event_type']),
         ]
 
@@ -213,8 +247,9 @@ class CalendarEvent(models.Model):
         return f"{self.title} - {self.event_date}"
 
 
-class Testimonial(models.Model):
+class Testimonial(MediaMetadataModel):
     """Model for member testimonials"""
+    media_field = 'photo'
     member_name = models.CharField(max_length=100)
     photo = models.ImageField(
         upload_to='testimonials/',
@@ -223,6 +258,7 @@ class Testimonial(models.Model):
         help_text='Optional image shown when no video is provided',
     )
     photo_cropping = ImageRatioField('photo', '400x400', size_warning=True, help_text='Crop the photo to your desired size')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     video_url = models.URLField(
         blank=True,
         help_text='Optional video URL (e.g. YouTube embed link)',
@@ -236,7 +272,7 @@ class Testimonial(models.Model):
         verbose_name = 'Testimonial'
         verbose_name_plural = 'Testimonials'
         indexes = [
-            models.Index(fields=['approved', '-created_at']),
+            PartialIndex(fields=['-created_at'], condition=Q(approved=True), name='testimonial_approved_idx'),
         ]
 
     def __str__(self):
@@ -254,7 +290,7 @@ class Testimonial(models.Model):
         return ''
 
 
-class GalleryImage(models.Model):
+class GalleryImage(MediaMetadataModel):
     """Model for gallery images and videos"""
     CATEGORY_CHOICES = [
         ('Worship', 'Worship'),
@@ -267,6 +303,7 @@ class GalleryImage(models.Model):
     caption = models.CharField(max_length=200)
     image = models.FileField(upload_to='gallery/', help_text='Image or thumbnail for this item')
     image_cropping = ImageRatioField('image', '800x600', size_warning=True, help_text='Crop the image to your desired size')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     video_url = models.URLField(
         blank=True,
         help_text='Optional video URL (e.g. YouTube embed link for video items)',
@@ -314,10 +351,11 @@ class GalleryImage(models.Model):
         return ''
 
 
-class HeroSettings(models.Model):
+class HeroSettings(MediaMetadataModel):
     """Singleton model for hero section settings"""
     image = models.ImageField(upload_to='hero/', help_text='Background image for the hero section')
     image_cropping = ImageRatioField('image', '1920x1080', size_warning=True, help_text='Crop the hero image to your desired size')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -338,7 +376,7 @@ class HeroSettings(models.Model):
         return obj
 
 
-class AboutPage(models.Model):
+class AboutPage(MediaMetadataModel):
     """Singleton model for the About Us page (story + founder image)."""
     title = models.CharField(max_length=200, default='The birth of a Ministry')
     subtitle = models.CharField(max_length=255, blank=True)
@@ -354,6 +392,7 @@ class AboutPage(models.Model):
         size_warning=True,
         help_text='Crop the image to a square for best results (400x400).',
     )
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     video_url = models.URLField(
         blank=True,
         help_text='Optional YouTube video URL (e.g. https://www.youtube.com/watch?v=VIDEO_ID or https://www.youtube.com/embed/VIDEO_ID). If provided, video will be shown instead of or alongside the image.',
@@ -409,7 +448,7 @@ class AboutPage(models.Model):
         return obj
 
 
-class InfoCard(models.Model):
+class InfoCard(MediaMetadataModel):
     """Model for info cards (Children's Bread, News, Word of Truth)"""
     CARD_TYPE_CHOICES = [
         ('childrens_bread', 'Children\'s Bread'),
@@ -423,6 +462,7 @@ class InfoCard(models.Model):
     slug = models.SlugField(unique=True, max_length=200, blank=True)
     image = models.ImageField(upload_to='info_cards/', help_text='Image displayed on the card')
     image_cropping = ImageRatioField('image', '1600x900', size_warning=True, help_text='Crop the image to 16:9 aspect ratio (1600x900) for proper display')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     headline = models.CharField(max_length=200, help_text='Bold headline text below the image')
     summary = models.TextField(help_text='Summary/description text (displayed on the homepage card)')
     content = CKEditor5Field('Content', config_name='default', blank=True, help_text='Full article content triggered by "Read More"')
@@ -440,7 +480,6 @@ class InfoCard(models.Model):
         verbose_name_plural = 'Info Cards'
         indexes = [
             models.Index(fields=['card_type', 'is_active']),
-            models.Index(fields=['slug']),
         ]
 
     def __str__(self):
@@ -452,7 +491,7 @@ class InfoCard(models.Model):
         super().save(*args, **kwargs)
 
 
-class WordOfTruth(models.Model):
+class WordOfTruth(MediaMetadataModel):
     """Articles for Word of Truth section with PDF download"""
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=200)
@@ -460,6 +499,7 @@ class WordOfTruth(models.Model):
     author_name = models.CharField(max_length=100, default='Breaking Barriers International', help_text='Name of the article writer')
     image = models.ImageField(upload_to='word_of_truth/', blank=True, null=True, help_text='Featured image for the article')
     image_cropping = ImageRatioField('image', '800x600', size_warning=True, help_text='Crop the image for proper display (800x600)')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     body = CKEditor5Field('Content', config_name='default', help_text='Full article content for the PDF and web view')
     is_published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -470,8 +510,8 @@ class WordOfTruth(models.Model):
         verbose_name = 'Word of Truth Article'
         verbose_name_plural = 'Word of Truth Articles'
         indexes = [
-            models.Index(fields=['is_published', '-created_at']),
-            models.Index(fields=['slug']),
+            PartialIndex(fields=['-created_at'], include=['title', 'slug'], condition=Q(is_published=True),
+                         name='wordoftruth_published_idx'),
         ]
 
     def __str__(self):
@@ -497,7 +537,7 @@ class WordOfTruth(models.Model):
         return self.created_at.strftime('%d') if self.created_at else ''
 
 
-class ManTalk(models.Model):
+class ManTalk(MediaMetadataModel):
     """Articles for ManTalk (formerly Men's Ministry)"""
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=200)
@@ -505,6 +545,7 @@ class ManTalk(models.Model):
     author_name = models.CharField(max_length=100, default='Breaking Barriers International', help_text='Name of the article writer')
     image = models.ImageField(upload_to='man_talk/', blank=True, null=True, help_text='Featured image for the article')
     image_cropping = ImageRatioField('image', '800x600', size_warning=True, help_text='Crop the image for proper display (800x600)')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     body = CKEditor5Field('Content', config_name='default', help_text='Full article content')
     is_published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -515,8 +556,8 @@ class ManTalk(models.Model):
         verbose_name = 'ManTalk Article'
         verbose_name_plural = 'ManTalk Articles'
         indexes = [
-            models.Index(fields=['is_published', '-created_at']),
-            models.Index(fields=['slug']),
+            PartialIndex(fields=['-created_at'], include=['title', 'slug'], condition=Q(is_published=True),
+                         name='mantalk_published_idx'),
         ]
 
     def __str__(self):
@@ -543,13 +584,15 @@ class ManTalk(models.Model):
 
 
 
-class Book(models.Model):
+class Book(MediaMetadataModel):
     """Books with reviews and WhatsApp inquiry link"""
+    media_field = 'cover_image'
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=200)
     author = models.CharField(max_length=100, default='Pst. Nellie Shani', help_text='Author name', blank=True)
     cover_image = models.ImageField(upload_to='books/', help_text='Book cover image')
     image_cropping = ImageRatioField('cover_image', '600x900', size_warning=True, help_text='Crop for vertical book display (600x900)')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     description = models.TextField(help_text='Short description/summary for the card')
     review = CKEditor5Field('Review', config_name='default', help_text='Full book review and details')
     whatsapp_number = models.CharField(max_length=20, default='+254716703508', help_text='WhatsApp number for inquiries')
@@ -561,6 +604,10 @@ class Book(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Book'
         verbose_name_plural = 'Books'
+        indexes = [
+            PartialIndex(fields=['-created_at'], include=['title', 'slug'], condition=Q(is_published=True),
+                         name='book_published_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -583,7 +630,7 @@ class Book(models.Model):
 
 
 
-class ChildrensBread(models.Model):
+class ChildrensBread(MediaMetadataModel):
     """Articles for Children's Bread section"""
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=200)
@@ -591,6 +638,7 @@ class ChildrensBread(models.Model):
     author_name = models.CharField(max_length=100, default='Pst. Nellie Shani', help_text='Name of the article writer')
     image = models.ImageField(upload_to='childrens_bread/', blank=True, null=True, help_text='Featured image for the article')
     image_cropping = ImageRatioField('image', '800x600', size_warning=True, help_text='Crop the image for proper display (800x600)')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     body = CKEditor5Field('Content', config_name='default', help_text='Full article content')
     is_published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -601,8 +649,8 @@ class ChildrensBread(models.Model):
         verbose_name = "Children's Bread Article"
         verbose_name_plural = "Children's Bread Articles"
         indexes = [
-            models.Index(fields=['is_published', '-created_at']),
-            models.Index(fields=['slug']),
+            PartialIndex(fields=['-created_at'], include=['title', 'slug'], condition=Q(is_published=True),
+                         name='childrensbread_published_idx'),
         ]
 
     def __str__(self):
@@ -700,12 +748,14 @@ class MensMinistry(models.Model):
         return ''
 
 
-class Partner(models.Model):
+class Partner(MediaMetadataModel):
     """Logo strip for ministry partners on the homepage"""
+    media_field = 'logo'
     name = models.CharField(max_length=200)
     logo = models.ImageField(upload_to='partners/', help_text='Logo image shown in the partners carousel')
     use_cropping = models.BooleanField(default=False, help_text='Check this box to enable cropping. When unchecked, the original image will be used as-is.')
     logo_cropping = ImageRatioField('logo', '300x200', size_warning=True, help_text='Crop the logo to your desired size (only used if "Use Cropping" is checked)')
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     website_url = models.URLField(blank=True, help_text='Optional link to open when the logo is clicked')
     display_order = models.PositiveIntegerField(default=0, help_text='Lower numbers appear first')
     is_active = models.BooleanField(default=True)
@@ -716,7 +766,7 @@ class Partner(models.Model):
         verbose_name = 'Partner'
         verbose_name_plural = 'Partners'
         indexes = [
-            models.Index(fields=['is_active', 'display_order']),
+            PartialIndex(fields=['display_order', 'name'], condition=Q(is_active=True), name='partner_active_idx'),
         ]
 
     def __str__(self):
@@ -759,7 +809,7 @@ class SchoolMinistryEnrollment(models.Model):
         return f"{self.name} <{self.email}>"
 
 
-class SidebarPromo(models.Model):
+class SidebarPromo(MediaMetadataModel):
     """Image or video holder for the sidebar (fills negative space below FAQs / Verse of the Day)"""
     image = models.ImageField(
         upload_to='sidebar_promos/',
@@ -769,6 +819,7 @@ class SidebarPromo(models.Model):
         'image', '300x400', size_warning=True,
         help_text='Crop to portrait 3:4. Images display as portrait in the sidebar.',
     )
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     video_url = models.URLField(
         blank=True,
         help_text='Optional video URL (e.g. YouTube embed). If set, video is shown instead of image.',
@@ -787,7 +838,7 @@ class SidebarPromo(models.Model):
         verbose_name = 'Sidebar Promo'
         verbose_name_plural = 'Sidebar Promos'
         indexes = [
-            models.Index(fields=['is_active', 'display_order']),
+            PartialIndex(fields=['display_order', 'created_at'], condition=Q(is_active=True), name='sidebarpromo_active_idx'),
         ]
 
     def __str__(self):
@@ -819,7 +870,7 @@ class FAQ(models.Model):
         verbose_name = 'Common Question'
         verbose_name_plural = 'Common Questions'
         indexes = [
-            models.Index(fields=['is_active', 'display_order']),
+            PartialIndex(fields=['display_order'], condition=Q(is_active=True), name='faq_active_idx'),
         ]
 
     def __str__(self):
@@ -894,12 +945,13 @@ def _to_youtube_embed(raw_url: str) -> str:
     return raw_url
 
 
-class BoardMember(models.Model):
+class BoardMember(MediaMetadataModel):
     """Model for Leadership/Board Members"""
     name = models.CharField(max_length=200)
     role = models.CharField(max_length=200, help_text='Role/Position (e.g. Founder, Chairman)')
     image = models.ImageField(upload_to='leadership/', help_text='Professional photo (400x400 square recommended)')
     image_cropping = ImageRatioField('image', '400x400', size_warning=True)
+    thumbnail_manifest = models.JSONField(default=dict, blank=True, editable=False, help_text='Generated thumbnail URLs and sizes, keyed by image field and spec')
     bio = CKEditor5Field('Bio', config_name='default', help_text='Short biography/background')
     display_order = models.PositiveIntegerField(default=0, help_text='Lower numbers appear first')
     is_active = models.BooleanField(default=True)
@@ -911,7 +963,7 @@ class BoardMember(models.Model):
         verbose_name = 'Board Member'
         verbose_name_plural = 'Board Members'
         indexes = [
-            models.Index(fields=['is_active', 'display_order']),
+            PartialIndex(fields=['display_order', 'name'], condition=Q(is_active=True), name='boardmember_active_idx'),
         ]
 
     def __str__(self):
@@ -998,8 +1050,70 @@ class ArticleComment(models.Model):
         verbose_name = 'Article Comment'
         verbose_name_plural = 'Article Comments'
         indexes = [
-            models.Index(fields=['content_type', 'object_id', 'is_approved', '-created_at']),
+            PartialIndex(fields=['content_type', 'object_id', '-created_at'], condition=Q(is_approved=True),
+                         name='articlecomment_approved_idx'),
+            models.Index(fields=['content_type', 'object_id', 'is_approved', '-created_at']),  # any status: admin moderation
         ]
 
     def __str__(self):
         return f"Comment by {self.author_name} on {self.content_object}"
+
+
+class SyncTombstone(models.Model):
+    """Deleted content row, kept so incremental sync_db runs can delete it in other environments."""
+    model_label = models.CharField(max_length=100)
+    object_pk = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['model_label', 'object_pk']),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label}#{self.object_pk} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class SyncWatermark(models.Model):
+    """Per-source, per-model high-water mark of the last incremental sync_db run (stored in the target)."""
+    source = models.CharField(max_length=200)
+    model_label = models.CharField(max_length=100)
+    value = models.DateTimeField()
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'model_label'], name='unique_sync_watermark'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.model_label} @ {self.value:%Y-%m-%d %H:%M:%S}"
+
+
+class SlowQuery(models.Model):
+    """Slow queries aggregated by normalized SQL fingerprint, with a sampled plan (see church.slow_queries)."""
+    fingerprint = models.CharField(max_length=40, unique=True)
+    sql = models.TextField(help_text='SQL with literals and parameters replaced by ?')
+    database = models.CharField(max_length=50, default='default')
+    path = models.CharField(max_length=200, blank=True, help_text='Request path of the latest sample')
+    calls = models.PositiveIntegerField(default=0, help_text='Sampled calls over the threshold')
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    plan = models.TextField(blank=True)
+    plan_analyzed = models.BooleanField(default=False, help_text='Plan comes from EXPLAIN ANALYZE')
+    plan_captured_at = models.DateTimeField(null=True, blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-total_ms']
+        verbose_name = 'Slow Query'
+        verbose_name_plural = 'Slow Queries'
+
+    def __str__(self):
+        return f"{self.calls}x {self.sql[:80]}"
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0
@@ -0,0 +1,303 @@
+"""
+Deterministic synthetic content for performance tests (church.tests perf suite, seed_perf_data).
+
+seed_dataset() fills every model the public pages read with a fixed random seed, and dates
+relative to a fixed epoch (not today), so two runs with the same volumes produce the same rows,
+slugs and dates: query counts and render times are comparable between runs and between
+machines. Rows are written with bulk_create, one transaction per batch (signals, thumbnail
+generation and auto_now stamps are bypassed; created_at values are spread over the two years
+before the epoch). Images are a small pool of real JPEGs saved through the default storage
+and shared by many rows (gallery items get up to one file each).
+"""
+from io import BytesIO
+import datetime
+import random
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .db_sync import keep_timestamps
+from .models import (
+    CTACard, FAQ, AboutPage, ArticleComment, BoardMember, Book, CalendarEvent, ChildrensBread, GalleryImage,
+    HeroSettings, InfoCard, ManTalk, MensMinistry, NewsItem, NewsLine, PageView, Partner, SidebarPromo,
+    Testimonial, Verse, WordOfTruth,
+)
+
+DEFAULT_SEED = 20240101
+EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)  # 'now' for every seeded date
+BATCH_SIZE = 1000
+
+# Volumes of a small production-like site; seed_perf_data --scale multiplies them
+DEFAULT_VOLUMES = {
+    'articles': 24,  # per article type
+    'gallery': 36,
+    'gallery_images': 36,  # distinct gallery files (items share them round-robin when fewer)
+    'events': 40,
+    'comments': 3,  # per article
+    'testimonials': 8,
+    'faqs': 8,
+    'partners': 8,
+    'sidebar_promos': 4,
+    'board_members': 6,
+    'verses': 10,
+    'page_views': 2000,
+    'images': 4,  # distinct image files per upload directory
+}
+UNSCALED = ('comments', 'images')  # per-row or per-directory counts, not table sizes
+PROGRESS_EVERY = 100_000  # page views between progress lines
+
+ARTICLE_MODELS = (NewsItem, NewsLine, WordOfTruth, ChildrensBread, ManTalk, Book)
+
+WORDS = (
+    'grace faith hope love mercy light word truth spirit church family prayer worship praise '
+    'ministry children youth community outreach service healing peace joy strength wisdom '
+    'kingdom covenant promise blessing harvest journey freedom barrier breaking together'
+).split()
+
+
+def _sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def _paragraph(rng, sentences=4):
+    return ' '.join(_sentence(rng, rng.randint(8, 18)) for _ in range(sentences))
+
+
+def ckeditor_body(rng, sections=4):
+    """HTML shaped like CKEditor 5 output: headings, paragraphs with inline marks, lists, a quote."""
+    parts = []
+    for index in range(sections):
+        parts.append(f'<h2>{_sentence(rng, 4)[:-1]}</h2>')
+        parts.append(f'<p>{_paragraph(rng)} <strong>{_sentence(rng, 5)}</strong> <i>{_sentence(rng, 6)}</i></p>')
+        parts.append(f'<p>{_paragraph(rng, 5)}</p>')
+        if index % 2 == 0:
+            parts.append('<ul>' + ''.join(f'<li>{_sentence(rng, 7)}</li>' for _ in range(4)) + '</ul>')
+        else:
+            parts.append(f'<blockquote><p>{_sentence(rng, 14)}</p></blockquote>')
+    return ''.join(parts)
+
+
+def _jpeg(rng, size=(800, 600)):
+    from PIL import Image, ImageDraw
+
+    img = Image.new('RGB', size, tuple(rng.randint(0, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rng.randint(0, size[0]), rng.randint(0, size[1])
+        draw.ellipse((x, y, x + rng.randint(20, 200), y + rng.randint(20, 200)),
+                     fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    buf = BytesIO()
+    img.save(buf, 'JPEG', quality=80)
+    return buf.getvalue(), size
+
+
+def image_pool(rng, directory, count, size=(800, 600)):
+    """[(storage name, (width, height), bytes)] for ``count`` generated JPEGs in ``directory``."""
+    pool = []
+    for index in range(max(1, count)):
+        name = f'{directory}perf-{index:03d}.jpg'
+        data, dims = _jpeg(rng, size)
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(data))
+        pool.append((name, dims, len(data)))
+    return pool
+
+
+def _media(image):
+    name, (width, height), size = image
+    return {'media_width': width, 'media_height': height, 'media_bytes': size, 'media_format': 'jpeg'}
+
+
+def scaled_volumes(scale=1, **overrides):
+    """DEFAULT_VOLUMES with table sizes multiplied by ``scale``; ``overrides`` (not None) win."""
+    volumes = {
+        key: value if key in UNSCALED else max(1, round(value * scale))
+        for key, value in DEFAULT_VOLUMES.items()
+    }
+    volumes.update((key, value) for key, value in overrides.items() if value is not None)
+    return volumes
+
+
+def _created_at(rng, now, days=730):
+    return now - datetime.timedelta(days=rng.random() * days)
+
+
+def _bulk(model, objects):
+    with keep_timestamps(model):
+        for start in range(0, len(objects), BATCH_SIZE):
+            with transaction.atomic():
+                model.objects.bulk_create(objects[start:start + BATCH_SIZE])
+
+
+def _articles(model, count, rng, now, images):
+    field = model.media_field
+    objects = []
+    for index in range(count):
+        title = _sentence(rng, rng.randint(3, 8))[:-1][:180]
+        image = rng.choice(images)
+        created = _created_at(rng, now)
+        values = {
+            'title': title,
+            'slug': f'{model._meta.model_name}-{index:05d}',
+            field: image[0],
+            'is_published': index % 10 != 9,  # one draft in ten
+            'created_at': created,
+            **_media(image),
+        }
+        if model is Book:
+            values.update(description=_paragraph(rng, 2), review=ckeditor_body(rng, 2))
+        else:
+            values['body'] = ckeditor_body(rng)
+            values['summary'] = _paragraph(rng, 2)
+        if model in (WordOfTruth, ChildrensBread, ManTalk):
+            values['author_name'] = 'Pst. Nellie Shani'
+        if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+            values['updated_at'] = created
+        objects.append(model(**values))
+    _bulk(model, objects)
+
+
+def seed_dataset(volumes=None, seed=DEFAULT_SEED, stdout=None, now=EPOCH):
+    """
+    Create the synthetic dataset. ``volumes`` overrides DEFAULT_VOLUMES entries and every date
+    is relative to ``now`` (EPOCH by default). Returns row counts.
+    """
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    rng = random.Random(seed)
+    counts = {}
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    pools = {}
+
+    def images(directory, size=(800, 600)):
+        if directory not in pools:
+            pools[directory] = image_pool(rng, directory, volumes['images'], size)
+        return pools[directory]
+
+    for model in ARTICLE_MODELS:
+        upload_to = model._meta.get_field(model.media_field).upload_to
+        _articles(model, volumes['articles'], rng, now, images(upload_to))
+        counts[model._meta.label] = volumes['articles']
+        log(f'{model._meta.label}: {volumes["articles"]}')
+
+    hero = images('hero/', (1920, 1080))[0]
+    HeroSettings.objects.create(image=hero[0], **_media(hero))
+    CTACard.objects.create(quote_text=_sentence(rng, 16))
+    about = images('about/', (400, 400))[0]
+    AboutPage.objects.create(title='The birth of a Ministry', image=about[0], body=ckeditor_body(rng, 3), **_media(about))
+    MensMinistry.objects.create(description=_paragraph(rng), video_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    for index, (card_type, _label) in enumerate(InfoCard.CARD_TYPE_CHOICES):
+        card = images('info_cards/', (1600, 900))[index % volumes['images']]
+        InfoCard.objects.create(
+            card_type=card_type, title=_sentence(rng, 3)[:-1], slug=f'info-{card_type}', image=card[0],
+            headline=_sentence(rng, 6), summary=_paragraph(rng, 2), content=ckeditor_body(rng, 2), **_media(card),
+        )
+
+    gallery = image_pool(rng, 'gallery/', min(volumes['gallery_images'], volumes['gallery']))
+    categories = [choice for choice, _label in GalleryImage.CATEGORY_CHOICES]
+    _bulk(GalleryImage, [
+        GalleryImage(caption=_sentence(rng, 5)[:-1], image=image[0], category=rng.choice(categories),
+                     uploaded_at=_created_at(rng, now), **_media(image))
+        for image in (gallery[index % len(gallery)] for index in range(volumes['gallery']))
+    ])
+    counts['church.GalleryImage'] = volumes['gallery']
+    log(f'church.GalleryImage: {volumes["gallery"]} ({len(gallery)} image files)')
+
+    today = now.date()
+    event_types = [choice for choice, _label in CalendarEvent.EVENT_TYPE_CHOICES]
+    _bulk(CalendarEvent, [
+        CalendarEvent(
+            title=_sentence(rng, 4)[:-1], description=_paragraph(rng, 2), event_type=rng.choice(event_types),
+            event_date=today + datetime.timedelta(days=rng.randint(-180, 180)), location='Nairobi',
+            created_at=now, updated_at=now,
+        )
+        for _ in range(volumes['events'])
+    ])
+    counts['church.CalendarEvent'] = volumes['events']
+
+    photos = images('testimonials/', (400, 400))
+    _bulk(Testimonial, [
+        Testimonial(member_name=f'Member {index}', photo=photos[index % len(photos)][0], text=_paragraph(rng, 3),
+                    approved=True, created_at=_created_at(rng, now), **_media(photos[index % len(photos)]))
+        for index in range(volumes['testimonials'])
+    ])
+    _bulk(FAQ, [
+        FAQ(question=_sentence(rng, 8)[:-1] + '?', answer=_paragraph(rng, 2), display_order=index, created_at=now, updated_at=now)
+        for index in range(volumes['faqs'])
+    ])
+    logos = images('partners/', (300, 200))
+    _bulk(Partner, [
+        Partner(name=f'Partner {index}', logo=logos[index % len(logos)][0], display_order=index, created_at=now,
+                **_media(logos[index % len(logos)]))
+        for index in range(volumes['partners'])
+    ])
+    promos = images('sidebar_promos/', (300, 400))
+    _bulk(SidebarPromo, [
+        SidebarPromo(image=promos[index % len(promos)][0], caption=_sentence(rng, 4), display_order=index,
+                     created_at=now, **_media(promos[index % len(promos)]))
+        for index in range(volumes['sidebar_promos'])
+    ])
+    portraits = images('leadership/', (400, 400))
+    _bulk(BoardMember, [
+        BoardMember(name=f'Board Member {index}', role='Elder', image=portraits[index % len(portraits)][0],
+                    bio=ckeditor_body(rng, 1), display_order=index, created_at=now, updated_at=now,
+                    **_media(portraits[index % len(portraits)]))
+        for index in range(volumes['board_members'])
+    ])
+    _bulk(Verse, [
+        Verse(content=_sentence(rng, 20), reference=f'John {index + 1}:{rng.randint(1, 30)}',
+              is_featured=index == 0, date_posted=now - datetime.timedelta(days=index))
+        for index in range(volumes['verses'])
+    ])
+
+    comments = []
+    for model in ARTICLE_MODELS:
+        content_type = ContentType.objects.get_for_model(model)
+        for pk in model.objects.values_list('pk', flat=True):
+            comments.extend(
+                ArticleComment(content_type=content_type, object_id=pk, author_name=f'Reader {index}',
+                               email=f'reader{index}@example.com', content=_sentence(rng, 15),
+                               created_at=_created_at(rng, now, 60))
+                for index in range(volumes['comments'])
+            )
+    _bulk(ArticleComment, comments)
+    counts['church.ArticleComment'] = len(comments)
+    log(f'church.ArticleComment: {len(comments)}')
+
+    counts['church.PageView'] = seed_page_views(volumes['page_views'], rng, now, log=log)
+    log(f'church.PageView: {counts["church.PageView"]}')
+    return counts
+
+
+def seed_page_views(count, rng, now, days=730, log=None):
+    """``count`` PageView rows over the past ``days`` days, created in BATCH_SIZE chunks (never all in memory)."""
+    articles = {
+        'wordoftruth': ('/word-of-truth/', list(WordOfTruth.objects.values_list('pk', 'slug'))),
+        'childrensbread': ('/childrens-bread/', list(ChildrensBread.objects.values_list('pk', 'slug'))),
+        'newsline': ('/news-line/', list(NewsLine.objects.values_list('pk', 'slug'))),
+    }
+    pages = ['/', '/about/', '/gallery/', '/news/', '/books/', '/word-of-truth/', '/contact-us/']
+    created = 0
+    while created < count:
+        batch = []
+        for _ in range(min(BATCH_SIZE, count - created)):
+            ip = f'10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.0'
+            viewed_at = _created_at(rng, now, days)
+            kind = rng.choice(list(articles)) if rng.random() < 0.4 else None
+            if kind and articles[kind][1]:
+                prefix, rows = articles[kind]
+                pk, slug = rng.choice(rows)
+                batch.append(PageView(path=f'{prefix}{slug}/', ip_address=ip, content_type=kind, object_id=pk, viewed_at=viewed_at))
+            else:
+                batch.append(PageView(path=rng.choice(pages), ip_address=ip, viewed_at=viewed_at))
+        _bulk(PageView, batch)
+        created += len(batch)
+        if log is not None and created % PROGRESS_EVERY < len(batch) and created < count:
+            log(f'church.PageView: {created}/{count}')
+    return created
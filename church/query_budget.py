@@ -0,0 +1,148 @@
+"""
+Per-request query budget and N+1 detector (QueryBudgetMiddleware).
+
+When switched on (QUERY_BUDGET_ENABLED, or per request with an ``X-Query-Budget`` header
+carrying QUERY_BUDGET_TOKEN), every query the request runs on any database alias goes through
+an execute wrapper that records its SQL shape, duration and the project call site that ran it.
+After the response, a request over its budget (QUERY_BUDGETS per url_name, else
+QUERY_BUDGET_DEFAULT queries / QUERY_BUDGET_TIME_MS) or running the same shape
+QUERY_BUDGET_REPEAT_THRESHOLD times or more is logged as a warning listing the repeated
+shapes and where they come from.
+
+Header-switched requests also get X-Query-Count / X-Query-Time headers, e.g.
+
+    curl -sI -H "X-Query-Budget: $QUERY_BUDGET_TOKEN" https://.../word-of-truth/some-slug/
+"""
+from collections import Counter
+from contextlib import ExitStack
+import logging
+import os
+import re
+import sys
+import time
+
+import django
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_X_QUERY_BUDGET'
+WRAPPER_MODULES = ('church.query_budget', 'church.slow_queries')  # execute wrappers, never the call site
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_SKIP_PATHS = (
+    os.path.dirname(os.path.dirname(django.__file__)),  # site-packages
+    os.path.dirname(os.__file__),  # stdlib
+)
+
+
+def sql_shape(sql):
+    """Collapse variable-length IN lists so 'IN (%s, %s)' and 'IN (%s)' count as one shape."""
+    return _IN_LIST.sub('IN (...)', ' '.join(sql.split()))
+
+
+def call_site():
+    """'church/templatetags/comment_tags.py:15 in render_comments' for the innermost project frame."""
+    frame = sys._getframe(2)
+    base = str(settings.BASE_DIR)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(base) and not filename.startswith(_SKIP_PATHS)
+                and frame.f_globals.get('__name__') not in WRAPPER_MODULES and '/templates/' not in filename):
+            return f'{os.path.relpath(filename, base)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+class QueryRecorder:
+    """Execute wrapper collecting (shape, alias, ms, call site) for every query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def wrapper(self, alias):
+        def record(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                self.queries.append((sql_shape(sql), alias, elapsed, call_site()))
+        return record
+
+    def record(self):
+        """Context manager installing the wrapper on every configured connection (of this thread)."""
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self.wrapper(alias)))
+        return stack
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(q[2] for q in self.queries)
+
+    def repeated(self, threshold):
+        """[(shape, times, Counter of call sites)] for shapes run at least ``threshold`` times."""
+        counts = Counter(q[0] for q in self.queries)
+        repeated = []
+        for shape, times in counts.most_common():
+            if times < threshold:
+                break
+            sites = Counter(q[3] for q in self.queries if q[0] == shape)
+            repeated.append((shape, times, sites))
+        return repeated
+
+
+def budget_for(url_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {}) or {}
+    return budgets.get(url_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', 30))
+
+
+class QueryBudgetMiddleware:
+    """Record the queries of a request and warn when it goes over its budget or repeats a query shape."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        by_header = self._switched_by_header(request)
+        if not (by_header or getattr(settings, 'QUERY_BUDGET_ENABLED', False)):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        try:
+            self._report(request, recorder)
+            if by_header:
+                response['X-Query-Count'] = str(recorder.count)
+                response['X-Query-Time'] = f'{recorder.total_ms:.1f}ms'
+        except Exception as e:
+            logger.warning(f"Query budget report failed for {request.path}: {e}")
+        return response
+
+    @staticmethod
+    def _switched_by_header(request):
+        token = getattr(settings, 'QUERY_BUDGET_TOKEN', '')
+        return bool(token) and request.META.get(HEADER) == token
+
+    def _report(self, request, recorder):
+        match = getattr(request, 'resolver_match', None)
+        route = match.url_name if match and match.url_name else request.path
+        budget = budget_for(route)
+        time_budget = getattr(settings, 'QUERY_BUDGET_TIME_MS', 500)
+        repeated = recorder.repeated(getattr(settings, 'QUERY_BUDGET_REPEAT_THRESHOLD', 5))
+        if recorder.count <= budget and recorder.total_ms <= time_budget and not repeated:
+            return
+        lines = [
+            f"Query budget: {route} ({request.method} {request.path}) ran {recorder.count} queries "
+            f"(budget {budget}) in {recorder.total_ms:.1f}ms (budget {time_budget}ms)"
+        ]
+        for shape, times, sites in repeated:
+            lines.append(f"  {times}x {shape[:200]}")
+            lines.extend(f"      {n}x from {site}" for site, n in sites.most_common(3))
+        logger.warning('\n'.join(lines))
@@ -0,0 +1,62 @@
+"""
+EXPLAIN checks for the hot public queries (management command check_query_plans).
+
+Each entry pairs a query the public pages run with the index from church.indexes it is
+expected to use; check_plans() asks the database for its plan and reports the queries whose
+plan doesn't mention that index. On PostgreSQL sequential scans are disabled for the check,
+since tables with a handful of rows are always cheapest to scan and would hide a missing or
+unusable index.
+"""
+from django.db import connections, transaction
+
+from .models import (
+    FAQ, ArticleComment, BoardMember, Book, CalendarEvent, ChildrensBread, ManTalk, NewsItem, NewsLine,
+    Partner, SidebarPromo, Testimonial, Verse, WordOfTruth,
+)
+
+
+def _published(model):
+    return model.objects.filter(is_published=True).order_by('-created_at')[:10]
+
+
+HOT_QUERIES = [
+    ('news list', lambda: _published(NewsItem), 'newsitem_published_idx'),
+    ('news line list', lambda: _published(NewsLine), 'newsline_published_idx'),
+    ('word of truth list', lambda: _published(WordOfTruth), 'wordoftruth_published_idx'),
+    ("children's bread list", lambda: _published(ChildrensBread), 'childrensbread_published_idx'),
+    ('mantalk list', lambda: _published(ManTalk), 'mantalk_published_idx'),
+    ('book list', lambda: _published(Book), 'book_published_idx'),
+    ('search autocomplete', lambda: NewsItem.objects.filter(is_published=True).order_by('-created_at').values('title', 'slug')[:5],
+     'newsitem_published_idx'),
+    ('testimonials', lambda: Testimonial.objects.filter(approved=True).order_by('-created_at')[:6], 'testimonial_approved_idx'),
+    ('verse of the day', lambda: Verse.objects.filter(is_active=True, is_featured=True).order_by('-date_posted')[:1],
+     'verse_featured_idx'),
+    ('calendar month', lambda: CalendarEvent.objects.filter(is_published=True, event_date__year=2025, event_date__month=1)
+     .order_by('event_date', 'title'), 'calendarevent_published_idx'),
+    ('partners', lambda: Partner.objects.filter(is_active=True).order_by('display_order', 'name'), 'partner_active_idx'),
+    ('sidebar promos', lambda: SidebarPromo.objects.filter(is_active=True).order_by('display_order', 'created_at')[:3],
+     'sidebarpromo_active_idx'),
+    ('faqs', lambda: FAQ.objects.filter(is_active=True).order_by('display_order'), 'faq_active_idx'),
+    ('board members', lambda: BoardMember.objects.filter(is_active=True).order_by('display_order', 'name'),
+     'boardmember_active_idx'),
+    ('article comments', lambda: ArticleComment.objects.filter(content_type_id=1, object_id=1, is_approved=True)
+     .order_by('-created_at'), 'articlecomment_approved_idx'),
+]
+
+
+def explain(queryset, using='default'):
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.using(using).explain()
+
+
+def check_plans(using='default'):
+    """[(label, index name, uses index, plan)] for every hot query."""
+    results = []
+    for label, build, index_name in HOT_QUERIES:
+        plan = explain(build(), using)
+        results.append((label, index_name, index_name in plan, plan))
+    return results
@@ -0,0 +1,89 @@
+"""
+Width-stepped thumbnail variants for responsive images.
+
+For a spec like 800x600 we generate the same crop at each configured width below the
+spec width (320, 640, ...) plus the spec itself, so browsers can pick the smallest
+file that fills the slot via <img srcset/sizes>. Variants go through the thumbnail
+manifest, so once generated they render with no extra queries or storage calls.
+"""
+import logging
+
+from django.conf import settings
+
+from .thumbnail_manifest import get_placeholder, get_thumbnail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSIVE_WIDTHS = (320, 640, 960, 1280, 1600)
+
+
+def variant_sizes(size, widths=None):
+    """
+    Sizes to generate for a spec: each step narrower than the spec (same aspect ratio), then the spec.
+
+    >>> variant_sizes((800, 600), (320, 640, 960))
+    [(320, 240), (640, 480), (800, 600)]
+    """
+    if widths is None:
+        widths = getattr(settings, 'RESPONSIVE_IMAGE_WIDTHS', DEFAULT_RESPONSIVE_WIDTHS)
+    width, height = size
+    sizes = [
+        (step, max(1, round(step * height / width)))
+        for step in sorted(set(widths))
+        if step < width
+    ]
+    sizes.append((width, height))
+    return sizes
+
+
+class ResponsiveImage:
+    """Template-friendly result: src/srcset/webp_srcset/sizes, intrinsic width and height, and the LQIP placeholder."""
+
+    def __init__(self, candidates, sizes, placeholder=''):
+        # candidates: list of (thumbnail, width, height), narrowest first
+        largest, width, height = candidates[-1]
+        self.src = largest.url
+        self.width = width
+        self.height = height
+        self.sizes = sizes
+        self.placeholder = placeholder
+        self.srcset = ', '.join(f'{thumb.url} {w}w' for thumb, w, _ in candidates)
+        self.webp_srcset = ', '.join(f'{thumb.webp_url} {w}w' for thumb, w, _ in candidates)
+
+    def __str__(self):
+        return self.src
+
+    def __bool__(self):
+        return bool(self.src)
+
+
+def build_responsive_image(field_file, size, box=None, crop=True, detail=False, sizes='100vw'):
+    """
+    Resolve (and if needed generate) every width variant of ``size`` for ``field_file``.
+    Returns a ResponsiveImage, or None when no variant could be produced.
+    """
+    if not field_file or not getattr(field_file, 'name', None):
+        return None
+
+    candidates = []
+    seen_urls = set()
+    for variant in variant_sizes(size):
+        options = {'size': variant, 'crop': crop}
+        if detail:
+            options['detail'] = True
+        if box:
+            options['box'] = box
+        try:
+            thumb = get_thumbnail(field_file, options)
+        except Exception as e:
+            logger.warning(f"Failed to generate {variant} variant for {field_file.name}: {e}")
+            continue
+        if not thumb or thumb.url in seen_urls:
+            # Small sources aren't upscaled, so several steps can resolve to the same file
+            continue
+        seen_urls.add(thumb.url)
+        candidates.append((thumb, thumb.width or variant[0], thumb.height or variant[1]))
+
+    if not candidates:
+        return None
+    return ResponsiveImage(candidates, sizes, placeholder=get_placeholder(field_file))
@@ -0,0 +1,200 @@
+"""
+Server-Timing header (ServerTimingMiddleware): where the server spent a request's time, shown
+in the browser devtools Network tab.
+
+For staff, and for SERVER_TIMING_SAMPLE_RATE of other requests, the response gets e.g.
+
+    Server-Timing: db;dur=12.4;desc="7 queries", cache-get;dur=0.8;desc="5 hits / 1 misses",
+        cache-set;dur=0.3;desc="1 sets", tpl;dur=18.2;desc="templates", thumb;dur=2.1;desc="6 thumbnails",
+        total;dur=41.0;desc="view"
+
+Timings come from hooks that cost a ContextVar lookup when the request is not timed:
+
+* db: an execute wrapper on every connection for the duration of the request
+* cache-get / cache-set: TimedCache, which wraps each configured cache backend (settings.CACHES)
+* tpl: TimedDjangoTemplates, the template backend (outermost render only)
+* thumb: ``@timed('thumb')`` on the thumbnail resolvers (thumbnail_manifest, template tags)
+* total: the rest of the middleware stack and the view
+"""
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+import random
+import time
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.module_loading import import_string
+
+HEADER = 'Server-Timing'
+_current = ContextVar('server_timing', default=None)
+_MISSING = object()
+
+
+class Timings:
+    """Per-request totals: metric -> [ms, count], plus cache hits and misses."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.depth = Counter()  # open timed() blocks per metric, so nested calls count once
+
+    def add(self, metric, ms, count=1):
+        entry = self.metrics.setdefault(metric, [0.0, 0])
+        entry[0] += ms
+        entry[1] += count
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add('db', (time.perf_counter() - started) * 1000)
+
+    def header(self, total_ms):
+        def metric(name):
+            return self.metrics.get(name, (0.0, 0))
+
+        db, get, set_, tpl, thumb = (metric(name) for name in ('db', 'cache-get', 'cache-set', 'tpl', 'thumb'))
+        return ', '.join((
+            f'db;dur={db[0]:.1f};desc="{db[1]} queries"',
+            f'cache-get;dur={get[0]:.1f};desc="{self.cache_hits} hits / {self.cache_misses} misses"',
+            f'cache-set;dur={set_[0]:.1f};desc="{set_[1]} sets"',
+            f'tpl;dur={tpl[0]:.1f};desc="templates"',
+            f'thumb;dur={thumb[0]:.1f};desc="{thumb[1]} thumbnails"',
+            f'total;dur={total_ms:.1f};desc="view"',
+        ))
+
+
+@contextmanager
+def timed(metric):
+    """Add the time spent in the block (or decorated function) to ``metric`` of the current request."""
+    timings = _current.get()
+    if timings is None or timings.depth[metric]:
+        yield
+        return
+    timings.depth[metric] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.depth[metric] -= 1
+        timings.add(metric, (time.perf_counter() - started) * 1000)
+
+
+class TimedCache:
+    """
+    Cache backend wrapping the backend named by TIMED_BACKEND in its CACHES entry, timing
+    reads and writes into the current request's Timings. Everything else is delegated.
+    """
+
+    def __init__(self, location, params):
+        params = dict(params)
+        self._backend = import_string(params.pop('TIMED_BACKEND'))(location, params)
+
+    def __getattr__(self, name):
+        if name == '_backend':
+            raise AttributeError(name)
+        return getattr(self._backend, name)
+
+    def __contains__(self, key):
+        return self.has_key(key)
+
+    def _timed(self, metric, call, *args, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return call(*args, **kwargs), None
+        started = time.perf_counter()
+        value = call(*args, **kwargs)
+        timings.add(metric, (time.perf_counter() - started) * 1000)
+        return value, timings
+
+    def get(self, key, default=None, version=None):
+        value, timings = self._timed('cache-get', self._backend.get, key, _MISSING, version=version)
+        if timings is not None:
+            if value is _MISSING:
+                timings.cache_misses += 1
+            else:
+                timings.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values, timings = self._timed('cache-get', self._backend.get_many, keys, version=version)
+        if timings is not None:
+            timings.cache_hits += len(values)
+            timings.cache_misses += len(keys) - len(values)
+        return values
+
+    def has_key(self, key, version=None):
+        return self._timed('cache-get', self._backend.has_key, key, version=version)[0]
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        # BaseCache.get_or_set, through the timed get()/add()
+        value = self.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            value = default() if callable(default) else default
+            self.add(key, value, timeout=timeout, version=version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._timed('cache-set', self._backend.set, key, value, timeout=timeout, version=version)[0]
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._timed('cache-set', self._backend.add, key, value, timeout=timeout, version=version)[0]
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._timed('cache-set', self._backend.set_many, data, timeout=timeout, version=version)[0]
+
+
+class _TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('tpl'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates whose templates time their render() into the current request's Timings."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name).template, self)
+
+
+class ServerTimingMiddleware:
+    """Time staff requests and a sample of the rest; add the Server-Timing header to their responses."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self._enabled_for(request):
+            return self.get_response(request)
+
+        timings = Timings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timings.db_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        response[HEADER] = timings.header((time.perf_counter() - started) * 1000)
+        return response
+
+    @staticmethod
+    def _enabled_for(request):
+        rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0)
+        if rate and random.random() < rate:
+            return True
+        if not getattr(settings, 'SERVER_TIMING_STAFF', True):
+            return False
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_authenticated and user.is_staff)
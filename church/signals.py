@@ -1,19 +1,36 @@
 """
 Cache invalidation signals and thumbnail pre-generation.
 Clear cached singletons when related models change.
-Pre-generate thumbnails on image upload for better performance.
+Pre-generate thumbnails on image upload for better performance and record them in
+the instance's thumbnail manifest so templates can render without thumbnail lookups.
 Generate WebP copies of thumbnails for modern browsers (use <picture> in templates).
+Record intrinsic media metadata (size, format, hash) while uploads are still in memory.
+Record deletes of content rows as tombstones for incremental sync_db runs.
+Install the slow-query log's execute wrapper on every new database connection.
 """
 from io import BytesIO
-from django.db.models.signals import post_save, post_delete
+import logging
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
+from django.conf import settings
 from django.core.cache import cache
 from django.core.files.base import ContentFile
 from easy_thumbnails.files import get_thumbnailer
 from easy_thumbnails.signals import thumbnail_created
 
+from .db_sync import tombstoned_models
+from .media_fingerprint import fingerprint_enabled, fingerprint_name
+from .media_metadata import apply_metadata, empty_metadata, find_stored_duplicate, read_metadata
+from .slow_queries import install_wrapper, set_current_path
 from .models import (
+    MediaMetadataModel,
     NewsItem,
+    CalendarEvent,
+    ManTalk,
+    BoardMember,
     WordOfTruth,
     ChildrensBread,
     NewsLine,
@@ -28,8 +45,13 @@ from .models import (
     Partner,
     Verse,
     MN,
+    SyncTombstone,
 )
 from .query_utils import invalidate_home_caches
+from .responsive_images import variant_sizes
+from .thumbnail_manifest import get_manifest_entry, record_placeholder, record_thumbnail
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=HeroSettings)
@@ -95,13 +117,18 @@ def invalidate_sidebar_caches(sender, instance, **kwargs):
 
 
 # Thumbnail pre-generation signals
-def generate_thumbnails_for_image(image_field, thumbnail_sizes=None):
+def generate_thumbnails_for_image(image_field, thumbnail_sizes=None, box=None, detail=False, crop=True):
     """
-    Pre-generate thumbnails for an image field.
+    Pre-generate thumbnails for an image field and record them in the thumbnail manifest,
+    along with the LQIP placeholder (computed once per source file).
+    Options mirror what the {% safe_thumbnail %} tag requests so templates hit the manifest.
     
     Args:
         image_field: ImageField instance
         thumbnail_sizes: List of size tuples, or None to use defaults
+        box: Optional crop box from the model's ImageRatioField
+        detail: Whether to apply the detail filter (as the calendar event JSON does)
+        crop: True, or an easy_thumbnails crop mode such as 'smart' (templates' crop="smart")
     """
     if not image_field or not image_field.name:
         return
@@ -115,14 +142,21 @@ def generate_thumbnails_for_image(image_field, thumbnail_sizes=None):
             (1600, 900),  # info_card
         ]
     
+    record_placeholder(image_field)
+
     try:
         thumbnailer = get_thumbnailer(image_field)
         for size in thumbnail_sizes:
+            options = {'size': size, 'crop': crop}
+            if detail:
+                options['detail'] = True
+            if box:
+                options['box'] = box
+            if get_manifest_entry(image_field, options) is not None:
+                continue  # Already generated for this file and crop box
             try:
-                thumbnailer.get_thumbnail({
-                    'size': size,
-                    'crop': 'smart',
-                })
+                thumbnail = thumbnailer.get_thumbnail(options)
+                record_thumbnail(image_field, options, thumbnail)
             except Exception:
                 # Skip if thumbnail generation fails (e.g., invalid image)
                 continue
@@ -137,9 +171,17 @@ def pregenerate_news_thumbnails(sender, instance, **kwargs):
     if instance.image and kwargs.get('created', False):
         # Only generate thumbnails on creation to avoid regenerating on every save
         generate_thumbnails_for_image(instance.image, [
-            (400, 400),   # medium
-            (800, 600),   # large (detail view)
-        ])
+            (800, 600),   # home news section
+            (200, 200),   # related articles
+        ], crop='smart')
+        generate_thumbnails_for_image(instance.image, [
+            (1200, 800),  # detail view
+        ], detail=True)
+        # Responsive srcset variants for the news list cards
+        generate_thumbnails_for_image(
+            instance.image, variant_sizes((800, 600)),
+            box=instance.image_cropping, detail=True,
+        )
 
 
 @receiver(post_save, sender=GalleryImage)
@@ -147,10 +189,13 @@ def pregenerate_gallery_thumbnails(sender, instance, **kwargs):
     """Pre-generate thumbnails for GalleryImage."""
     if instance.image:
         generate_thumbnails_for_image(instance.image, [
-            (100, 100),   # small (thumbnails)
-            (400, 400),   # medium
-            (800, 600),   # large
-        ])
+            (200, 150),   # home gallery strip
+        ], detail=True)
+        # Responsive srcset variants for the gallery grid
+        generate_thumbnails_for_image(
+            instance.image, variant_sizes((800, 600)),
+            box=instance.image_cropping, detail=True,
+        )
 
 
 @receiver(post_save, sender=WordOfTruth)
@@ -158,9 +203,11 @@ def pregenerate_word_of_truth_thumbnails(sender, instance, **kwargs):
     """Pre-generate thumbnails for WordOfTruth images."""
     if instance.image:
         generate_thumbnails_for_image(instance.image, [
-            (400, 400),   # medium
-            (800, 600),   # large (detail view)
-        ])
+            (800, 600),   # home carousel / list items
+            (800, 500),   # listing page
+            (1200, 600),  # detail view
+            (200, 200),   # related articles
+        ], crop='smart')
 
 
 @receiver(post_save, sender=InfoCard)
@@ -168,9 +215,11 @@ def pregenerate_info_card_thumbnails(sender, instance, **kwargs):
     """Pre-generate thumbnails for InfoCard images."""
     if instance.image:
         generate_thumbnails_for_image(instance.image, [
-            (400, 400),   # medium
-            (1600, 900),  # info_card size
-        ])
+            (1600, 900),  # home info cards
+        ], crop='smart')
+        generate_thumbnails_for_image(instance.image, [
+            (1600, 900),  # info card page
+        ], box=instance.image_cropping, detail=True)
 
 
 @receiver(post_save, sender=Testimonial)
@@ -189,7 +238,55 @@ def pregenerate_partner_thumbnails(sender, instance, **kwargs):
     if instance.logo:
         generate_thumbnails_for_image(instance.logo, [
             (300, 200),   # partner logo size
-        ])
+        ], box=instance.logo_cropping, detail=True)
+
+
+@receiver(post_save, sender=HeroSettings)
+def pregenerate_hero_thumbnails(sender, instance, **kwargs):
+    """Pre-generate the hero background thumbnail."""
+    if instance.image:
+        generate_thumbnails_for_image(instance.image, [
+            (1600, 900),  # hero background
+        ], detail=True)
+
+
+@receiver(post_save, sender=NewsLine)
+@receiver(post_save, sender=ChildrensBread)
+def pregenerate_article_thumbnails(sender, instance, **kwargs):
+    """Pre-generate thumbnails for News Line and Children's Bread images."""
+    if instance.image:
+        generate_thumbnails_for_image(instance.image, [
+            (800, 600),   # list items / home carousel
+            (200, 200),   # related articles
+        ], crop='smart')
+
+
+@receiver(post_save, sender=ManTalk)
+def pregenerate_man_talk_thumbnails(sender, instance, **kwargs):
+    """Pre-generate thumbnails for ManTalk images."""
+    if instance.image:
+        generate_thumbnails_for_image(instance.image, [
+            (800, 600),   # listing page
+            (800, 533),   # detail view
+        ], box=instance.image_cropping, detail=True)
+
+
+@receiver(post_save, sender=BoardMember)
+def pregenerate_board_member_thumbnails(sender, instance, **kwargs):
+    """Pre-generate thumbnails for Board Member photos."""
+    if instance.image:
+        generate_thumbnails_for_image(instance.image, [
+            (800, 1000),  # leadership page
+        ], box=instance.image_cropping, detail=True)
+
+
+@receiver(post_save, sender=CalendarEvent)
+def pregenerate_calendar_event_thumbnails(sender, instance, **kwargs):
+    """Pre-generate the cropped thumbnail served by the calendar event JSON endpoint."""
+    if instance.image and instance.image_cropping:
+        generate_thumbnails_for_image(instance.image, [
+            (800, 600),   # event detail modal
+        ], box=instance.image_cropping, detail=True)
 
 
 # WebP image optimization: generate WebP copy for each thumbnail (use <picture> in templates)
@@ -227,3 +324,67 @@ def store_thumbnail_webp(sender, **kwargs):
         thumb_file.storage.save(webp_name, ContentFile(buf.getvalue()))
     except Exception:
         pass  # Fail silently; JPEG/PNG thumbnail is still served
+
+
+@receiver(pre_save)
+def record_media_metadata(sender, instance, **kwargs):
+    """
+    Fill MediaMetadataModel columns from a new upload before storage saves it, and clear them
+    when the file is removed. Existing files are left to the backfill_media_metadata command.
+    With MEDIA_DEDUPLICATE an upload whose hash is already stored reuses that file; with
+    MEDIA_FINGERPRINT the upload is renamed to include its content hash.
+    """
+    if not isinstance(instance, MediaMetadataModel) or kwargs.get('raw'):
+        return
+    field_file = instance.media_file
+    if not field_file:
+        if instance.media_sha256 or instance.media_bytes is not None:
+            apply_metadata(instance, empty_metadata())
+        return
+    if getattr(field_file, '_committed', True):
+        return
+    try:
+        apply_metadata(instance, read_metadata(field_file.file, field_file.name))
+    except Exception:
+        # Fail silently - the backfill command will pick it up
+        apply_metadata(instance, empty_metadata())
+        return
+    if getattr(settings, 'MEDIA_DEDUPLICATE', False):
+        existing = find_stored_duplicate(instance.media_sha256, exclude=instance)
+        if existing:
+            # Same bytes already stored: point at that file (and its thumbnails) instead of a copy.
+            # Marking it committed makes FileField.pre_save skip the upload.
+            field_file.name = existing
+            field_file._committed = True
+            return
+    if fingerprint_enabled():
+        # Storage saves under this name (upload_to + basename), so the original is fingerprinted too
+        field_file.name = fingerprint_name(field_file.name, instance.media_sha256)
+
+
+def record_tombstone(sender, instance, using, **kwargs):
+    """Remember the deleted row so incremental sync_db can delete it in other environments too."""
+    try:
+        # Savepoint, so a failed insert doesn't abort the delete's transaction on PostgreSQL
+        with transaction.atomic(using=using):
+            SyncTombstone.objects.using(using).create(model_label=sender._meta.label_lower, object_pk=str(instance.pk))
+    except Exception as e:
+        # A missed tombstone only leaves a stale row in the copy
+        logger.warning(f"Could not record sync tombstone for {sender._meta.label_lower}#{instance.pk}: {e}")
+
+
+# Connected per model (not globally) so bulk deletes of other models keep Django's fast path
+for _model in tombstoned_models():
+    post_delete.connect(record_tombstone, sender=_model, dispatch_uid=f'sync_tombstone_{_model._meta.label_lower}')
+
+
+@receiver(connection_created, dispatch_uid='slow_query_log_wrapper')
+def add_slow_query_wrapper(sender, connection, **kwargs):
+    install_wrapper(connection)
+
+
+@receiver(request_started, dispatch_uid='slow_query_log_path')
+def remember_request_path(sender, environ=None, **kwargs):
+    """Slow-query samples record the path of the request that ran them."""
+    if environ:
+        set_current_path(environ.get('PATH_INFO', ''))
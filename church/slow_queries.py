@@ -0,0 +1,203 @@
+"""
+Slow-query log (replaces the one-off analyze_neon_*.py / check_neon_stats.py scripts).
+
+Every database connection gets an execute wrapper (installed from church.signals on
+connection_created). Queries slower than SLOW_QUERY_MS, sampled at SLOW_QUERY_SAMPLE_RATE,
+are handed to one background thread, which aggregates them by fingerprint (the SQL with
+literals and placeholders replaced by ``?`` and IN lists collapsed) into SlowQuery rows and
+captures an EXPLAIN plan for SELECTs at most once per SLOW_QUERY_PLAN_TTL per fingerprint.
+With SLOW_QUERY_EXPLAIN_ANALYZE on PostgreSQL/MySQL, plain SELECTs without row locks are run
+as EXPLAIN ANALYZE; anything else (WITH, which can wrap data-modifying statements, or
+SELECT ... FOR UPDATE/SHARE) only gets EXPLAIN. Parameters are never stored: the SQL is
+normalized, and string literals in plans are replaced by '?'. The request that ran the query
+only pays for a perf_counter() and, when slow, a queue put.
+
+Staff see the result at /analytics/slow-queries/.
+"""
+from contextvars import ContextVar
+import datetime
+import hashlib
+import logging
+import queue
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_current_path = ContextVar('slow_query_path', default='')
+_local = threading.local()  # .busy while the recorder runs its own queries
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'%s|\?|\$\d+')
+_IN_LIST = re.compile(r'IN \(\?(?:, \?)*\)')
+_NOT_READ_ONLY = re.compile(r'\bFOR (?:NO KEY )?(?:UPDATE|SHARE|KEY SHARE)\b|\bINTO\b', re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    sql = ' '.join(sql.split())
+    sql = _STRINGS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?', sql)
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def threshold_ms():
+    return getattr(settings, 'SLOW_QUERY_MS', 0) or 0
+
+
+def set_current_path(path):
+    _current_path.set(path[:200])
+
+
+def analyze_safe(normalized):
+    """Whether running the statement for EXPLAIN ANALYZE cannot write or take row locks."""
+    return normalized.upper().startswith('SELECT ') and not _NOT_READ_ONLY.search(normalized)
+
+
+def redact_plan(plan):
+    """Replace string literals (bound session keys, emails, ...) in a plan with '?'."""
+    return _STRINGS.sub("'?'", plan)
+
+
+def explain(alias, sql, params, analyze=False):
+    """EXPLAIN (ANALYZE when asked, configured and supported) of one sampled statement, as redacted text."""
+    connection = connections[alias]
+    options = {}
+    if (analyze and getattr(settings, 'SLOW_QUERY_EXPLAIN_ANALYZE', False)
+            and connection.vendor in ('postgresql', 'mysql')):
+        options['analyze'] = True
+    prefix = connection.ops.explain_query_prefix(None, **options)
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}', params)
+        rows = cursor.fetchall()
+    plan = '\n'.join(' '.join(str(value) for value in row) for row in rows)
+    return redact_plan(plan), bool(options)
+
+
+class _SlowQueryRecorder:
+    """Background thread turning sampled slow queries into SlowQuery rows (one batch at a time)."""
+    MAX_QUEUED = 500  # drop samples rather than queue without bound if the database is down
+    BATCH_SIZE = 50
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=self.MAX_QUEUED)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, alias, sql, params, elapsed_ms):
+        try:
+            self._queue.put_nowait((alias, sql, params, elapsed_ms, _current_path.get()))
+        except queue.Full:
+            return
+        if not getattr(settings, 'SLOW_QUERY_ASYNC', True):
+            return  # tests: samples wait for flush() in the test's thread
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='slow-query-recorder', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            close_old_connections()
+            try:
+                self.process(batch)
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Record everything queued, in the calling thread."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self.process(batch)
+
+    def process(self, samples):
+        _local.busy = True
+        try:
+            for alias, sql, params, elapsed_ms, path in samples:
+                try:
+                    self._record(alias, sql, params, elapsed_ms, path)
+                except Exception as e:
+                    logger.warning(f"Could not record slow query: {e}")
+        finally:
+            _local.busy = False
+
+    def _record(self, alias, sql, params, elapsed_ms, path):
+        from .models import SlowQuery
+
+        normalized = normalize_sql(sql)
+        key = fingerprint(normalized)
+        entry, created = SlowQuery.objects.get_or_create(
+            fingerprint=key,
+            defaults={'sql': normalized, 'database': alias, 'path': path, 'calls': 1,
+                      'total_ms': elapsed_ms, 'max_ms': elapsed_ms},
+        )
+        if not created:
+            SlowQuery.objects.filter(pk=entry.pk).update(
+                calls=F('calls') + 1,
+                total_ms=F('total_ms') + elapsed_ms,
+                max_ms=Greatest(F('max_ms'), elapsed_ms),
+                path=path or entry.path,
+                last_seen=timezone.now(),
+            )
+        ttl = datetime.timedelta(seconds=getattr(settings, 'SLOW_QUERY_PLAN_TTL', 86400))
+        stale = entry.plan_captured_at is None or timezone.now() - entry.plan_captured_at > ttl
+        if stale and normalized.upper().startswith(('SELECT', 'WITH')):
+            try:
+                plan, analyzed = explain(alias, sql, params, analyze=analyze_safe(normalized))
+            except Exception as e:
+                plan, analyzed = redact_plan(f'EXPLAIN failed: {e}'), False
+            SlowQuery.objects.filter(pk=entry.pk).update(
+                plan=plan, plan_analyzed=analyzed, plan_captured_at=timezone.now(),
+            )
+
+
+_recorder = _SlowQueryRecorder()
+
+
+def slow_query_wrapper(alias):
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            limit = threshold_ms()
+            if (limit and elapsed >= limit and not many and not getattr(_local, 'busy', False)
+                    and random.random() < getattr(settings, 'SLOW_QUERY_SAMPLE_RATE', 1.0)):
+                _recorder.submit(alias, sql, params, elapsed)
+    wrapper.slow_query_log = True
+    return wrapper
+
+
+def install_wrapper(connection):
+    """
+    Add the slow-query wrapper to a connection once (it outlives reconnects). It goes to the
+    bottom of the stack: connection_created can fire inside an execute_wrapper() block, which
+    pops the last wrapper on exit.
+    """
+    if not any(getattr(w, 'slow_query_log', False) for w in connection.execute_wrappers):
+        connection.execute_wrappers.insert(0, slow_query_wrapper(connection.alias))
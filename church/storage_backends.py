@@ -0,0 +1,33 @@
+"""
+Storage backends for media.
+Only imported when configured in STORAGES / THUMBNAIL_DEFAULT_STORAGE (needs google-cloud-storage).
+"""
+from storages.backends.gcloud import GoogleCloudStorage
+from storages.utils import clean_name
+
+from .media_fingerprint import IMMUTABLE_CACHE_CONTROL, is_fingerprinted
+from .storage_cache import CachedStorageMixin
+
+
+class FingerprintedGoogleCloudStorage(GoogleCloudStorage):
+    """
+    GCS storage that marks content-fingerprinted objects (and their thumbnails / .webp siblings)
+    as immutable, so browsers and CDNs cache them for a year instead of GCS's 1h default.
+    """
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        if is_fingerprinted(name):
+            params['cache_control'] = IMMUTABLE_CACHE_CONTROL
+        return params
+
+
+class CachedGoogleCloudStorage(CachedStorageMixin, FingerprintedGoogleCloudStorage):
+    """FingerprintedGoogleCloudStorage with the read-through local-disk cache from storage_cache."""
+
+    def _fetch_stat(self, name):
+        # One metadata request answers exists/size, and the generation changes on every overwrite
+        blob = self.bucket.get_blob(self._normalize_name(clean_name(name)))
+        if blob is None:
+            return {'exists': False}
+        return {'exists': True, 'size': blob.size, 'version': str(blob.generation or blob.etag or '')}
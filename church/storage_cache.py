@@ -0,0 +1,244 @@
+"""
+Read-through local-disk cache for remote media storage (GCS).
+
+easy_thumbnails, safe_thumbnail and the forms call ``open``/``exists``/``size`` on the storage
+for every source image, and on GCS each of those is a round trip to storage.googleapis.com.
+CachedStorageMixin keeps:
+
+* a stat entry per name (exists, size, version) in the Django cache, with a short TTL for
+  missing names (negative caching: thumbnails that haven't been generated yet), and
+* the bytes of opened files on local disk, named by the object's version (GCS generation),
+  so a re-uploaded object can never be served from a stale copy. The directory is bounded
+  and evicts least-recently-used files once it grows past its size cap.
+
+The disk copy is only enabled with an explicit MEDIA_DISK_CACHE_DIR: on Cloud Run the filesystem
+is in-memory, so the cache costs up to MEDIA_DISK_CACHE_MAX_BYTES of RAM per instance there.
+
+Writes and deletes through the storage invalidate both. The mixin is storage-agnostic;
+storage_backends.CachedGoogleCloudStorage applies it to GCS, and tests use FileSystemStorage.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_STAT_TTL = 60 * 10
+DEFAULT_NEGATIVE_TTL = 60
+EVICT_TO = 0.9  # evict down to this fraction of the cap so eviction doesn't run on every insert
+
+
+class CachedStorageMixin:
+    """Mix in before a Storage class to cache its reads on local disk."""
+
+    cache_key_prefix = 'media_stat'
+
+    def __init__(self, *args, cache_dir=None, cache_max_bytes=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        cache_dir = cache_dir or getattr(settings, 'MEDIA_DISK_CACHE_DIR', None)
+        if not cache_dir:
+            # No tempdir fallback: on Cloud Run /tmp is RAM, so the location must be chosen
+            raise ImproperlyConfigured('CachedStorageMixin needs cache_dir or settings.MEDIA_DISK_CACHE_DIR.')
+        self.cache_dir = str(cache_dir)
+        self.cache_max_bytes = (
+            cache_max_bytes if cache_max_bytes is not None
+            else getattr(settings, 'MEDIA_DISK_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+        )
+        self._cache_bytes = None  # lazily measured, then tracked per insert
+        self._cache_lock = threading.Lock()
+
+    # -- stat entries -------------------------------------------------------
+
+    def _stat_key(self, name):
+        return f'{self.cache_key_prefix}:{hashlib.sha256(name.encode()).hexdigest()}'
+
+    def _fetch_stat(self, name):
+        """(exists, size, version) straight from the backend; overridden for a single round trip on GCS."""
+        if not super().exists(name):
+            return {'exists': False}
+        size = super().size(name)
+        try:
+            version = str(int(super().get_modified_time(name).timestamp() * 1_000_000))
+        except Exception:
+            version = ''
+        return {'exists': True, 'size': size, 'version': f'{version}-{size}'}
+
+    def _stat(self, name):
+        key = self._stat_key(name)
+        stat = cache.get(key)
+        if stat is None:
+            stat = self._fetch_stat(name)
+            ttl = (
+                getattr(settings, 'MEDIA_DISK_CACHE_STAT_TTL', DEFAULT_STAT_TTL) if stat['exists']
+                else getattr(settings, 'MEDIA_DISK_CACHE_NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL)
+            )
+            cache.set(key, stat, ttl)
+        return stat
+
+    def exists(self, name):
+        if not name:
+            return super().exists(name)
+        return self._stat(name)['exists']
+
+    def size(self, name):
+        stat = self._stat(name)
+        if not stat['exists']:
+            raise FileNotFoundError(name)
+        return stat['size']
+
+    # -- local copies -------------------------------------------------------
+
+    def _local_dir(self, name):
+        digest = hashlib.sha256(name.encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2]), digest
+
+    def _local_path(self, name, version):
+        directory, digest = self._local_dir(name)
+        safe_version = ''.join(c for c in str(version) if c.isalnum() or c == '-')
+        return os.path.join(directory, f'{digest}.{safe_version}')
+
+    def _open(self, name, mode='rb'):
+        if 'w' in mode or '+' in mode or 'a' in mode:
+            return super()._open(name, mode)
+        stat = self._stat(name)
+        if not stat['exists']:
+            raise FileNotFoundError(name)
+
+        path = self._local_path(name, stat['version'])
+        try:
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            handle = None
+        if handle is not None:
+            try:
+                os.utime(path)  # mtime is the LRU clock (atime is often disabled)
+            except OSError:
+                pass
+            return File(handle, name)
+
+        try:
+            remote = super()._open(name, 'rb')
+        except FileNotFoundError:
+            cache.delete(self._stat_key(name))  # deleted behind our back
+            raise
+        try:
+            cached = self._store_local(remote, path, stat['size'])
+        except Exception as e:
+            logger.warning(f"Media disk cache: could not cache {name}: {e}")
+            cached = False
+        if not cached:
+            remote.seek(0)
+            return remote
+        remote.close()
+        return File(open(path, 'rb'), name)
+
+    def _store_local(self, remote, path, expected_size):
+        """Copy ``remote`` to ``path`` atomically; False when the bytes don't match the stat (changed mid-read)."""
+        if expected_size is not None and expected_size > self.cache_max_bytes:
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in remote.chunks():
+                    tmp.write(chunk)
+                    written += len(chunk)
+            if expected_size is not None and written != expected_size:
+                os.remove(tmp_path)
+                return False
+            # Older versions of the same name are stale now
+            self._remove_local(os.path.dirname(path), os.path.basename(path).split('.')[0])
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._account(written)
+        return True
+
+    def _remove_local(self, directory, digest):
+        try:
+            entries = os.listdir(directory)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.startswith(f'{digest}.') and not entry.endswith('.tmp'):
+                try:
+                    size = os.path.getsize(os.path.join(directory, entry))
+                    os.remove(os.path.join(directory, entry))
+                    self._account(-size)
+                except OSError:
+                    pass
+
+    def _account(self, delta):
+        with self._cache_lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = self._measure()
+            else:
+                self._cache_bytes += delta
+            over = self._cache_bytes > self.cache_max_bytes
+        if over:
+            self.evict()
+
+    def _measure(self):
+        total = 0
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for filename in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, filename))
+                except OSError:
+                    pass
+        return total
+
+    def evict(self):
+        """Delete least-recently-used local copies until the cache is below its cap."""
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for filename in files:
+                if filename.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        target = self.cache_max_bytes * EVICT_TO
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._cache_lock:
+            # Other processes share the directory, so resync with what is actually there
+            self._cache_bytes = total
+
+    # -- invalidation -------------------------------------------------------
+
+    def invalidate(self, name):
+        cache.delete(self._stat_key(name))
+        self._remove_local(*self._local_dir(name))
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        self.invalidate(name)
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        self.invalidate(name)
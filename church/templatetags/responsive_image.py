@@ -0,0 +1,58 @@
+"""
+Template tag emitting width-stepped srcset data for an image field.
+"""
+from django import template
+import logging
+
+from ..responsive_images import build_responsive_image
+from ..server_timing import timed
+from ..thumbnail_manifest import get_placeholder
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+
+@register.simple_tag
+@timed('thumb')
+def responsive_image(image_field, size, box=None, crop=True, detail=False, sizes='100vw'):
+    """
+    Resolve width variants of a thumbnail spec for <img srcset/sizes>.
+    Sets the variable to None if the image is missing or invalid.
+
+    Usage:
+        {% responsive_image item.image "800x600" box=item.image_cropping sizes="(min-width: 1024px) 33vw, 100vw" as img %}
+        {% if img %}
+        <picture>
+            <source type="image/webp" srcset="{{ img.webp_srcset }}" sizes="{{ img.sizes }}">
+            <img src="{{ img.src }}" srcset="{{ img.srcset }}" sizes="{{ img.sizes }}"
+                 width="{{ img.width }}" height="{{ img.height }}" alt="..." loading="lazy"
+                 {% if img.placeholder %}style="background: url('{{ img.placeholder }}') center / cover"{% endif %}>
+        </picture>
+        {% endif %}
+    """
+    try:
+        width, height = map(int, str(size).split('x'))
+    except ValueError:
+        raise template.TemplateSyntaxError(
+            f"Invalid size format: {size}. Expected format: '800x600'"
+        )
+    try:
+        return build_responsive_image(image_field, (width, height), box=box, crop=crop, detail=detail, sizes=sizes)
+    except Exception as e:
+        logger.warning(f"Failed to build responsive image for {getattr(image_field, 'name', 'unknown')}: {e}")
+        return None
+
+
+@register.filter
+def lqip(image_field):
+    """
+    Inline placeholder (tiny base64 JPEG data URI) recorded for an image field, or ''.
+    Never reads the image; placeholders are computed at upload by the pre-generation signals.
+
+    Usage:
+        <div style="background: url('{{ item.image|lqip }}') center / cover">...</div>
+    """
+    try:
+        return get_placeholder(image_field)
+    except Exception:
+        return ''
@@ -1,5 +1,7 @@
 """
 Custom template tag for safe thumbnail generation that handles errors gracefully.
+Thumbnails already recorded in the instance's thumbnail manifest are returned without
+any storage or database access.
 """
 from django import template
 from easy_thumbnails.files import get_thumbnailer
@@ -8,10 +10,23 @@ from django.core.files.storage import default_storage
 from PIL import Image as PILImage
 import logging
 
+from ..image_proxy import deferred_generation_enabled, proxy_thumbnail
+from ..server_timing import timed
+from ..thumbnail_manifest import get_manifest_thumbnail, record_thumbnail, with_webp_url
+
 register = template.Library()
 logger = logging.getLogger(__name__)
 
 
+def _has_image_metadata(image_field):
+    """True when the owning instance recorded intrinsic dimensions for this file (MediaMetadataModel)."""
+    instance = getattr(image_field, 'instance', None)
+    return bool(
+        getattr(instance, 'media_width', None)
+        and getattr(instance, 'media_field', None) == image_field.field.name
+    )
+
+
 class SafeThumbnailNode(template.Node):
     def __init__(self, image_field, size, box_var, crop, detail, var_name):
         self.image_field = template.Variable(image_field)
@@ -21,6 +36,7 @@ class SafeThumbnailNode(template.Node):
         self.detail = detail
         self.var_name = var_name
     
+    @timed('thumb')
     def render(self, context):
         try:
             image_field = self.image_field.resolve(context)
@@ -29,24 +45,6 @@ class SafeThumbnailNode(template.Node):
                 context[self.var_name] = None
                 return ''
             
-            # Check if file exists
-            if not default_storage.exists(image_field.name):
-                context[self.var_name] = None
-                return ''
-            
-            # Try to validate the image file
-            try:
-                with default_storage.open(image_field.name, 'rb') as f:
-                    PILImage.open(f).verify()
-            except Exception:
-                # Image is corrupted or invalid
-                logger.warning(f"Invalid image file: {image_field.name}")
-                context[self.var_name] = None
-                return ''
-            
-            # Generate thumbnail
-            thumbnailer = get_thumbnailer(image_field)
-            
             options = {
                 'size': self.size,
                 'crop': self.crop,
@@ -61,8 +59,38 @@ class SafeThumbnailNode(template.Node):
                 except template.VariableDoesNotExist:
                     pass
             
+            # Manifest hit: no storage or easy_thumbnails queries needed
+            manifest_thumbnail = get_manifest_thumbnail(image_field, options)
+            if manifest_thumbnail is not None:
+                context[self.var_name] = manifest_thumbnail
+                return ''
+            
+            # Deferred generation: emit a signed /img/ URL, the proxy view generates on first hit
+            if deferred_generation_enabled():
+                context[self.var_name] = proxy_thumbnail(image_field, options)
+                return ''
+            
+            # Stored metadata means the upload was already read as a valid image;
+            # otherwise check existence and validity in storage first
+            if not _has_image_metadata(image_field):
+                if not default_storage.exists(image_field.name):
+                    context[self.var_name] = None
+                    return ''
+                
+                try:
+                    with default_storage.open(image_field.name, 'rb') as f:
+                        PILImage.open(f).verify()
+                except Exception:
+                    # Image is corrupted or invalid
+                    logger.warning(f"Invalid image file: {image_field.name}")
+                    context[self.var_name] = None
+                    return ''
+            
+            # Generate thumbnail and remember it on the instance for later renders
+            thumbnailer = get_thumbnailer(image_field)
             thumbnail = thumbnailer.get_thumbnail(options)
-            context[self.var_name] = thumbnail
+            record_thumbnail(image_field, options, thumbnail)
+            context[self.var_name] = with_webp_url(thumbnail)
             return ''
             
         except (InvalidImageFormatError, IOError, OSError, Exception) as e:
@@ -71,6 +99,14 @@ class SafeThumbnailNode(template.Node):
             return ''
 
 
+def _crop_value(value):
+    """crop=True/False as a bool; any other value (e.g. "smart", "scale") goes to easy_thumbnails as a string."""
+    value = value.strip('"\'')
+    if value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    return value
+
+
 @register.tag(name='safe_thumbnail')
 def safe_thumbnail_tag(parser, token):
     """
@@ -78,6 +114,7 @@ def safe_thumbnail_tag(parser, token):
     
     Usage:
         {% safe_thumbnail article.image "800x600" box=article.image_cropping crop=True detail=True as thumb %}
+        {% safe_thumbnail article.image "800x600" crop="smart" as thumb %}
         {% if thumb %}
             <img src="{{ thumb.url }}" alt="...">
         {% else %}
@@ -110,28 +147,28 @@ def safe_thumbnail_tag(parser, token):
     i = 3
     while i < len(bits):
         bit = bits[i]
-        if bit == 'box':
-            if i + 1 >= len(bits):
-                raise template.TemplateSyntaxError("'box' requires a value")
-            box_var = bits[i + 1]
-            i += 2
-        elif bit == 'crop':
-            if i + 1 >= len(bits):
-                raise template.TemplateSyntaxError("'crop' requires a value")
-            crop = bits[i + 1].lower() == 'true'
-            i += 2
-        elif bit == 'detail':
-            if i + 1 >= len(bits):
-                raise template.TemplateSyntaxError("'detail' requires a value")
-            detail = bits[i + 1].lower() == 'true'
-            i += 2
-        elif bit == 'as':
+        # Options are written either as key=value or as "key value"
+        if '=' in bit:
+            key, value = bit.split('=', 1)
+            i += 1
+        elif bit in ('box', 'crop', 'detail', 'as'):
             if i + 1 >= len(bits):
-                raise template.TemplateSyntaxError("'as' requires a variable name")
-            var_name = bits[i + 1]
+                raise template.TemplateSyntaxError(f"'{bit}' requires a value")
+            key, value = bit, bits[i + 1]
             i += 2
         else:
             i += 1
+            continue
+        if key == 'box':
+            box_var = value
+        elif key == 'crop':
+            crop = _crop_value(value)
+        elif key == 'detail':
+            detail = value.strip('"\'').lower() == 'true'
+        elif key == 'as':
+            var_name = value
+        else:
+            raise template.TemplateSyntaxError(f"'safe_thumbnail' got an unknown option '{key}'")
     
     if not var_name:
         raise template.TemplateSyntaxError("'safe_thumbnail' tag requires 'as variable_name'")
@@ -1,3 +1,7 @@
+import os
+from pathlib import Path
+from unittest import skipUnless
+
 from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from .models import BoardMember, Book
@@ -87,3 +91,1170 @@ class BooksPaginationTemplateTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Page 2 of 2")
         self.assertNotContains(response, "{{ books.paginator.num_pages }}")
+
+
+def _make_test_jpeg(name="photo.jpg", size=(1200, 900), color=(200, 30, 60)):
+    """Return a SimpleUploadedFile containing a real JPEG of the given size."""
+    from io import BytesIO
+    from PIL import Image
+    buf = BytesIO()
+    Image.new('RGB', size, color).save(buf, 'JPEG')
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/jpeg")
+
+
+class ThumbnailManifestTests(TestCase):
+    def test_pregenerated_thumbnails_are_recorded_and_rendered_without_queries(self):
+        from django.template import Context, Template
+        from .models import GalleryImage
+
+        item = GalleryImage.objects.create(caption="Choir", image=_make_test_jpeg())
+        item.refresh_from_db()
+        specs = item.thumbnail_manifest['image']['specs']
+        self.assertEqual(item.thumbnail_manifest['image']['source'], item.image.name)
+        self.assertEqual((specs['200x150_crop_detail']['width'], specs['200x150_crop_detail']['height']), (200, 150))
+        self.assertEqual(specs['200x150_crop_detail']['format'], 'jpeg')
+
+        tpl = Template('{% load safe_thumbnail %}{% safe_thumbnail item.image "200x150" crop=True detail=True as thumb %}{{ thumb.url }}')
+        with self.assertNumQueries(0):
+            html = tpl.render(Context({'item': item}))
+        self.assertEqual(html, specs['200x150_crop_detail']['url'])
+
+    def test_manifest_entry_ignored_after_reupload(self):
+        from .models import GalleryImage
+        from .thumbnail_manifest import get_manifest_thumbnail
+
+        item = GalleryImage.objects.create(caption="Outreach", image=_make_test_jpeg())
+        options = {'size': (200, 150), 'crop': True, 'detail': True}
+        self.assertIsNotNone(get_manifest_thumbnail(item.image, options))
+        item.image.name = 'gallery/replaced.jpg'
+        self.assertIsNone(get_manifest_thumbnail(item.image, options))
+
+    def test_related_articles_keep_smart_crop(self):
+        from unittest import mock
+        from django.template.loader import render_to_string
+        from easy_thumbnails.files import get_thumbnailer
+        from .models import NewsItem
+
+        item = NewsItem.objects.create(title="Harvest", slug="harvest", summary="x", body="x", image=_make_test_jpeg(size=(1600, 1200)))
+        item.refresh_from_db()
+        self.assertIn('200x200_crop-smart', item.thumbnail_manifest['image']['specs'])
+
+        NewsItem.objects.update(thumbnail_manifest={})
+        item.refresh_from_db()
+        thumbnailer_class = type(get_thumbnailer(item.image))
+        with mock.patch.object(thumbnailer_class, 'get_thumbnail', autospec=True,
+                               side_effect=thumbnailer_class.get_thumbnail) as get_thumbnail:
+            render_to_string('church/partials/related_articles.html', {'articles': [item], 'type': 'news'})
+        options = get_thumbnail.call_args.args[1]
+        self.assertEqual(options['crop'], 'smart')
+        self.assertEqual(options['size'], (200, 200))
+
+    def test_concurrent_manifest_writes_merge_in_the_database(self):
+        from .models import GalleryImage
+        from .thumbnail_manifest import _update_field_entry
+
+        item = GalleryImage.objects.create(caption="Youth", image=_make_test_jpeg())
+        stale = GalleryImage.objects.get(pk=item.pk)  # a second render holding the same row
+
+        def add(key):
+            def update(field_entry):
+                field_entry['specs'] = {**field_entry.get('specs', {}), key: {'url': key}}
+            return update
+
+        _update_field_entry(item.image, add('first'))
+        _update_field_entry(stale.image, add('second'))
+        specs = GalleryImage.objects.get(pk=item.pk).thumbnail_manifest['image']['specs']
+        self.assertIn('first', specs)
+        self.assertIn('second', specs)
+        self.assertIn('first', stale.thumbnail_manifest['image']['specs'])
+
+
+class ResponsiveImageTests(TestCase):
+    def test_variant_sizes_keep_aspect_ratio_and_stop_at_spec_width(self):
+        from .responsive_images import variant_sizes
+
+        self.assertEqual(
+            variant_sizes((800, 600), (320, 640, 960)),
+            [(320, 240), (640, 480), (800, 600)],
+        )
+
+    def test_srcset_lists_pregenerated_widths_without_queries(self):
+        from django.template import Context, Template
+        from .models import GalleryImage
+
+        item = GalleryImage.objects.create(caption="Baptism", image=_make_test_jpeg())
+        item.refresh_from_db()
+        tpl = Template(
+            '{% load responsive_image %}'
+            '{% responsive_image item.image "800x600" box=item.image_cropping detail=True sizes="50vw" as img %}'
+            '{{ img.srcset }}|{{ img.width }}x{{ img.height }}|{{ img.sizes }}'
+        )
+        with self.assertNumQueries(0):
+            html = tpl.render(Context({'item': item}))
+        srcset, dimensions, sizes = html.split('|')
+        self.assertIn(' 320w', srcset)
+        self.assertIn(' 640w', srcset)
+        self.assertTrue(srcset.endswith(' 800w'))
+        self.assertEqual(dimensions, '800x600')
+        self.assertEqual(sizes, '50vw')
+
+
+class MediaNegotiationTests(TestCase):
+    def setUp(self):
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        with open(f'{self.media_root}/photo.jpg', 'wb') as f:
+            f.write(b'jpeg-bytes')
+        with open(f'{self.media_root}/photo.jpg.webp', 'wb') as f:
+            f.write(b'webp')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _get(self, accept):
+        from django.test import RequestFactory
+        from .media_negotiation import serve_media
+        request = RequestFactory().get('/media/photo.jpg', HTTP_ACCEPT=accept)
+        response = serve_media(request, 'photo.jpg', document_root=self.media_root)
+        return response, b''.join(response.streaming_content)
+
+    def test_webp_sibling_served_when_accepted(self):
+        response, body = self._get('image/avif,image/webp,image/*;q=0.8')
+        self.assertEqual(body, b'webp')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('Accept', response['Vary'])
+        self.assertIn('max-age=', response['Cache-Control'])
+
+    def test_original_served_without_explicit_webp(self):
+        response, body = self._get('image/webp;q=0, */*')
+        self.assertEqual(body, b'jpeg-bytes')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('Accept', response['Vary'])
+
+
+class ImagePlaceholderTests(TestCase):
+    def test_placeholder_recorded_at_upload_and_inlined_by_filter(self):
+        import base64
+        from io import BytesIO
+        from PIL import Image
+        from django.template import Context, Template
+        from .models import GalleryImage
+
+        item = GalleryImage.objects.create(caption="Youth camp", image=_make_test_jpeg())
+        item.refresh_from_db()
+        placeholder = item.thumbnail_manifest['image']['placeholder']
+        prefix = 'data:image/jpeg;base64,'
+        self.assertTrue(placeholder.startswith(prefix))
+        img = Image.open(BytesIO(base64.b64decode(placeholder[len(prefix):])))
+        self.assertEqual(img.size, (16, 12))
+
+        tpl = Template('{% load responsive_image %}{{ item.image|lqip }}')
+        with self.assertNumQueries(0):
+            self.assertEqual(tpl.render(Context({'item': item})), placeholder)
+
+
+@override_settings(IMAGE_UPLOAD_MAX_DIMENSION=1000)
+class ImageIngestTests(TestCase):
+    def test_large_upload_is_oriented_downscaled_and_stripped(self):
+        from io import BytesIO
+        from PIL import Image
+        from .image_ingest import normalize_upload
+
+        img = Image.new('RGB', (2000, 1500), (10, 120, 200))
+        exif = img.getexif()
+        exif[0x0112] = 6  # Orientation: rotate 90° CW on display
+        exif[0x010F] = 'PhoneMaker'
+        buf = BytesIO()
+        img.save(buf, 'JPEG', exif=exif)
+        upload = SimpleUploadedFile('phone.jpg', buf.getvalue(), content_type='image/jpeg')
+
+        result = normalize_upload(upload)
+        self.assertEqual(result.name, 'phone.jpg')
+        out = Image.open(result)
+        self.assertEqual(out.size, (750, 1000))
+        self.assertEqual(len(out.getexif()), 0)
+
+    def test_small_clean_upload_is_left_untouched(self):
+        from .image_ingest import normalize_upload
+
+        upload = _make_test_jpeg(size=(400, 300))
+        self.assertIs(normalize_upload(upload), upload)
+
+    def test_book_and_board_member_admin_forms_normalize_uploads(self):
+        from PIL import Image
+        from django.conf import settings
+        from .forms import BoardMemberAdminForm, BookAdminForm
+
+        for form_class, field in ((BookAdminForm, 'cover_image'), (BoardMemberAdminForm, 'image')):
+            form = form_class(data={}, files={field: _make_test_jpeg(size=(4000, 3000))})
+            form.is_valid()
+            self.assertEqual(max(Image.open(form.cleaned_data[field]).size), settings.IMAGE_UPLOAD_MAX_DIMENSION)
+
+
+class MediaMetadataTests(TestCase):
+    def test_metadata_recorded_at_upload(self):
+        import hashlib
+        from .models import GalleryImage
+
+        upload = _make_test_jpeg(size=(640, 480))
+        content = upload.read()
+        upload.seek(0)
+        item = GalleryImage.objects.create(caption="Choir", image=upload)
+        item.refresh_from_db()
+        self.assertEqual((item.media_width, item.media_height), (640, 480))
+        self.assertEqual(item.media_bytes, len(content))
+        self.assertEqual(item.media_format, 'jpeg')
+        self.assertEqual(item.media_sha256, hashlib.sha256(content).hexdigest())
+
+    def test_backfill_command_fills_missing_rows(self):
+        from django.core.management import call_command
+        from io import StringIO
+        from .models import GalleryImage
+
+        item = GalleryImage.objects.create(caption="Retreat", image=_make_test_jpeg(size=(300, 200)))
+        GalleryImage.objects.filter(pk=item.pk).update(media_width=None, media_height=None, media_sha256='')
+        call_command('backfill_media_metadata', '--model', 'GalleryImage', stdout=StringIO())
+        item.refresh_from_db()
+        self.assertEqual((item.media_width, item.media_height), (300, 200))
+        self.assertEqual(len(item.media_sha256), 64)
+
+
+@override_settings(MEDIA_FINGERPRINT=True)
+class MediaFingerprintTests(TestCase):
+    def test_upload_and_thumbnails_are_named_by_content_hash(self):
+        from .models import GalleryImage
+
+        item = GalleryImage.objects.create(caption="Choir", image=_make_test_jpeg("choir.jpg"))
+        item.refresh_from_db()
+        fingerprint = item.media_sha256[:16]
+        self.assertTrue(item.image.name.endswith(f'choir.{fingerprint}.jpg'))
+        thumb_name = item.thumbnail_manifest['image']['specs']['200x150_crop_detail']['name']
+        self.assertIn(f'.{fingerprint}.', thumb_name)
+
+    def test_fingerprinted_media_served_immutable(self):
+        import shutil
+        import tempfile
+        from django.test import RequestFactory
+        from .media_negotiation import serve_media
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, True)
+        for name in ('photo.jpg', 'photo.0123456789abcdef.jpg'):
+            with open(f'{root}/{name}', 'wb') as f:
+                f.write(b'x')
+        request = RequestFactory().get('/media/')
+        plain = serve_media(request, 'photo.jpg', document_root=root)
+        hashed = serve_media(request, 'photo.0123456789abcdef.jpg', document_root=root)
+        self.assertNotIn('immutable', plain['Cache-Control'])
+        self.assertEqual(hashed['Cache-Control'], 'public, max-age=31536000, immutable')
+
+
+class MediaGarbageCollectorTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        # Never let the collector see the real media/ directory
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_gc_removes_only_unreferenced_files(self):
+        from io import StringIO
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from django.core.management import call_command
+        from .models import GalleryImage
+
+        item = GalleryImage.objects.create(caption="Kept", image=_make_test_jpeg("kept.jpg"))
+        item.refresh_from_db()
+        kept_thumb = item.thumbnail_manifest['image']['specs']['200x150_crop_detail']['name']
+        orphan = default_storage.save('gallery/orphan.jpg', ContentFile(b'x'))
+        orphan_webp = default_storage.save(orphan + '.webp', ContentFile(b'x'))
+
+        call_command('gc_media', '--dry-run', '--min-age-hours', '0', stdout=StringIO())
+        self.assertTrue(default_storage.exists(orphan))
+
+        call_command('gc_media', '--min-age-hours', '0', '--rate', '0', stdout=StringIO())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(default_storage.exists(orphan_webp))
+        self.assertTrue(default_storage.exists(item.image.name))
+        self.assertTrue(default_storage.exists(kept_thumb))
+        self.assertTrue(default_storage.exists(kept_thumb + '.webp'))
+
+
+class MediaDeduplicationTests(TestCase):
+    @override_settings(MEDIA_DEDUPLICATE=True)
+    def test_identical_upload_reuses_stored_file(self):
+        from .models import GalleryImage, NewsLine
+
+        first = GalleryImage.objects.create(caption="Choir", image=_make_test_jpeg("a.jpg"))
+        second = NewsLine.objects.create(title="Choir", image=_make_test_jpeg("b.jpg"))
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(second.media_sha256, first.media_sha256)
+
+    def test_identical_upload_is_stored_separately_by_default(self):
+        from .models import GalleryImage, NewsLine
+
+        first = GalleryImage.objects.create(caption="Choir", image=_make_test_jpeg("a.jpg"))
+        second = NewsLine.objects.create(title="Choir", image=_make_test_jpeg("b.jpg"))
+        self.assertNotEqual(second.image.name, first.image.name)
+        self.assertEqual(second.media_sha256, first.media_sha256)
+
+    def test_cleanup_gallery_groups_by_hash_in_database(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import GalleryImage
+
+        keep = GalleryImage.objects.create(caption="One", image=_make_test_jpeg())
+        GalleryImage.objects.create(caption="Two", image=_make_test_jpeg())
+        other = GalleryImage.objects.create(caption="Three", image=_make_test_jpeg(color=(0, 0, 0)))
+        call_command('cleanup_gallery', stdout=StringIO())
+        self.assertEqual(
+            sorted(GalleryImage.objects.values_list('pk', flat=True)),
+            sorted([keep.pk, other.pk]),
+        )
+
+    @override_settings(MEDIA_PERCEPTUAL_HASH=True)
+    def test_perceptual_hash_matches_resized_copy(self):
+        from .media_metadata import read_metadata
+
+        big = read_metadata(_make_test_jpeg(size=(1200, 900)).file)
+        small = read_metadata(_make_test_jpeg(size=(600, 450)).file)
+        self.assertEqual(len(big['media_phash']), 16)
+        self.assertEqual(big['media_phash'], small['media_phash'])
+
+
+@override_settings(THUMBNAIL_DEFERRED_GENERATION=True, IMAGE_PROXY_WORKERS=0)
+class ImageProxyTests(TestCase):
+    def setUp(self):
+        from . import image_proxy
+        # The pool is built lazily from settings; start from an inline one
+        image_proxy._pool = None
+        self.addCleanup(setattr, image_proxy, '_pool', None)
+
+    def test_manifest_miss_renders_signed_url_generated_on_first_request(self):
+        from django.template import Context, Template
+        from .models import GalleryImage
+
+        item = GalleryImage.objects.create(caption="Youth", image=_make_test_jpeg())
+        item.refresh_from_db()
+        tpl = Template('{% load safe_thumbnail %}{% safe_thumbnail item.image "120x90" crop=True as thumb %}{{ thumb.url }}')
+        url = tpl.render(Context({'item': item}))
+        self.assertTrue(url.startswith('/img/'))
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('max-age=86400', response['Cache-Control'])
+        item.refresh_from_db()
+        spec = item.thumbnail_manifest['image']['specs']['120x90_crop']
+        self.assertEqual(response['Location'], spec['url'])
+
+    def test_tampered_token_is_not_found(self):
+        from .image_proxy import sign_spec
+
+        token = sign_spec({'s': 'gallery/x.jpg', 'w': 10, 'h': 10})
+        self.assertEqual(self.client.get(f'/img/{token[:-2]}xx/').status_code, 404)
+
+    def test_gallery_webp_sources_resolve_to_signed_webp_variants(self):
+        import re
+        from django.urls import resolve
+        from .image_proxy import load_spec
+        from .models import GalleryImage
+
+        GalleryImage.objects.create(caption="Youth", image=_make_test_jpeg(size=(1600, 1200)))
+        GalleryImage.objects.update(thumbnail_manifest={})  # nothing pregenerated yet
+        html = self.client.get(reverse('gallery')).content.decode()
+        srcsets = re.findall(r'<source type="image/webp" srcset="([^"]+)"', html)
+        self.assertTrue(srcsets)
+        urls = [candidate.split()[0] for srcset in srcsets for candidate in srcset.split(', ')]
+        for url in urls:
+            match = resolve(url)
+            self.assertEqual(match.url_name, 'image_proxy')
+            self.assertEqual(load_spec(match.kwargs['token'])['f'], 'webp')
+        response = self.client.get(urls[0])
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].endswith('.webp'))
+
+
+
+class MediaDiskCacheTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        from django.core.cache import cache
+        from django.core.files.storage import FileSystemStorage
+        from .storage_cache import CachedStorageMixin
+
+        class RemoteStandIn(FileSystemStorage):
+            """Local filesystem playing the part of GCS; counts reads that reach it."""
+            remote_opens = 0
+
+            def _open(self, name, mode='rb'):
+                self.remote_opens += 1
+                return super()._open(name, mode)
+
+        class CachedStorage(CachedStorageMixin, RemoteStandIn):
+            pass
+
+        remote_root, cache_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, remote_root, True)
+        self.addCleanup(shutil.rmtree, cache_root, True)
+        self.storage = CachedStorage(location=remote_root, cache_dir=cache_root, cache_max_bytes=250)
+        cache.clear()
+
+    def _read(self, name):
+        with self.storage.open(name) as f:
+            return f.read()
+
+    def test_reads_are_served_from_disk_after_first_open(self):
+        from django.core.files.base import ContentFile
+
+        self.assertFalse(self.storage.exists('a.txt'))  # negative entry...
+        self.storage.save('a.txt', ContentFile(b'hello'))
+        self.assertTrue(self.storage.exists('a.txt'))  # ...dropped by the write
+        self.assertEqual(self.storage.size('a.txt'), 5)
+        self.assertEqual(self._read('a.txt'), b'hello')
+        self.assertEqual(self._read('a.txt'), b'hello')
+        self.assertEqual(self.storage.remote_opens, 1)
+
+    def test_new_version_is_never_served_from_stale_copy(self):
+        import os
+        import time
+        from django.core.cache import cache
+        from django.core.files.base import ContentFile
+
+        self.storage.save('a.txt', ContentFile(b'old'))
+        self.assertEqual(self._read('a.txt'), b'old')
+        # Overwritten by another process; our stat entry expires
+        time.sleep(0.01)
+        with open(self.storage.path('a.txt'), 'wb') as f:
+            f.write(b'newer')
+        cache.delete(self.storage._stat_key('a.txt'))
+        self.assertEqual(self._read('a.txt'), b'newer')
+        self.assertEqual(len(os.listdir(self.storage._local_dir('a.txt')[0])), 1)
+
+    def test_least_recently_used_copies_are_evicted_past_the_cap(self):
+        import os
+        from django.core.files.base import ContentFile
+
+        for name in ('a', 'b', 'c'):
+            self.storage.save(name, ContentFile(b'x' * 100))
+        self._read('a')
+        self._read('b')
+        os.utime(self.storage._local_path('a', self.storage._stat('a')['version']), (0, 0))
+        self._read('c')  # 300 bytes > 250 cap: 'a' is the oldest
+        self.assertFalse(os.path.exists(self.storage._local_path('a', self.storage._stat('a')['version'])))
+        self.assertTrue(os.path.exists(self.storage._local_path('c', self.storage._stat('c')['version'])))
+
+    @override_settings(MEDIA_DISK_CACHE_DIR='')
+    def test_cache_directory_must_be_configured(self):
+        from django.core.exceptions import ImproperlyConfigured
+
+        with self.assertRaises(ImproperlyConfigured):
+            type(self.storage)(location=self.storage.location)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        with open(f'{self.media_root}/sermon.mp4', 'wb') as f:
+            f.write(bytes(range(100)))
+
+    def _get(self, **headers):
+        from django.test import RequestFactory
+        from .media_negotiation import serve_media
+        request = RequestFactory().get('/media/sermon.mp4', **headers)
+        return serve_media(request, 'sermon.mp4', document_root=self.media_root)
+
+    def test_byte_range_returns_partial_content(self):
+        response = self._get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+        self.assertEqual(self._get(HTTP_RANGE='bytes=-5')['Content-Range'], 'bytes 95-99/100')
+        self.assertEqual(self._get(HTTP_RANGE='bytes=200-').status_code, 416)
+
+    def test_etag_revalidation_returns_not_modified(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        response.close()
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect', MEDIA_SENDFILE_PREFIX='/protected-media/')
+    def test_transfer_offloaded_to_web_server(self):
+        response = self._get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/sermon.mp4')
+        self.assertEqual(response.content, b'')
+
+
+class GalleryArchiveTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_album_streams_as_zip_with_jpegs_stored(self):
+        import io
+        import zipfile
+        from .models import GalleryImage
+
+        GalleryImage.objects.create(caption="Sunday Choir", category='Worship', image=_make_test_jpeg())
+        GalleryImage.objects.create(caption="Street", category='Outreach', image=_make_test_jpeg(color=(0, 0, 0)))
+
+        response = self.client.get(reverse('gallery_download'), {'category': 'Worship'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('gallery-worship.zip', response['Content-Disposition'])
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        [info] = archive.infolist()
+        self.assertEqual(info.filename, '0001-sunday-choir.jpg')
+        self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+
+    def test_filter_is_required(self):
+        self.assertEqual(self.client.get(reverse('gallery_download')).status_code, 400)
+
+    @override_settings(GALLERY_DOWNLOAD_MAX_IMAGES=1)
+    def test_oversized_album_is_refused(self):
+        from .models import GalleryImage
+
+        for color in ((0, 0, 0), (255, 255, 255)):
+            GalleryImage.objects.create(caption="Choir", category='Worship', image=_make_test_jpeg(color=color))
+        response = self.client.get(reverse('gallery_download'), {'category': 'Worship'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(GALLERY_DOWNLOAD_RATE='2/m')
+    def test_downloads_are_rate_limited_per_client(self):
+        from .models import GalleryImage
+
+        GalleryImage.objects.create(caption="Choir", category='Worship', image=_make_test_jpeg())
+        statuses = [self.client.get(reverse('gallery_download'), {'category': 'Worship'}).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+
+class MediaSyncTests(TestCase):
+    def setUp(self):
+        import os
+        import shutil
+        import tempfile
+        self.remote, self.local = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.manifest = os.path.join(tempfile.mkdtemp(), 'manifest.json')
+        for root in (self.remote, self.local, os.path.dirname(self.manifest)):
+            self.addCleanup(shutil.rmtree, root, True)
+        self._write(self.remote, 'gallery/a.jpg', b'remote-a')
+        self._write(self.remote, 'gallery/b.jpg', b'remote-b')
+        self._write(self.local, 'gallery/b.jpg', b'local-b!')  # same size, different bytes
+        self._write(self.local, 'books/c.jpg', b'local-c')
+
+    def _write(self, root, name, data):
+        import os
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def _read(self, root, name):
+        import os
+        with open(os.path.join(root, name), 'rb') as f:
+            return f.read()
+
+    def _sync(self, *args):
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command('sync_media', *args, '--remote-dir', self.remote, '--local-dir', self.local,
+                     '--manifest', self.manifest, stdout=out)
+        return out.getvalue()
+
+    def test_pull_transfers_only_differing_files(self):
+        import os
+        out = self._sync('pull', '--dry-run')
+        self.assertIn('to download: 2', out)
+        self.assertFalse(os.path.exists(os.path.join(self.local, 'gallery/a.jpg')))
+
+        self._sync('pull')
+        self.assertEqual(self._read(self.local, 'gallery/a.jpg'), b'remote-a')
+        self.assertEqual(self._read(self.local, 'gallery/b.jpg'), b'remote-b')
+        self.assertIn('unchanged: 2, to download: 0', self._sync('pull', '--dry-run'))
+
+    def test_both_copies_missing_files_and_reports_conflicts(self):
+        out = self._sync('both')
+        self.assertIn('conflicts: 1', out)
+        self.assertEqual(self._read(self.remote, 'books/c.jpg'), b'local-c')
+        self.assertEqual(self._read(self.local, 'gallery/a.jpg'), b'remote-a')
+        self.assertEqual(self._read(self.remote, 'gallery/b.jpg'), b'remote-b')
+
+
+class DatabaseSyncTests(TestCase):
+    def test_ndjson_round_trip_upserts_in_chunks_and_keeps_timestamps(self):
+        import datetime
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .models import FAQ
+
+        old = timezone.now() - datetime.timedelta(days=400)
+        faqs = [FAQ.objects.create(question=f"Q{i}", answer="A") for i in range(5)]
+        FAQ.objects.filter(pk=faqs[0].pk).update(created_at=old, updated_at=old)
+        handle, path = tempfile.mkstemp(suffix='.ndjson.gz')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        call_command('sync_db', '--source', 'default', '--output', path, '--models', 'church.FAQ',
+                     '--chunk-size', '2', stdout=StringIO())
+        FAQ.objects.filter(pk=faqs[1].pk).update(question="Edited locally")
+        FAQ.objects.filter(pk=faqs[2].pk).delete()
+        extra = FAQ.objects.create(question="Only in target", answer="A")
+
+        out = StringIO()
+        call_command('sync_db', '--input', path, '--models', 'church.FAQ', '--chunk-size', '2', '--prune', stdout=out)
+        self.assertIn('church.FAQ: 5 row(s), pruned 1', out.getvalue())
+        self.assertEqual(
+            sorted(FAQ.objects.values_list('question', flat=True)),
+            ['Q0', 'Q1', 'Q2', 'Q3', 'Q4'],
+        )
+        self.assertFalse(FAQ.objects.filter(pk=extra.pk).exists())
+        self.assertEqual(FAQ.objects.get(pk=faqs[0].pk).created_at, old)
+
+
+class IncrementalSyncTests(TestCase):
+    def test_changed_rows_follow_the_watermark_and_deletes_leave_tombstones(self):
+        import datetime
+        from django.utils import timezone
+        from .db_sync import iter_changed_chunks, watermark_field
+        from .models import FAQ, PageView, SyncTombstone
+
+        self.assertEqual(watermark_field(FAQ), 'updated_at')
+        old, new = (FAQ.objects.create(question=q, answer="A") for q in ("Old", "New"))
+        FAQ.objects.filter(pk=old.pk).update(updated_at=timezone.now() - datetime.timedelta(days=2))
+        since = timezone.now() - datetime.timedelta(days=1)
+        chunks = list(iter_changed_chunks(FAQ, 'default', 'updated_at', since, chunk_size=1))
+        self.assertEqual([obj.pk for chunk in chunks for obj in chunk], [new.pk])
+
+        deleted_pk = new.pk
+        new.delete()
+        PageView.objects.create(path='/')
+        PageView.objects.all().delete()  # append-only log: no tombstones
+        self.assertEqual(
+            list(SyncTombstone.objects.values_list('model_label', 'object_pk')),
+            [('church.faq', str(deleted_pk))],
+        )
+
+    def test_tombstones_delete_rows_in_target(self):
+        from .db_sync import apply_tombstones
+        from .models import FAQ, SyncTombstone
+
+        faq = FAQ.objects.create(question="Gone", answer="A")
+        SyncTombstone.objects.create(model_label='church.faq', object_pk=str(faq.pk))
+        deleted, newest = apply_tombstones('default', 'default', None, ['church.faq'])
+        self.assertEqual(deleted, 1)
+        self.assertIsNotNone(newest)
+        self.assertFalse(FAQ.objects.filter(pk=faq.pk).exists())
+
+    def test_tombstones_older_than_every_watermark_are_pruned(self):
+        import datetime
+        from django.utils import timezone
+        from .db_sync import prune_tombstones, set_watermark
+        from .models import SyncTombstone
+
+        now = timezone.now()
+        old, recent = (SyncTombstone.objects.create(model_label='church.faq', object_pk=pk) for pk in ('1', '2'))
+        SyncTombstone.objects.filter(pk=old.pk).update(deleted_at=now - datetime.timedelta(days=3))
+        self.assertEqual(prune_tombstones('default', 'default', 'src'), 0)  # never synced: keep all
+
+        set_watermark('default', 'src', 'church.faq', now)
+        set_watermark('default', 'src', '__tombstones__', now - datetime.timedelta(days=1))
+        self.assertEqual(prune_tombstones('default', 'default', 'src'), 1)
+        self.assertEqual(list(SyncTombstone.objects.values_list('pk', flat=True)), [recent.pk])
+
+    def test_failed_tombstone_does_not_break_the_delete(self):
+        from unittest import mock
+        from django.db import DatabaseError, transaction
+        from .models import FAQ, SyncTombstone
+
+        faq = FAQ.objects.create(question="Gone", answer="A")
+        with mock.patch.object(SyncTombstone, 'save', side_effect=DatabaseError('boom')):
+            with self.assertLogs('church.signals', 'WARNING'):
+                with transaction.atomic():
+                    faq.delete()
+                    self.assertEqual(FAQ.objects.count(), 0)  # the transaction is still usable
+        self.assertFalse(FAQ.objects.filter(pk=faq.pk).exists())
+
+
+class ConnectionPoolingTests(TestCase):
+    def test_health_check_reports_connection_reuse_mode_to_staff_only(self):
+        from django.contrib.auth.models import User
+
+        response = self.client.get('/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('pool', response.json())
+        self.assertEqual(self.client.get('/health/pool/').status_code, 302)  # to the admin login
+
+        self.client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        response = self.client.get('/health/pool/')
+        self.assertEqual(response.status_code, 200)
+        pool = response.json()['pool']['default']
+        self.assertEqual(pool['vendor'], 'sqlite')
+        self.assertIn(pool['mode'], ('off', 'persistent', 'psycopg'))
+
+
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        from unittest import mock
+        patcher = mock.patch('church_app.db_router.replica_available', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_pin_to_primary_after_a_write_in_the_same_request(self):
+        from django.test import RequestFactory
+        from church_app.db_router import ReplicaPinningMiddleware, ReplicaRouter, STICKY_COOKIE
+        from .models import FAQ, PageView
+
+        router = ReplicaRouter()
+        seen = {}
+
+        def view(request):
+            seen['before'] = router.db_for_read(FAQ)
+            router.db_for_write(PageView)  # analytics writes don't pin
+            router.db_for_write(FAQ, pin=False)  # nor do hinted bookkeeping writes (thumbnail manifests)
+            seen['after_log'] = router.db_for_read(FAQ)
+            router.db_for_write(FAQ)
+            seen['after_write'] = router.db_for_read(FAQ)
+            from django.http import HttpResponse
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(RequestFactory().post('/contact-us/'))
+        self.assertEqual(seen, {'before': 'replica', 'after_log': 'replica', 'after_write': 'default'})
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(router.db_for_read(FAQ), 'replica')  # pinning ends with the request
+
+    def test_sticky_cookie_pins_next_request_except_read_heavy_views(self):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from church_app.db_router import ReplicaPinningMiddleware, ReplicaRouter, STICKY_COOKIE
+        from .models import FAQ
+
+        router = ReplicaRouter()
+        request = RequestFactory().get('/about/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        seen = []
+        middleware = ReplicaPinningMiddleware(lambda r: seen.append(router.db_for_read(FAQ)) or HttpResponse())
+        middleware(request)
+
+        request = RequestFactory().get('/news/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        request.resolver_match = type('Match', (), {'url_name': 'news_list'})()
+
+        def view(r):
+            middleware.process_view(r, None, (), {})
+            seen.append(router.db_for_read(FAQ))
+            return HttpResponse()
+
+        ReplicaPinningMiddleware(view)(request)
+        self.assertEqual(seen, ['default', 'replica'])
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_partial_indexes(self):
+        from .query_plans import check_plans
+
+        misses = [(label, plan) for label, _index, used, plan in check_plans() if not used]
+        self.assertEqual(misses, [])
+
+    def test_partial_index_falls_back_to_composite_index(self):
+        from django.db.models import Q
+        from .indexes import PartialIndex
+
+        index = PartialIndex(fields=['-created_at'], condition=Q(is_published=True), name='x_published_idx')
+        fallback = index.fallback_index()
+        self.assertEqual(fallback.fields, ['is_published', '-created_at'])
+        self.assertEqual(fallback.name, 'x_published_idx')
+
+
+class QueryBudgetTests(TestCase):
+    def _view(self, request):
+        from django.http import HttpResponse
+        from .models import FAQ
+
+        for pk in range(6):
+            FAQ.objects.filter(pk=pk).first()
+        return HttpResponse()
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_DEFAULT=3, QUERY_BUDGET_REPEAT_THRESHOLD=5)
+    def test_over_budget_request_logs_repeated_shapes_with_call_sites(self):
+        from django.test import RequestFactory
+        from .query_budget import QueryBudgetMiddleware
+
+        with self.assertLogs('church.query_budget', level='WARNING') as logs:
+            response = QueryBudgetMiddleware(self._view)(RequestFactory().get('/faq/'))
+        self.assertNotIn('X-Query-Count', response)
+        self.assertIn('ran 6 queries (budget 3)', logs.output[0])
+        self.assertIn('6x from church/tests.py', logs.output[0])
+
+    @override_settings(QUERY_BUDGET_TOKEN='secret', QUERY_BUDGET_DEFAULT=30, QUERY_BUDGET_REPEAT_THRESHOLD=10)
+    def test_header_switches_recording_on_for_one_request(self):
+        from django.test import RequestFactory
+        from .query_budget import QueryBudgetMiddleware
+
+        middleware = QueryBudgetMiddleware(self._view)
+        self.assertNotIn('X-Query-Count', middleware(RequestFactory().get('/', HTTP_X_QUERY_BUDGET='wrong')))
+        response = middleware(RequestFactory().get('/', HTTP_X_QUERY_BUDGET='secret'))
+        self.assertEqual(response['X-Query-Count'], '6')
+
+
+class SlowQueryLogTests(TestCase):
+    def test_normalize_sql_groups_queries_by_shape(self):
+        from .slow_queries import normalize_sql
+
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21"),
+            normalize_sql("SELECT *  FROM t WHERE id IN (%s) AND name = 'y''z' LIMIT 5"),
+        )
+
+    @override_settings(SLOW_QUERY_MS=0.001, SLOW_QUERY_SAMPLE_RATE=1.0, SLOW_QUERY_ASYNC=False)
+    def test_slow_select_is_aggregated_with_plan_and_listed_for_staff(self):
+        from django.contrib.auth.models import User
+        from . import slow_queries
+        from .models import FAQ, SlowQuery
+
+        list(FAQ.objects.filter(question='a'))
+        list(FAQ.objects.filter(question='b'))
+        slow_queries._recorder.flush()
+        entry = SlowQuery.objects.get(sql__startswith='SELECT', sql__contains='"church_faq"')
+        self.assertEqual(entry.calls, 2)
+        self.assertIn('church_faq', entry.plan)
+        self.assertIsNotNone(entry.plan_captured_at)
+
+        staff = User.objects.create_user('staff', password='pw', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('slow_queries'))
+        self.assertContains(response, 'church_faq')
+
+    def test_only_read_only_selects_are_analyzed(self):
+        from .slow_queries import analyze_safe, normalize_sql
+
+        self.assertTrue(analyze_safe(normalize_sql('SELECT * FROM t WHERE email = %s')))
+        self.assertFalse(analyze_safe(normalize_sql('WITH d AS (DELETE FROM t RETURNING id) SELECT * FROM d')))
+        self.assertFalse(analyze_safe(normalize_sql('SELECT * FROM t WHERE id = %s FOR UPDATE')))
+        self.assertFalse(analyze_safe(normalize_sql('SELECT * FROM t FOR NO KEY UPDATE SKIP LOCKED')))
+        self.assertFalse(analyze_safe(normalize_sql("SELECT * INTO t2 FROM t WHERE note = 'for update'")))
+
+    def test_plans_do_not_keep_parameter_values(self):
+        from .slow_queries import redact_plan
+
+        plan = "Index Scan using django_session_pkey\n  Index Cond: ((session_key)::text = 'k9x2secret'::text)"
+        self.assertEqual(redact_plan(plan), "Index Scan using django_session_pkey\n  Index Cond: ((session_key)::text = '?'::text)")
+
+
+PERF_BASELINES = Path(__file__).resolve().parent / 'perf_baselines.json'
+
+# label -> (url, htmx request, queries with a cold cache, queries with a warm cache)
+PERF_PAGES = {
+    'home': ('/', False, 9, 5),
+    'home content': ('/home-content/', True, 20, 5),
+    'about': ('/about/', False, 6, 5),
+    'leadership': ('/leadership/', False, 6, 6),
+    'word of truth list': ('/word-of-truth/', False, 7, 5),
+    'word of truth page 2': ('/word-of-truth/?page=2', True, 7, 5),
+    'word of truth load more': ('/word-of-truth/load-more/?offset=6', True, 7, 7),
+    'word of truth detail': ('/word-of-truth/wordoftruth-00000/', False, 13, 8),
+    'mantalk list': ('/man-talk/', False, 7, 5),
+    'mantalk detail': ('/man-talk/mantalk-00000/', False, 11, 7),
+    'book list': ('/books/', False, 7, 7),
+    'book detail': ('/books/book-00000/', False, 7, 5),
+    "children's bread list": ('/childrens-bread/', False, 7, 5),
+    "children's bread page 2": ('/childrens-bread/?page=2', True, 7, 5),
+    "children's bread load more": ('/childrens-bread/load-more/?offset=6', True, 7, 7),
+    "children's bread detail": ('/childrens-bread/childrensbread-00000/', False, 13, 8),
+    "children's bread school": ('/childrens-bread-school/', False, 5, 5),
+    'school of ministry': ('/school-of-ministry/', False, 5, 5),
+    'multimedia': ('/multimedia/', False, 5, 5),
+    'contact': ('/contact-us/', False, 5, 5),
+    'news calendar': ('/news/', False, 6, 6),
+    'news detail': ('/news/newsitem-00000/', False, 9, 9),
+    'news load more': ('/news/load-more/?offset=6', True, 7, 7),
+    'news line list': ('/news-line/', False, 7, 5),
+    'news line page 2': ('/news-line/?page=2', True, 7, 5),
+    'news line load more': ('/news-line/load-more/?offset=6', True, 7, 7),
+    'news line detail': ('/news-line/newsline-00000/', False, 12, 7),
+    'info card': ('/info-card/info-news/', False, 10, 5),
+    'gallery': ('/gallery/', False, 8, 5),
+    'gallery category page 2': ('/gallery/?category=Worship&page=2', True, 7, 5),
+    'privacy': ('/privacy/', False, 5, 5),
+    'donate': ('/donate/', False, 5, 5),
+    'search': ('/search/?q=grace', False, 9, 5),
+    'search autocomplete': ('/search/autocomplete/?q=gra', True, 7, 7),
+    'sitemap': ('/sitemap.xml', False, 14, 13),
+}
+
+
+@override_settings(IMAGE_PROXY_WORKERS=0, QUERY_BUDGET_ENABLED=False, SLOW_QUERY_MS=0)
+class PerfRegressionTests(TestCase):
+    """
+    Query counts and render times of every public page and HTMX partial over a seeded dataset
+    (church.perf_data). Query counts must match PERF_PAGES exactly, cold and warm cache, both
+    with deferred thumbnail generation and with thumbnails generated inline (after the post_save
+    pregeneration). Render times are machine-dependent and only checked with PERF_TIMINGS=1:
+    warm renders may not exceed perf_baselines.json by more than its tolerance. After an
+    intended change, run with PERF_UPDATE_BASELINES=1 to rewrite the timing baselines.
+    """
+    RENDER_RUNS = 5
+
+    @classmethod
+    def setUpClass(cls):
+        import tempfile
+        cls._media_root = tempfile.mkdtemp()
+        cls._media = override_settings(MEDIA_ROOT=cls._media_root)
+        cls._media.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        import shutil
+        super().tearDownClass()
+        cls._media.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        from .perf_data import seed_dataset
+        seed_dataset({'page_views': 500})
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self._reset_process_caches()
+
+    @staticmethod
+    def _reset_process_caches():
+        """Sites and content types are cached in-process; start every test from what seeding leaves behind."""
+        from django.contrib.contenttypes.models import ContentType
+        from django.contrib.sites.models import Site
+        from .perf_data import ARTICLE_MODELS
+        Site.objects.clear_cache()
+        ContentType.objects.clear_cache()
+        ContentType.objects.get_for_models(*ARTICLE_MODELS)
+
+    def _get(self, url, htmx):
+        headers = {'HTTP_HX_REQUEST': 'true'} if htmx else {}
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+    def _queries(self, url, htmx):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            self._get(url, htmx)
+        return len(queries)
+
+    def _query_count_mismatches(self):
+        from django.core.cache import cache
+
+        mismatches = []
+        for label, (url, htmx, cold, warm) in PERF_PAGES.items():
+            cache.clear()
+            measured = (self._queries(url, htmx), self._queries(url, htmx))
+            if measured != (cold, warm):
+                mismatches.append(f'{label}: expected {cold}/{warm} queries (cold/warm), ran {measured[0]}/{measured[1]}')
+        return mismatches
+
+    @override_settings(THUMBNAIL_DEFERRED_GENERATION=True)
+    def test_query_counts_cold_and_warm(self):
+        mismatches = self._query_count_mismatches()
+        self.assertFalse(mismatches, '\n'.join(mismatches))
+
+    @override_settings(THUMBNAIL_DEFERRED_GENERATION=False)
+    def test_query_counts_with_inline_generation(self):
+        from django.apps import apps
+        from django.db.models.signals import post_save
+        from .models import MediaMetadataModel
+
+        # Production steady state: every row's thumbnails were pregenerated when it was created
+        for model in apps.get_app_config('church').get_models():
+            if issubclass(model, MediaMetadataModel):
+                for obj in model.objects.all():
+                    post_save.send(sender=model, instance=obj, created=True, raw=False, using='default', update_fields=None)
+        self._reset_process_caches()
+        mismatches = self._query_count_mismatches()
+        self.assertFalse(mismatches, '\n'.join(mismatches))
+
+    @skipUnless(os.environ.get('PERF_TIMINGS') == '1' or os.environ.get('PERF_UPDATE_BASELINES') == '1',
+                'render timings are machine-dependent; set PERF_TIMINGS=1 to check them')
+    @override_settings(THUMBNAIL_DEFERRED_GENERATION=True)
+    def test_render_times_within_baseline(self):
+        import json
+        import statistics
+        import time
+
+        timings = {}
+        for label, (url, htmx, _cold, _warm) in PERF_PAGES.items():
+            self._get(url, htmx)  # warm the cache
+            runs = []
+            for _ in range(self.RENDER_RUNS):
+                started = time.perf_counter()
+                self._get(url, htmx)
+                runs.append((time.perf_counter() - started) * 1000)
+            timings[label] = round(statistics.median(runs), 2)
+
+        baselines = json.loads(PERF_BASELINES.read_text()) if PERF_BASELINES.exists() else {}
+        if os.environ.get('PERF_UPDATE_BASELINES') == '1':
+            baselines['render_ms'] = timings
+            baselines.setdefault('tolerance', 1.0)
+            baselines.setdefault('slack_ms', 20)
+            PERF_BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+            return
+
+        tolerance = float(os.environ.get('PERF_TOLERANCE', baselines.get('tolerance', 1.0)))
+        slack = baselines.get('slack_ms', 20)
+        regressions = []
+        for label, measured in timings.items():
+            baseline = baselines.get('render_ms', {}).get(label)
+            if baseline is None:
+                regressions.append(f'{label}: no baseline (run with PERF_UPDATE_BASELINES=1)')
+            elif measured > baseline * (1 + tolerance) + slack:
+                regressions.append(f'{label}: {measured:.1f}ms vs baseline {baseline:.1f}ms')
+        self.assertFalse(regressions, '\n'.join(regressions))
+
+
+@override_settings(THUMBNAIL_DEFERRED_GENERATION=True)
+class SeedPerfDataTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_scaled_volumes(self):
+        from .perf_data import DEFAULT_VOLUMES, scaled_volumes
+
+        volumes = scaled_volumes(10, page_views=5_000_000, events=None)
+        self.assertEqual(volumes['articles'], DEFAULT_VOLUMES['articles'] * 10)
+        self.assertEqual(volumes['events'], DEFAULT_VOLUMES['events'] * 10)
+        self.assertEqual(volumes['comments'], DEFAULT_VOLUMES['comments'])
+        self.assertEqual(volumes['page_views'], 5_000_000)
+
+    def test_command_is_deterministic_and_seeds_once(self):
+        from io import StringIO
+        from django.core.management import CommandError, call_command
+        from django.db import transaction
+        from .models import ArticleComment, GalleryImage, NewsItem, PageView
+
+        args = ['--force', '--scale', '0.25', '--gallery', '5', '--page-views', '2500', '--images', '1']
+        with transaction.atomic():
+            call_command('seed_perf_data', *args, stdout=StringIO())
+            rows = list(NewsItem.objects.order_by('slug').values_list('title', 'created_at', 'media_format'))
+            transaction.set_rollback(True)
+
+        call_command('seed_perf_data', *args, stdout=StringIO())
+        self.assertEqual(list(NewsItem.objects.order_by('slug').values_list('title', 'created_at', 'media_format')), rows)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0][2], 'jpeg')
+        self.assertEqual(ArticleComment.objects.count(), 6 * 6 * 3)
+        self.assertEqual(PageView.objects.count(), 2500)
+        self.assertEqual(len(set(GalleryImage.objects.values_list('image', flat=True))), 5)
+        with self.assertRaises(CommandError):
+            call_command('seed_perf_data', *args, stdout=StringIO())
+
+
+class LoadTestHarnessTests(TestCase):
+    def test_percentiles_and_summary(self):
+        from .loadtest import percentile, summarize, summarize_server_timing
+
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile(values, 99)), (50, 95, 99))
+        self.assertIsNone(percentile([], 50))
+        summary = summarize([(10.0, True), (20.0, True), (30.0, False), (40.0, True)], elapsed=2)
+        self.assertEqual(summary['error_rate'], 0.25)
+        self.assertEqual(summary['throughput_rps'], 2.0)
+        self.assertEqual(summary['latency_ms']['p50'], 20.0)
+        timing = summarize_server_timing([
+            'db;dur=4.0;desc="2 queries", cache-get;dur=1.0;desc="3 hits / 1 misses"',
+            'db;dur=2.0;desc="1 queries", cache-get;dur=0.0;desc="0 hits / 0 misses"',
+        ])
+        self.assertEqual(timing['mean_ms']['db'], 3.0)
+        self.assertEqual(timing['cache_hit_ratio'], 0.75)
+
+    def test_scenarios_build_resolvable_paths(self):
+        import random
+        from django.urls import resolve
+        from .loadtest import SCENARIOS
+
+        targets = {'details': ['/news/newsitem-00000/'], 'categories': ['Worship']}
+        rng = random.Random(1)
+        for _weight, scenario in SCENARIOS.values():
+            for _endpoint, path, _htmx in scenario(rng, targets):
+                resolve(path.split('?')[0])
+
+    def test_in_process_run_reports_latency_and_cache_ratio(self):
+        from django.core import signals
+        from django.core.cache import cache
+        from django.db import close_old_connections
+        from .loadtest import SCENARIOS, InProcessClient, run
+
+        # As django.test.Client does: keep the test transaction's connection open between requests
+        for signal in (signals.request_started, signals.request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+        cache.clear()
+
+        scenarios = {name: SCENARIOS[name] for name in ('home', 'calendar')}
+        result = run(InProcessClient(), concurrency=1, duration=30, warmup=0, max_requests=10, seed=1,
+                     scenarios=scenarios, targets={'details': [], 'categories': []})
+        self.assertEqual(result['requests'], 10)
+        self.assertEqual(result['error_rate'], 0)
+        self.assertIsNotNone(result['latency_ms']['p99'])
+        self.assertGreater(result['cache_hit_ratio'], 0)
+        self.assertEqual(set(result['scenarios']), {'home', 'calendar'})
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=0, SERVER_TIMING_STAFF=True)
+class ServerTimingTests(TestCase):
+    def test_staff_responses_carry_server_timing(self):
+        from django.contrib.auth.models import User
+        from .loadtest import parse_server_timing
+
+        self.assertNotIn('Server-Timing', self.client.get(reverse('about')))
+
+        self.client.force_login(User.objects.create_user('staff', password='pw', is_staff=True))
+        response = self.client.get(reverse('about'))
+        timing = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(set(timing), {'db', 'cache-get', 'cache-set', 'tpl', 'thumb', 'total'})
+        self.assertNotEqual(timing['db'][1], '0 queries')
+        self.assertGreater(timing['tpl'][0], 0)
+        self.assertGreaterEqual(timing['total'][0], timing['tpl'][0])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_sampled_anonymous_requests_are_timed(self):
+        self.assertIn('Server-Timing', self.client.get(reverse('about')))
+
+    def test_timed_cache_counts_hits_and_misses(self):
+        from django.core.cache import cache
+        from . import server_timing
+
+        timings = server_timing.Timings()
+        token = server_timing._current.set(timings)
+        try:
+            cache.set('st-key', 1)
+            cache.get('st-key')
+            cache.get('st-missing', 'default')
+            cache.get_many(['st-key', 'st-other'])
+        finally:
+            server_timing._current.reset(token)
+        self.assertEqual((timings.cache_hits, timings.cache_misses), (2, 2))
+        self.assertEqual(timings.metrics['cache-set'][1], 1)
+        self.assertIn('cache-get;dur=', timings.header(1.0))
+        self.assertEqual(cache.incr('st-key'), 2)  # everything else is delegated
+        self.assertIn('st-key', cache)
@@ -0,0 +1,278 @@
+"""
+Per-instance thumbnail manifest.
+
+Every model with an image field stores a ``thumbnail_manifest`` JSON field shaped like:
+
+    {
+        "image": {
+            "source": "gallery/photo.jpg",
+            "specs": {
+                "800x600_crop": {"url": "...", "width": 800, "height": 600, "format": "jpeg", "box": ""},
+            },
+            "placeholder": "data:image/jpeg;base64,...",
+        },
+    }
+
+Entries are written once a thumbnail finishes generating. Templates, admin previews
+and JSON views then read thumbnail URLs straight from the instance, without touching
+the easy_thumbnails Source/Thumbnail tables or storage. An entry is ignored as soon
+as the source file name or the crop box no longer matches.
+
+``placeholder`` is a tiny blurred JPEG data URI (LQIP) computed once per source file,
+which templates inline as a background while the real image loads.
+"""
+import base64
+import logging
+import os
+from io import BytesIO
+
+from django.db import router, transaction
+from easy_thumbnails.files import get_thumbnailer
+
+from .server_timing import timed
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FIELD = 'thumbnail_manifest'
+PLACEHOLDER_SIZE = 16  # px on the longest side
+PLACEHOLDER_QUALITY = 40
+
+
+class ManifestThumbnail:
+    """Lightweight stand-in for a ThumbnailFile built from a manifest entry (no storage access)."""
+
+    def __init__(self, entry):
+        self.url = entry.get('url', '')
+        self.width = entry.get('width')
+        self.height = entry.get('height')
+        self.format = entry.get('format', '')
+        self.name = entry.get('name', '')
+        # The WebP sibling written by store_thumbnail_webp; proxy entries carry their own signed URL
+        self.webp_url = entry.get('webp_url') or (f'{self.url}.webp' if self.url else '')
+
+    def __str__(self):
+        return self.url
+
+    def __bool__(self):
+        return bool(self.url)
+
+
+def _box_str(box):
+    """Normalize a crop box (string, tuple or list) to 'x1,y1,x2,y2', or '' when unset."""
+    if not box:
+        return ''
+    if isinstance(box, str):
+        return box.replace(' ', '')
+    try:
+        return ','.join(str(int(x)) for x in box)
+    except (TypeError, ValueError):
+        return ''
+
+
+def spec_key(options):
+    """Stable manifest key for a set of thumbnail options (e.g. '800x600_crop_detail_box')."""
+    size = options.get('size') or (0, 0)
+    parts = ['%sx%s' % tuple(size)]
+    crop = options.get('crop')
+    if crop:
+        parts.append('crop' if crop is True else 'crop-%s' % crop)
+    if options.get('detail'):
+        parts.append('detail')
+    if options.get('box'):
+        parts.append('box')
+    return '_'.join(parts)
+
+
+def _thumbnail_format(name):
+    ext = os.path.splitext(name or '')[1].lstrip('.').lower()
+    return 'jpeg' if ext == 'jpg' else ext
+
+
+def get_manifest_entry(field_file, options):
+    """Return the raw manifest dict for these options, or None when missing or stale."""
+    instance = getattr(field_file, 'instance', None)
+    manifest = getattr(instance, MANIFEST_FIELD, None)
+    if not manifest or not getattr(field_file, 'name', None):
+        return None
+    field_entry = manifest.get(field_file.field.name) or {}
+    if field_entry.get('source') != field_file.name:
+        return None
+    entry = (field_entry.get('specs') or {}).get(spec_key(options))
+    if not entry or entry.get('box', '') != _box_str(options.get('box')):
+        return None
+    return entry
+
+
+def get_manifest_thumbnail(field_file, options):
+    """Return a ManifestThumbnail for these options, or None on a manifest miss."""
+    entry = get_manifest_entry(field_file, options)
+    return ManifestThumbnail(entry) if entry else None
+
+
+def record_thumbnail(field_file, options, thumbnail, extra=None):
+    """Store a generated thumbnail in the owning instance's manifest."""
+    instance = getattr(field_file, 'instance', None)
+    if instance is None or instance.pk is None or not hasattr(instance, MANIFEST_FIELD):
+        return
+    try:
+        url = thumbnail.url
+    except Exception:
+        return
+    try:
+        width, height = thumbnail.width, thumbnail.height
+    except Exception:
+        width, height = None, None
+
+    entry = {
+        'url': url,
+        'name': thumbnail.name,
+        'width': width,
+        'height': height,
+        'format': _thumbnail_format(thumbnail.name),
+        'box': _box_str(options.get('box')),
+    }
+    if extra:
+        entry.update(extra)
+
+    def add_spec(field_entry):
+        specs = dict(field_entry.get('specs') or {})
+        specs[spec_key(options)] = entry
+        field_entry['specs'] = specs
+
+    _update_field_entry(field_file, add_spec)
+
+
+def _update_field_entry(field_file, update):
+    """
+    Apply ``update(field_entry)`` to the manifest entry for ``field_file`` and persist it.
+    The entry is reset first when it was recorded for a different source file.
+    The row is re-read under SELECT ... FOR UPDATE and changed there, so concurrent renders
+    recording different specs don't overwrite each other's entries. Uses a queryset update so
+    post_save handlers (cache invalidation, pre-generation) don't re-run, and passes the
+    ``pin=False`` hint so this bookkeeping doesn't pin the visitor to the primary database.
+    """
+    instance = field_file.instance
+    field_name = field_file.field.name
+    model = type(instance)
+    alias = router.db_for_write(model, instance=instance, pin=False)
+    rows = model._default_manager.db_manager(alias, hints={'pin': False}).filter(pk=instance.pk)
+
+    try:
+        with transaction.atomic(using=alias):
+            current = list(rows.select_for_update().values_list(MANIFEST_FIELD, flat=True))
+            if not current:
+                return
+            manifest = dict(current[0] or {})
+            field_entry = dict(manifest.get(field_name) or {})
+            if field_entry.get('source') != field_file.name:
+                field_entry = {'source': field_file.name, 'specs': {}}
+            update(field_entry)
+            manifest[field_name] = field_entry
+            rows.update(**{MANIFEST_FIELD: manifest})
+    except Exception as e:
+        logger.warning(f"Failed to save thumbnail manifest for {model.__name__} #{instance.pk}: {e}")
+        return
+    setattr(instance, MANIFEST_FIELD, manifest)
+
+
+@timed('thumb')
+def get_thumbnail(field_file, options):
+    """
+    Return a thumbnail for ``field_file``: from the manifest when possible,
+    otherwise generate it with easy_thumbnails and record it (or, with
+    THUMBNAIL_DEFERRED_GENERATION, return a signed image proxy URL instead).
+    """
+    if not field_file or not getattr(field_file, 'name', None):
+        return None
+    cached = get_manifest_thumbnail(field_file, options)
+    if cached is not None:
+        return cached
+    from .image_proxy import deferred_generation_enabled, proxy_thumbnail
+    if deferred_generation_enabled():
+        # Signed /img/ URL: the variant is generated on first request, not during this render
+        return proxy_thumbnail(field_file, options)
+    thumbnail = get_thumbnailer(field_file).get_thumbnail(options)
+    record_thumbnail(field_file, options, thumbnail)
+    return with_webp_url(thumbnail)
+
+
+def with_webp_url(thumbnail):
+    """Give a freshly generated ThumbnailFile the ``webp_url`` a ManifestThumbnail has."""
+    if thumbnail and not getattr(thumbnail, 'webp_url', None):
+        thumbnail.webp_url = f'{thumbnail.url}.webp'
+    return thumbnail
+
+
+def get_thumbnail_url(field_file, options):
+    """URL of the thumbnail for ``field_file`` (manifest first), or '' on failure."""
+    try:
+        thumbnail = get_thumbnail(field_file, options)
+        return thumbnail.url if thumbnail else ''
+    except Exception as e:
+        logger.warning(f"Failed to resolve thumbnail for {getattr(field_file, 'name', 'unknown')}: {e}")
+        return ''
+
+
+def get_preview_thumbnail(field_file):
+    """Smallest thumbnail recorded for ``field_file`` (for admin list previews), or None. Never generates."""
+    instance = getattr(field_file, 'instance', None)
+    manifest = getattr(instance, MANIFEST_FIELD, None)
+    if not manifest or not getattr(field_file, 'name', None):
+        return None
+    field_entry = manifest.get(field_file.field.name) or {}
+    if field_entry.get('source') != field_file.name:
+        return None
+    entries = [e for e in (field_entry.get('specs') or {}).values() if e.get('url')]
+    if not entries:
+        return None
+    return ManifestThumbnail(min(entries, key=lambda e: e.get('width') or 0))
+
+
+def compute_placeholder(field_file, size=PLACEHOLDER_SIZE):
+    """Build a ``size``-px base64 JPEG data URI from the source image."""
+    from PIL import Image, ImageOps
+
+    field_file.open('rb')
+    try:
+        img = Image.open(field_file)
+        # JPEG draft mode decodes at a reduced scale, so large originals stay cheap
+        img.draft('RGB', (size * 8, size * 8))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert('RGB')
+        img.thumbnail((size, size))
+    finally:
+        field_file.close()
+    buf = BytesIO()
+    img.save(buf, 'JPEG', quality=PLACEHOLDER_QUALITY, optimize=True)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buf.getvalue()).decode('ascii')
+
+
+def get_placeholder(field_file):
+    """Recorded placeholder data URI for ``field_file``, or '' when missing or stale. Never computes."""
+    instance = getattr(field_file, 'instance', None)
+    manifest = getattr(instance, MANIFEST_FIELD, None)
+    if not manifest or not getattr(field_file, 'name', None):
+        return ''
+    field_entry = manifest.get(field_file.field.name) or {}
+    if field_entry.get('source') != field_file.name:
+        return ''
+    return field_entry.get('placeholder') or ''
+
+
+def record_placeholder(field_file):
+    """Compute and store the placeholder for ``field_file`` unless it's already recorded."""
+    instance = getattr(field_file, 'instance', None)
+    if instance is None or instance.pk is None or not hasattr(instance, MANIFEST_FIELD):
+        return
+    if not getattr(field_file, 'name', None) or get_placeholder(field_file):
+        return
+    try:
+        placeholder = compute_placeholder(field_file)
+    except Exception as e:
+        logger.warning(f"Failed to compute placeholder for {field_file.name}: {e}")
+        return
+
+    def set_placeholder(field_entry):
+        field_entry['placeholder'] = placeholder
+
+    _update_field_entry(field_file, set_placeholder)
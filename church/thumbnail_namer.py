@@ -4,6 +4,8 @@ This ensures that thumbnails with different crop boxes are treated as separate f
 """
 from easy_thumbnails import utils
 
+from .media_fingerprint import fingerprint_enabled, source_fingerprint
+
 
 def custom_namer(thumbnailer, prepared_options, source_filename, thumbnail_extension, **kwargs):
     """
@@ -86,5 +88,12 @@ def custom_namer(thumbnailer, prepared_options, source_filename, thumbnail_exten
     if ext and not ext.startswith('.'):
         ext = '.' + ext
     
+    # With MEDIA_FINGERPRINT, sources without a hash in their name get the stored content
+    # hash inserted so the thumbnail name changes whenever the source bytes do
+    if fingerprint_enabled():
+        fingerprint = source_fingerprint(thumbnailer)
+        if fingerprint:
+            base_path = '%s.%s' % (base_path, fingerprint)
+    
     result = '%s.%s%s' % (base_path, opts_str, ext)
     return result
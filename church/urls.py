@@ -24,17 +24,18 @@ urlpatterns = [
     path('multimedia/', views.multimedia_view, name='multimedia'),
     path('contact-us/', views.contact_us_view, name='contact_us'),
     path('news/', views.news_list_view, name='news_list'),
-    path('news/<slug:slug>/', views.news_detail_view, name='news_detail'),
     path('news/load-more/', views.load_more_news_view, name='load_more_news'),
+    path('news/<slug:slug>/', views.news_detail_view, name='news_detail'),
     path('news-line/', views.news_line_list_view, name='news_line_list'),
-    path('news-line/<slug:slug>/', views.news_line_detail_view, name='news_line_detail'),
     path('news-line/load-more/', views.load_more_news_line_view, name='load_more_news_line'),
+    path('news-line/<slug:slug>/', views.news_line_detail_view, name='news_line_detail'),
     path('info-card/<slug:slug>/', views.info_card_detail_view, name='info_card_detail'),
     path('api/calendar-event/create/', views.calendar_event_create_view, name='calendar_event_create'),
     path('api/calendar-event/<int:event_id>/', views.calendar_event_detail_view, name='calendar_event_detail'),
     path('api/calendar-event/<int:event_id>/edit/', views.calendar_event_edit_view, name='calendar_event_edit'),
     path('api/calendar-event/<int:event_id>/delete/', views.calendar_event_delete_view, name='calendar_event_delete'),
     path('gallery/', views.gallery_view, name='gallery'),
+    path('gallery/download/', views.gallery_download_view, name='gallery_download'),
     path('privacy/', views.privacy_view, name='privacy'),
     path('donate/', views.donate_view, name='donate'),
     path('search/', views.search_view, name='search'),
@@ -42,5 +43,8 @@ urlpatterns = [
     path('newsletter/subscribe/', views.newsletter_subscribe_view, name='newsletter_subscribe'),
     path('analytics/', views.analytics_view, name='analytics'),
     path('analytics/reset/', views.analytics_reset_view, name='analytics_reset'),
+    path('analytics/slow-queries/', views.slow_queries_view, name='slow_queries'),
+    path('analytics/slow-queries/reset/', views.slow_queries_reset_view, name='slow_queries_reset'),
     path('add-comment/<int:content_type_id>/<int:object_id>/', views.add_article_comment, name='add_article_comment'),
+    path('img/<str:token>/', views.image_proxy_view, name='image_proxy'),
 ]
@@ -1,3 +1,4 @@
 from .core import *
 from .articles import *
 from .api_admin import *
+from .media import *
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
 from django.db.models import Count
@@ -6,7 +7,6 @@ from django.utils import timezone
 from django.core.cache import cache
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
-from easy_thumbnails.files import get_thumbnailer
 
 from ..models import (
     Verse,
@@ -24,8 +24,10 @@ from ..models import (
     WordOfTruth,
     ChildrensBread,
     ManTalk,
+    SlowQuery,
 )
 from ..middleware import get_client_ip
+from ..thumbnail_manifest import get_thumbnail_url
 
 
 def _resolve_article_title_url(content_type, object_id):
@@ -176,6 +178,29 @@ def analytics_reset_view(request):
     return redirect('analytics')
 
 
+@staff_member_required
+def slow_queries_view(request):
+    """Slow-query log (church.slow_queries) aggregated by fingerprint, worst total time first."""
+    sort = request.GET.get('sort', 'total')
+    order_by = {'total': '-total_ms', 'max': '-max_ms', 'calls': '-calls', 'recent': '-last_seen'}.get(sort, '-total_ms')
+    context = {
+        'slow_queries': SlowQuery.objects.order_by(order_by)[:100],
+        'sort': sort,
+        'threshold_ms': getattr(settings, 'SLOW_QUERY_MS', 0),
+        'sample_rate': getattr(settings, 'SLOW_QUERY_SAMPLE_RATE', 1.0),
+    }
+    return render(request, 'church/slow_queries.html', context)
+
+
+@staff_member_required
+def slow_queries_reset_view(request):
+    """Clears the slow-query log."""
+    if request.method == 'POST':
+        SlowQuery.objects.all().delete()
+        messages.success(request, 'Slow-query log has been cleared.')
+    return redirect('slow_queries')
+
+
 def calendar_event_create_view(request):
     if not request.user.is_staff:
         return JsonResponse({'error': 'Permission denied'}, status=403)
@@ -201,7 +226,8 @@ def calendar_event_detail_view(request, event_id):
     if request.method == 'GET':
         image_url = event.image.url if event.image else None
         if event.image and event.image_cropping:
-             image_url = get_thumbnailer(event.image).get_thumbnail({'size': (800, 600), 'box': event.image_cropping, 'crop': True, 'detail': True}).url
+             # Read from the thumbnail manifest; only generates on a manifest miss
+             image_url = get_thumbnail_url(event.image, {'size': (800, 600), 'box': event.image_cropping, 'crop': True, 'detail': True}) or image_url
         return JsonResponse({'id': event.id, 'title': event.title, 'description': event.description, 'event_date': str(event.event_date), 'event_type': event.event_type, 'location': event.location, 'color': event.color, 'image_url': image_url})
     return JsonResponse({'error': 'Invalid method'}, status=405)
 
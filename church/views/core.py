@@ -133,7 +133,7 @@ def gallery_view(request):
     if category:
         gallery_images_list = GalleryImage.objects.filter(category=category).order_by('-uploaded_at')
     else:
-        gallery_images_list = GalleryImage.objects.all().order_at('-uploaded_at')
+        gallery_images_list = GalleryImage.objects.all().order_by('-uploaded_at')
     
     # Paginate results - 9 per page
     paginator = Paginator(gallery_images_list, 9)
@@ -0,0 +1,98 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import logging
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Sum
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date
+from django.utils.text import slugify
+from django.views.decorators.http import require_GET
+from django_ratelimit.core import get_usage
+
+from ..gallery_archive import gallery_archive_entries, stream_zip
+from ..image_proxy import ProxyBusy, load_spec, resolve_variant_url
+from ..middleware import get_client_ip
+from ..models import GalleryImage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOWNLOAD_MAX_IMAGES = 300
+DEFAULT_DOWNLOAD_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_DOWNLOAD_RATE = '5/h'
+
+
+@require_GET
+def image_proxy_view(request, token):
+    """
+    Signed on-the-fly image variant (see church.image_proxy): generate on first hit, then
+    redirect to the stored file. The redirect is cacheable since a token always maps to the same variant.
+    """
+    try:
+        spec = load_spec(token)
+    except signing.BadSignature:
+        raise Http404('Invalid image URL')
+
+    try:
+        url = resolve_variant_url(spec)
+    except ProxyBusy:
+        response = HttpResponse('Image generation is busy, retry shortly.', status=503, content_type='text/plain')
+        response['Retry-After'] = '2'
+        return response
+    except FutureTimeoutError:
+        response = HttpResponse('Image generation timed out.', status=504, content_type='text/plain')
+        response['Retry-After'] = '5'
+        return response
+    except Exception as e:
+        logger.warning(f"Image proxy failed for {spec.get('s')}: {e}")
+        raise Http404('Image not available')
+
+    response = HttpResponseRedirect(url)
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24)
+    return response
+
+
+@require_GET
+def gallery_download_view(request):
+    """
+    ZIP of a gallery album: ?category=Worship and/or ?from=YYYY-MM-DD&to=YYYY-MM-DD.
+    The archive is streamed while the files are read (church.gallery_archive); albums past
+    GALLERY_DOWNLOAD_MAX_IMAGES / _MAX_BYTES are refused and each client IP is held to GALLERY_DOWNLOAD_RATE.
+    """
+    category = request.GET.get('category', '').strip()
+    date_from = parse_date(request.GET.get('from', '') or '')
+    date_to = parse_date(request.GET.get('to', '') or '')
+    if not category and not (date_from or date_to):
+        return HttpResponseBadRequest('Choose a category or a date range.')
+
+    images = GalleryImage.objects.order_by('uploaded_at', 'id')
+    parts = []
+    if category:
+        images = images.filter(category=category)
+        parts.append(category)
+    if date_from:
+        images = images.filter(uploaded_at__date__gte=date_from)
+        parts.append(date_from.isoformat())
+    if date_to:
+        images = images.filter(uploaded_at__date__lte=date_to)
+        parts.append(date_to.isoformat())
+    totals = images.aggregate(count=Count('id'), size=Sum('media_bytes'))
+    if not totals['count']:
+        raise Http404('No images in this album')
+    if (totals['count'] > getattr(settings, 'GALLERY_DOWNLOAD_MAX_IMAGES', DEFAULT_DOWNLOAD_MAX_IMAGES)
+            or (totals['size'] or 0) > getattr(settings, 'GALLERY_DOWNLOAD_MAX_BYTES', DEFAULT_DOWNLOAD_MAX_BYTES)):
+        return HttpResponseBadRequest('This album is too large to download at once; choose a shorter date range.')
+
+    usage = get_usage(request, group='gallery_download', key=lambda group, request: get_client_ip(request),
+                      rate=getattr(settings, 'GALLERY_DOWNLOAD_RATE', DEFAULT_DOWNLOAD_RATE), increment=True)
+    if usage and usage['should_limit']:
+        response = HttpResponse('Too many downloads, try again later.', status=429, content_type='text/plain')
+        response['Retry-After'] = str(max(usage['time_left'], 1))
+        return response
+
+    response = StreamingHttpResponse(stream_zip(gallery_archive_entries(images)), content_type='application/zip')
+    filename = slugify('-'.join(['gallery'] + parts)) or 'gallery'
+    response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+    response['X-Accel-Buffering'] = 'no'  # let nginx pass chunks straight through
+    return response
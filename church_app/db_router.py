@@ -1,21 +1,137 @@
 """
 Database router for read replicas.
 When REPLICA_DATABASE_URL is set, read operations use the 'replica' database
-and write operations use the 'default' database.
+and write operations use the 'default' database, with read-your-writes:
+
+* once a request writes, its remaining reads go to the primary, and ReplicaPinningMiddleware
+  sets a short-lived cookie so the next requests from that browser (the admin saving a
+  change, a form redirecting to its thank-you page) read from the primary too;
+* sessions are always read from the primary, and so is everything under REPLICA_PRIMARY_PATHS;
+* writes of bookkeeping models (NON_PINNING_MODELS), or with the ``pin=False`` hint (e.g.
+  ``Model.objects.db_manager(hints={'pin': False})``, used for thumbnail manifests), don't pin;
+* views named in REPLICA_READ_VIEWS ignore the cookie (they show public content, where a few
+  seconds of lag doesn't matter), unless the request itself wrote;
+* reads fall back to the primary while the replica is unreachable or lags more than
+  REPLICA_MAX_LAG seconds (checked at most every REPLICA_HEALTH_INTERVAL seconds per process).
 """
+from contextvars import ContextVar
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+STICKY_COOKIE = 'db_primary'
+
+# Models read from the primary even when nothing was written (and whose writes don't pin)
+PRIMARY_ONLY_MODELS = ('sessions.session',)
+# Writes that don't make later reads need the primary (analytics, thumbnail bookkeeping)
+NON_PINNING_MODELS = PRIMARY_ONLY_MODELS + ('church.pageview', 'church.slowquery', 'easy_thumbnails.source', 'easy_thumbnails.thumbnail')
+
+_wrote = ContextVar('db_wrote', default=False)
+_sticky = ContextVar('db_sticky', default=False)
+
+_health_lock = threading.Lock()
+_health = {'checked': 0.0, 'ok': False}
+
+LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def _check_replica():
+    connection = connections[REPLICA]
+    try:
+        connection.ensure_connection()
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0] or 0)
+            max_lag = getattr(settings, 'REPLICA_MAX_LAG', 30)
+            if lag > max_lag:
+                logger.warning(f"Replica lag {lag:.1f}s > {max_lag}s: reading from primary")
+                return False
+        return True
+    except Exception as e:
+        logger.warning(f"Replica unavailable, reading from primary: {e}")
+        return False
+
+
+def replica_available():
+    """Replica health, checked at most once per interval per process (other threads reuse the last result)."""
+    if REPLICA not in connections.settings:
+        return False
+    interval = getattr(settings, 'REPLICA_HEALTH_INTERVAL', 15)
+    now = time.monotonic()
+    if now - _health['checked'] < interval:
+        return _health['ok']
+    if not _health_lock.acquire(blocking=False):
+        return _health['ok']  # another thread is checking
+    try:
+        _health['ok'] = _check_replica()
+        _health['checked'] = time.monotonic()
+    finally:
+        _health_lock.release()
+    return _health['ok']
+
+
+def wrote_in_request():
+    return _wrote.get()
 
 
 class ReplicaRouter:
-    """Route reads to replica, writes to default."""
+    """Route reads to replica, writes to default (with read-your-writes pinning)."""
 
     def db_for_read(self, model, **hints):
-        return 'replica'
+        if model._meta.label_lower in PRIMARY_ONLY_MODELS or _wrote.get() or _sticky.get():
+            return PRIMARY
+        return REPLICA if replica_available() else PRIMARY
 
     def db_for_write(self, model, **hints):
-        return 'default'
+        if model._meta.label_lower not in NON_PINNING_MODELS and hints.get('pin', True):
+            _wrote.set(True)
+        return PRIMARY
 
     def allow_relation(self, obj1, obj2, **hints):
         return True
 
     def allow_migrate(self, db, app_label, model_name=None, **hints):
-        return db == 'default'
+        return db == PRIMARY
+
+
+class ReplicaPinningMiddleware:
+    """Scopes router pinning to one request and carries it to the next few via a cookie."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wrote_token = _wrote.set(False)
+        sticky_token = _sticky.set(self._pinned_by_request(request))
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 15)
+                response.set_cookie(STICKY_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+            return response
+        finally:
+            _wrote.reset(wrote_token)
+            _sticky.reset(sticky_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = getattr(request, 'resolver_match', None)
+        if match and match.url_name in getattr(settings, 'REPLICA_READ_VIEWS', ()):
+            _sticky.set(False)
+        return None
+
+    @staticmethod
+    def _pinned_by_request(request):
+        if request.COOKIES.get(STICKY_COOKIE):
+            return True
+        return request.path.startswith(tuple(getattr(settings, 'REPLICA_PRIMARY_PATHS', ())))
@@ -216,12 +216,15 @@ MIDDLEWARE = [
     'church.security_middleware.SecurityHeadersMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     *(['debug_toolbar.middleware.DebugToolbarMiddleware'] if _debug_toolbar_available else []),
+    'church.query_budget.QueryBudgetMiddleware',  # off unless QUERY_BUDGET_ENABLED or the X-Query-Budget header
+    'church_app.db_router.ReplicaPinningMiddleware',  # read-your-writes when a replica is configured
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'church.middleware.MaintenanceModeMiddleware',
     'church.proxy_fix.ProxyRefererFixMiddleware',  # before CSRF so admin login works when proxy strips Referer
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',  # REQUIRED: Populates request.user
+    'church.server_timing.ServerTimingMiddleware',  # staff + SERVER_TIMING_SAMPLE_RATE of other requests
     'church.diagnostic_middleware.ProxyRefererFixMiddleware',  # Fix Referer for admin login
     # 'church.diagnostic_middleware.StaffLoginRedirectMiddleware',  # DISABLE LOOP CAUSE
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -234,7 +237,7 @@ ROOT_URLCONF = 'church_app.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'church.server_timing.TimedDjangoTemplates',  # DjangoTemplates + Server-Timing render time
         'DIRS': [BASE_DIR / 'church' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -253,11 +256,51 @@ WSGI_APPLICATION = 'church_app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Connection reuse for DATABASE_URL databases (church.db_pool):
+#   'psycopg'    - psycopg 3 pool per gunicorn worker (needs psycopg-pool; else falls back to persistent)
+#   'persistent' - keep each thread's connection for DB_CONN_MAX_AGE seconds, health-checked before reuse
+#   'off'        - new connection per request
+# Keep DB_CONN_MAX_AGE / max_idle under Neon's idle timeout; --max-requests restarts close pools at exit.
+DB_POOL = os.environ.get('DB_POOL', 'persistent')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '240'))
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '1'))
+# gthread threads + the page-view writer and one spare
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', str(int(os.environ.get('GUNICORN_THREADS', '4')) + 2)))
+DB_POOL_TIMEOUT = 10  # seconds a request waits for a free connection
+DB_POOL_MAX_LIFETIME = 30 * 60
+DB_POOL_MAX_IDLE = 4 * 60
+
+
+def _configure_connection_reuse(database):
+    if DB_POOL == 'psycopg' and database.get('ENGINE') == 'django.db.backends.postgresql':
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            ConnectionPool = None
+        if ConnectionPool is not None:
+            database['CONN_MAX_AGE'] = 0  # the pool owns connection lifetime
+            database.setdefault('OPTIONS', {})['pool'] = {
+                'min_size': DB_POOL_MIN_SIZE,
+                'max_size': DB_POOL_MAX_SIZE,
+                'timeout': DB_POOL_TIMEOUT,
+                'max_lifetime': DB_POOL_MAX_LIFETIME,
+                'max_idle': DB_POOL_MAX_IDLE,
+                'check': ConnectionPool.check_connection,
+            }
+            return database
+    if DB_POOL in ('psycopg', 'persistent'):
+        database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+        database['CONN_HEALTH_CHECKS'] = True
+    return database
+
+
 if os.environ.get('DATABASE_URL'):
     import dj_database_url
     # Use dj-database-url for Neon, Heroku, etc.
     DATABASES = {
-        'default': dj_database_url.config(conn_max_age=0, ssl_require=os.environ.get('DB_SSL', 'True') == 'True')
+        'default': _configure_connection_reuse(
+            dj_database_url.config(conn_max_age=0, ssl_require=os.environ.get('DB_SSL', 'True') == 'True')
+        )
     }
 elif os.environ.get('DB_NAME'):
     # Primary configuration for HostPinnacle MySQL/MariaDB
@@ -283,15 +326,65 @@ else:
         }
     }
 
+# church.indexes: INCLUDE columns only exist on PostgreSQL (models.W040), and where partial
+# indexes don't (MySQL, models.W037) PartialIndex creates composite indexes instead. Both are
+# expected for church models; note the silencing also covers any third-party app's indexes.
+SILENCED_SYSTEM_CHECKS = ['models.W037', 'models.W040']
+
 if os.environ.get('REPLICA_DATABASE_URL') and 'REPLICA' in os.environ:
     import dj_database_url
-    DATABASES['replica'] = dj_database_url.config(
+    DATABASES['replica'] = _configure_connection_reuse(dj_database_url.config(
         env='REPLICA_DATABASE_URL',
         conn_max_age=0,
         ssl_require=True,
-    )
+    ))
     DATABASE_ROUTERS = ['church_app.db_router.ReplicaRouter']
 
+# Replica routing (church_app.db_router): after a write, the browser reads from the primary for
+# REPLICA_STICKY_SECONDS; the replica is skipped while it lags more than REPLICA_MAX_LAG seconds.
+REPLICA_STICKY_SECONDS = 15
+REPLICA_MAX_LAG = 30
+REPLICA_HEALTH_INTERVAL = 15
+REPLICA_PRIMARY_PATHS = ('/office/', '/staff-login/')
+# Read-heavy public pages that stay on the replica even right after the visitor wrote something
+REPLICA_READ_VIEWS = (
+    'home', 'home_content', 'news_list', 'news_detail', 'news_line_list', 'news_line_detail',
+    'word_of_truth_list', 'word_of_truth_detail', 'childrens_bread_list', 'childrens_bread_detail',
+    'mantalk_list', 'mantalk_detail', 'book_list', 'book_detail', 'gallery', 'search',
+)
+
+# Query budget (church.query_budget): warn about requests running more queries than their
+# budget, or repeating one query shape (N+1). Switch on for every request with
+# QUERY_BUDGET_ENABLED, or per request with the header "X-Query-Budget: <QUERY_BUDGET_TOKEN>".
+QUERY_BUDGET_ENABLED = os.environ.get('QUERY_BUDGET_ENABLED', 'False') == 'True'
+QUERY_BUDGET_TOKEN = os.environ.get('QUERY_BUDGET_TOKEN', '')
+QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT', '30'))
+QUERY_BUDGET_TIME_MS = int(os.environ.get('QUERY_BUDGET_TIME_MS', '500'))
+QUERY_BUDGET_REPEAT_THRESHOLD = 5
+# Per url_name budgets (detail pages render the cached sidebar, comments and related articles)
+QUERY_BUDGETS = {
+    'home': 20,
+    'news_detail': 15,
+    'word_of_truth_detail': 15,
+    'childrens_bread_detail': 15,
+    'mantalk_detail': 15,
+    'analytics': 40,
+}
+
+# Slow-query log (church.slow_queries): queries slower than SLOW_QUERY_MS (0 disables) are
+# sampled into SlowQuery rows with their EXPLAIN plan, listed at /analytics/slow-queries/.
+# EXPLAIN ANALYZE re-runs the sampled SELECT, so it is opt-in (and never used for WITH or FOR UPDATE/SHARE).
+SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', '250'))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_SAMPLE_RATE', '1.0'))
+SLOW_QUERY_EXPLAIN_ANALYZE = os.environ.get('SLOW_QUERY_EXPLAIN_ANALYZE', 'False') == 'True'
+SLOW_QUERY_PLAN_TTL = 86400  # re-capture a fingerprint's plan at most daily
+
+# Server-Timing header (church.server_timing): DB, cache, template, thumbnail and total time of
+# the request, shown in the browser devtools. Always for staff (SERVER_TIMING_STAFF), and for a
+# sampled share of everyone else.
+SERVER_TIMING_STAFF = os.environ.get('SERVER_TIMING_STAFF', 'True') == 'True'
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', '0.01'))
+
 
 # Cache - Redis when REDIS_URL is set, else in-memory (dev)
 REDIS_URL = os.environ.get('REDIS_URL')
@@ -321,6 +414,11 @@ else:
         }
     }
 
+# Time cache reads/writes for the Server-Timing header (church.server_timing.TimedCache wraps each backend)
+for _cache in CACHES.values():
+    _cache['TIMED_BACKEND'] = _cache['BACKEND']
+    _cache['BACKEND'] = 'church.server_timing.TimedCache'
+
 CACHE_MIDDLEWARE_ALIAS = 'default'
 CACHE_MIDDLEWARE_SECONDS = 300
 CACHE_MIDDLEWARE_KEY_PREFIX = 'bbi'
@@ -451,6 +549,22 @@ STATICFILES_FINDERS = [
 # HostPinnacle Optimization: Use local storage if requested or if GCS is not configured
 USE_GCS = os.environ.get('GS_BUCKET_NAME') and os.environ.get('USE_LOCAL_STORAGE', 'False') != 'True'
 
+# Read-through local-disk cache in front of GCS (church.storage_cache): open/exists/size
+# are answered from disk and the Django cache instead of a round trip per call.
+# Off unless MEDIA_DISK_CACHE_DIR is set. The cache holds up to MEDIA_DISK_CACHE_MAX_MB of
+# source images per instance, and on Cloud Run the filesystem (/tmp included) is in-memory:
+# every cached megabyte counts against the container's memory limit. Only point it at a
+# real disk, or size the cap (and the instance memory) for it.
+MEDIA_DISK_CACHE_DIR = os.environ.get('MEDIA_DISK_CACHE_DIR', '')
+MEDIA_DISK_CACHE = bool(MEDIA_DISK_CACHE_DIR)
+MEDIA_DISK_CACHE_MAX_BYTES = int(os.environ.get('MEDIA_DISK_CACHE_MAX_MB', '512')) * 1024 * 1024
+MEDIA_DISK_CACHE_STAT_TTL = 60 * 10  # seconds a file's exists/size/generation is trusted
+MEDIA_DISK_CACHE_NEGATIVE_TTL = 60  # shorter for missing files (thumbnails not generated yet)
+MEDIA_STORAGE_BACKEND = (
+    'church.storage_backends.CachedGoogleCloudStorage' if MEDIA_DISK_CACHE
+    else 'church.storage_backends.FingerprintedGoogleCloudStorage'
+)
+
 if USE_GCS:
     GS_BUCKET_NAME = os.environ.get('GS_BUCKET_NAME')
     GS_DEFAULT_ACL = os.environ.get('GS_DEFAULT_ACL', None)
@@ -460,7 +574,7 @@ if USE_GCS:
     
     STORAGES = {
         'default': {
-            'BACKEND': 'storages.backends.gcloud.GoogleCloudStorage',
+            'BACKEND': MEDIA_STORAGE_BACKEND,
             'OPTIONS': {
                 'bucket_name': GS_BUCKET_NAME,
                 'querystring_auth': False,
@@ -508,7 +622,7 @@ CKEDITOR_5_UPLOAD_FILE_VIEW_NAME = "ckeditor_5_upload_file"
 # Easy Thumbnails Configuration
 # Use the same storage as default media so thumbnail URLs and files match (local /media/, prod GCS)
 THUMBNAIL_DEFAULT_STORAGE = (
-    'storages.backends.gcloud.GoogleCloudStorage'
+    MEDIA_STORAGE_BACKEND
     if os.environ.get('GS_BUCKET_NAME')
     else 'django.core.files.storage.FileSystemStorage'
 )
@@ -540,6 +654,43 @@ THUMBNAIL_ALIASES = {
     },
 }
 
+# Widths generated for responsive <img srcset> variants ({% responsive_image %}).
+# Each spec gets the steps narrower than itself plus its own size.
+RESPONSIVE_IMAGE_WIDTHS = (320, 640, 960, 1280, 1600)
+
+# Cache lifetime for /media/ responses served by Django (church.media_negotiation.serve_media)
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 30  # 30 days, matches nginx "expires 30d"
+
+# Let the web server send /media/ files Django resolved (church.media_serving): 'x-accel-redirect'
+# (nginx, internal location at MEDIA_SENDFILE_PREFIX) or 'x-sendfile' (Apache/LiteSpeed mod_xsendfile).
+# Empty streams from Django with Range support.
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_SENDFILE_PREFIX = '/protected-media/'
+
+# Content-hash fingerprinting: new uploads and their thumbnails get the SHA-256 prefix in
+# their names and are served with Cache-Control: immutable (church.media_fingerprint)
+MEDIA_FINGERPRINT = os.environ.get('MEDIA_FINGERPRINT', 'False') == 'True'
+
+# Content-addressed uploads: reuse an already-stored file with the same SHA-256 instead of
+# storing (and thumbnailing) a copy. Rows then share one file, so replacing or deleting it
+# from one row affects the others - opt-in. The perceptual hash (near-duplicate detection in
+# cleanup_gallery --perceptual) needs a full decode per upload, so it is opt-in too.
+MEDIA_DEDUPLICATE = os.environ.get('MEDIA_DEDUPLICATE', 'False') == 'True'
+MEDIA_PERCEPTUAL_HASH = os.environ.get('MEDIA_PERCEPTUAL_HASH', 'False') == 'True'
+
+# Deferred thumbnails: on a manifest miss templates emit a signed /img/<token>/ URL and the
+# variant is generated on first request (church.image_proxy) instead of during page render.
+THUMBNAIL_DEFERRED_GENERATION = os.environ.get('THUMBNAIL_DEFERRED_GENERATION', 'False') == 'True'
+IMAGE_PROXY_WORKERS = 2  # per process; 0 generates inline in the request thread
+IMAGE_PROXY_MAX_PENDING = 16  # queued misses before answering 503
+IMAGE_PROXY_TIMEOUT = 30  # seconds a request waits for its variant
+
+# Album ZIP downloads (/gallery/download/) are streamed by a worker: cap the album size and
+# how often one client may start one.
+GALLERY_DOWNLOAD_MAX_IMAGES = 300
+GALLERY_DOWNLOAD_MAX_BYTES = 500 * 1024 * 1024
+GALLERY_DOWNLOAD_RATE = '5/h'  # per client IP (django-ratelimit rate)
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
@@ -547,6 +698,11 @@ DATA_UPLOAD_MAX_NUMBER_FIELDS = 10240
 FILE_UPLOAD_TEMP_DIR = None  # Use system temp directory
 FILE_UPLOAD_PERMISSIONS = 0o644
 
+# Upload-time image normalization (church.image_ingest): originals larger than this on the
+# longest side are downscaled, EXIF orientation is applied and metadata stripped.
+IMAGE_UPLOAD_MAX_DIMENSION = int(os.environ.get('IMAGE_UPLOAD_MAX_DIMENSION', 2560))
+IMAGE_UPLOAD_JPEG_QUALITY = 85
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
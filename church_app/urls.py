@@ -18,15 +18,17 @@ import logging
 from urllib.parse import urlparse
 
 from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, login
 from django.shortcuts import render, redirect
 from django.urls import path, include, re_path
-from django.views.static import serve
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView, TemplateView
 from django.views.csrf import csrf_failure as default_csrf_failure
 from church.utils import generate_math_captcha, validate_math_captcha
+from church.db_pool import pool_stats
+from church.media_negotiation import serve_media
 from django.http import JsonResponse
 from django.db import connection
 from django.contrib.sitemaps.views import sitemap
@@ -168,6 +170,12 @@ def health_check_view(request):
         return JsonResponse({'status': 'unhealthy', 'database': str(e)}, status=503)
 
 
+@staff_member_required
+def pool_stats_view(request):
+    """Connection pooling mode and counters per database alias (staff only)."""
+    return JsonResponse({'pool': pool_stats()})
+
+
 # Customize admin site
 admin.site.site_header = "Breaking Barriers International"
 admin.site.site_title = "Breaking Barriers International"
@@ -178,6 +186,7 @@ admin.site.login = ratelimit(key='ip', rate='5/5m', block=True)(admin.site.login
 
 urlpatterns = [
     path('health/', health_check_view),
+    path('health/pool/', pool_stats_view),
     path('staff-login/', staff_login_view),
     path('office/', admin.site.urls),
     path('ckeditor5/', include('django_ckeditor_5.urls')),
@@ -203,6 +212,7 @@ if settings.DEBUG:
 else:
     # Production Fallback: Serve media files via Django if they return 404 from the web server.
     # This is necessary on shared hosting like HostPinnacle when the app is outside public_html.
+    # serve_media picks the .avif/.webp sibling the client accepts (Vary: Accept).
     urlpatterns += [
-        re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+        re_path(r'^media/(?P<path>.*)$', serve_media, {'document_root': settings.MEDIA_ROOT}),
     ]